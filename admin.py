@@ -1,44 +1,155 @@
 import streamlit as st
 import pandas as pd
-from db import get_conn
+import dashboard
+import ledger
+import passwords
+import profile_cache
+import roster
+import rollup
+import stats
+from db import get_conn, pool_stats
+from sqltrace import traced_view
 
+def _panel_header(title, name, snapshot=None):
+    """패널 제목 + 이 패널만 다시 조회하는 버튼 (스냅샷 패널은 스냅샷부터 다시 집계)"""
+    col_title, col_btn = st.columns([5, 1])
+    with col_title:
+        st.markdown(title)
+    with col_btn:
+        if st.button("🔄", key=f"dash_refresh_{name}", help="이 패널만 다시 조회"):
+            if snapshot:
+                stats.refresh(snapshot)
+            dashboard.invalidate(name)
+            st.rerun()
+
+def _panel_caption(result, age=None):
+    """스냅샷 나이 + 조회 시간 (캐시에서 꺼냈으면 표시)"""
+    parts = [stats.format_age(age)] if age is not None else []
+    parts.append("캐시" if result.cached else f"조회 {result.elapsed_ms:,}ms")
+    st.caption(" · ".join(parts))
+
+def _flow_chart(df, value):
+    """bucket x grp 피벗 -> 선 차트 (grp마다 한 줄)"""
+    pivot = df.pivot_table(index="bucket", columns="grp", values=value, aggfunc="sum").fillna(0)
+    st.line_chart(pivot)
+
+def _points_flow_panel():
+    """포인트 흐름 시계열 (원본 transaction_log가 아니라 롤업 테이블 조회)"""
+    st.markdown("**📈 포인트 흐름 (지급 / 차감)**")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        granularity = st.radio("단위", ["day", "hour"], horizontal=True, key="flow_granularity",
+                               format_func=lambda g: {"day": "일별", "hour": "시간별"}[g])
+    with c2:
+        group_by = st.radio("구분", ["type", "department"], horizontal=True, key="flow_group",
+                            format_func=lambda g: {"type": "유형별", "department": "학과별"}[g])
+    with c3:
+        days = st.slider("기간(일)", 1, rollup.MAX_DAYS, 30, key="flow_days")
+    types = st.multiselect("거래 유형", [ledger.QUIZ_REWARD, ledger.PENALTY_STEP1, ledger.FORCE_PASS],
+                           default=[ledger.QUIZ_REWARD, ledger.PENALTY_STEP1, ledger.FORCE_PASS], key="flow_types")
+
+    conn = get_conn()
+    if conn is None:
+        return
+    try:
+        sql, params = rollup.series_query(granularity, group_by, days, types)
+        df = pd.read_sql(sql, conn, params=params)
+        progress = rollup.lag(conn)
+    except Exception:
+        st.error("포인트 흐름 조회 실패 (롤업 테이블)")
+        conn.close()
+        return
+
+    st.caption(f"롤업 반영 위치 log_id {progress['last_log_id']:,} (미반영 {progress['behind']:,}건)")
+    if df.empty:
+        st.info("해당 기간에 집계된 포인트 변동이 없습니다.")
+    else:
+        col_in, col_out = st.columns(2)
+        with col_in:
+            st.markdown("##### 지급 (inflow)")
+            _flow_chart(df, "inflow")
+        with col_out:
+            st.markdown("##### 차감 (outflow)")
+            _flow_chart(df, "outflow")
+
+    # 사용자 1명의 일별 흐름
+    login_id = st.text_input("사용자 아이디로 조회", key="flow_login_id")
+    if login_id:
+        cur = conn.cursor()
+        cur.execute("SELECT user_id FROM user_account WHERE login_id = %s", (login_id,))
+        row = cur.fetchone()
+        if row is None:
+            st.warning("해당 아이디의 사용자가 없습니다.")
+        else:
+            sql, params = rollup.user_series_query(row[0], days)
+            df_user = pd.read_sql(sql, conn, params=params)
+            if df_user.empty:
+                st.info("해당 기간에 포인트 변동이 없습니다.")
+            else:
+                df_user["net"] = df_user["inflow"] - df_user["outflow"]
+                _flow_chart(df_user, "net")
+                st.dataframe(df_user, hide_index=True, use_container_width=True)
+    conn.close()
+
+@traced_view
 def dashboard_view():
     """시스템 통계 및 로그 (View 활용 강화)"""
     st.subheader("📊 시스템 현황 대시보드")
-    conn = get_conn()
+    # 통계는 스냅샷(mv_*)을 읽음 -> 백그라운드에서 STATS_MAX_AGE초마다 갱신
+    stats.start_scheduler()
+    try:
+        ages = stats.ages()
+    except Exception:
+        ages = {}
+
+    col_info, col_btn = st.columns([4, 1])
+    with col_info:
+        st.caption(f"통계는 최대 {int(stats.MAX_AGE_SEC)}초 간격으로 다시 집계된 스냅샷입니다.")
+    with col_btn:
+        if st.button("🔄 지금 갱신", use_container_width=True, key="stats_refresh_btn"):
+            stats.refresh_all()
+            dashboard.invalidate()
+            st.rerun()
+
+    # 패널 4개를 풀 연결로 동시에 조회 (데이터가 안 바뀌었으면 캐시)
+    panels = dashboard.fetch()
     
     # 탭을 나눠서 SQL View 활용 능력을 각각 보여줌
-    t1, t2, t3 = st.tabs(["🏆 졸업률 & 로그", "💰 포인트 분포", "🏫 학과별 활동(Having)"])
+    t1, t2, t3, t4 = st.tabs(["🏆 졸업률 & 로그", "💰 포인트 분포", "🏫 학과별 활동(Having)", "📈 포인트 흐름"])
     
     with t1:
         c1, c2 = st.columns(2)
         with c1:
-            st.markdown("**🌱 식물별 완주(졸업) 현황**")
-            try:
-                # View: plant_completion_stats
-                df_stats = pd.read_sql("SELECT * FROM plant_completion_stats", conn)
+            _panel_header("**🌱 식물별 완주(졸업) 현황**", "completion", "mv_plant_completion_stats")
+            # View: plant_completion_stats (스냅샷)
+            result = panels["completion"]
+            if result.error is None:
+                df_stats = result.df
+                _panel_caption(result, ages.get("mv_plant_completion_stats"))
                 st.dataframe(df_stats, hide_index=True, use_container_width=True)
                 if not df_stats.empty:
                     # 완주율 바 차트
                     st.bar_chart(df_stats.set_index("common_name")["completion_rate"])
-            except: 
+            else:
                 st.error("View 조회 실패 (plant_completion_stats)")
 
         with c2:
-            st.markdown("**📜 최근 포인트 로그**")
-            sql_log = """
-                SELECT l.logged_at, u.name, l.transaction_type, l.amount 
-                FROM transaction_log l JOIN user_account u ON l.user_id = u.user_id
-                ORDER BY l.logged_at DESC LIMIT 10
-            """
-            st.dataframe(pd.read_sql(sql_log, conn), hide_index=True, use_container_width=True)
+            _panel_header("**📜 최근 포인트 로그**", "recent_log")
+            result = panels["recent_log"]
+            if result.error is None:
+                _panel_caption(result)
+                st.dataframe(result.df, hide_index=True, use_container_width=True)
+            else:
+                st.error("최근 포인트 로그 조회 실패")
 
     with t2:
-        st.markdown("**💰 사용자 포인트 보유 분포 (Histogram)**")
+        _panel_header("**💰 사용자 포인트 보유 분포 (Histogram)**", "points", "mv_point_distribution")
         st.caption("경제 밸런스 확인용 (View: point_distribution)")
-        try:
-            # View: point_distribution
-            df_point = pd.read_sql("SELECT * FROM point_distribution", conn)
+        # View: point_distribution (스냅샷)
+        result = panels["points"]
+        if result.error is None:
+            df_point = result.df
+            _panel_caption(result, ages.get("mv_point_distribution"))
             
             col_a, col_b = st.columns([2, 1])
             with col_a:
@@ -49,25 +160,50 @@ def dashboard_view():
                     st.info("데이터가 충분하지 않습니다.")
             with col_b:
                 st.dataframe(df_point, hide_index=True, use_container_width=True)
-        except: 
+        else:
             st.error("View 조회 실패 (point_distribution)")
 
     with t3:
-        st.markdown("**🏫 활성 학과 통계 (Active Departments)**")
+        _panel_header("**🏫 활성 학과 통계 (Active Departments)**", "departments", "mv_active_department_stats")
         st.caption("활동 유저가 1명 이상인 학과만 조회 (GROUP BY + HAVING 적용 View)")
-        try:
-            # View: active_department_stats (HAVING 절 적용됨)
-            df_dept = pd.read_sql("SELECT * FROM active_department_stats ORDER BY avg_points DESC", conn)
+        # View: active_department_stats (HAVING 절 적용됨, 스냅샷)
+        result = panels["departments"]
+        if result.error is None:
+            df_dept = result.df
+            _panel_caption(result, ages.get("mv_active_department_stats"))
             st.dataframe(df_dept, use_container_width=True)
             
             if not df_dept.empty:
                 st.markdown("##### 학과별 평균 포인트")
                 st.bar_chart(df_dept.set_index("department")["avg_points"])
-        except: 
+        else:
             st.error("View 조회 실패 (active_department_stats)")
 
-    conn.close()
+    with t4:
+        _points_flow_panel()
+
+    # 커넥션 풀 현황 (서버 프로세스 단위)
+    with st.expander("🔌 DB 커넥션 풀 현황"):
+        pool = pool_stats()
+        if pool:
+            st.json(pool)
+        else:
+            st.caption("아직 생성된 커넥션 풀이 없습니다.")
+
+    with st.expander("🔑 비밀번호 해시 풀 현황"):
+        st.json(passwords.stats())
 
+    with st.expander("👤 프로필 캐시 현황"):
+        st.json(profile_cache.stats())
+
+    with st.expander("⏱ 통계 스냅샷 갱신 현황"):
+        st.json(stats.scheduler_status())
+        st.dataframe(
+            pd.DataFrame([info._asdict() for info in ages.values()]),
+            hide_index=True, use_container_width=True,
+        )
+
+@traced_view
 def user_role_management():
     """회원 권한 관리 (전문가 승인 + 관리자 임명)"""
     st.subheader("👥 계정 및 권한 관리")
@@ -94,6 +230,7 @@ def user_role_management():
                     cur.execute("UPDATE expert_application SET status='APPROVED', decided_at=NOW() WHERE user_id=%s", (uid,))
                     cur.execute("UPDATE user_account SET role='Expert' WHERE user_id=%s", (uid,))
                     conn.commit()
+                    profile_cache.invalidate(uid)
                     st.success("승인 완료!")
                     st.rerun()
                 if c2.button("거절", key=f"no_{uid}"):
@@ -119,12 +256,50 @@ def user_role_management():
             if st.button("권한 변경 실행"):
                 cur.execute("UPDATE user_account SET role=%s WHERE user_id=%s", (new_role, user[0]))
                 conn.commit()
+                profile_cache.invalidate(user[0])
                 st.success(f"{user[1]}님의 권한이 {new_role}(으)로 변경되었습니다.")
                 st.rerun()
         else:
             st.error("해당 ID의 유저를 찾을 수 없습니다.")
     conn.close()
 
+def roster_enrollment():
+    """학과 명단 CSV로 일괄 가입 (먼저 미리보기 후 실행)"""
+    st.subheader("🎓 명단 일괄 등록")
+    st.caption("CSV 헤더: student_id, name, department(선택). 로그인 ID는 접두어 + 학번, 초기 비밀번호는 임의 생성됩니다.")
+    up = st.file_uploader("명단 CSV", type=["csv"], key="roster_file")
+    c1, c2 = st.columns(2)
+    dept = c1.text_input("기본 학과 (명단에 학과가 없을 때)", key="roster_dept")
+    prefix = c2.text_input("로그인 ID 접두어", roster.LOGIN_PREFIX, key="roster_prefix")
+    if up is None:
+        return
+    rows = roster.parse(up.getvalue().decode("utf-8-sig"), dept or None)
+
+    conn = get_conn()
+    try:
+        preview = roster.enroll(conn, rows, prefix=prefix, dry_run=True)
+        st.write(f"명단 {len(rows):,}명 - " + ", ".join(
+            f"{'가입 가능' if s == 'NEW' else roster.STATUS_LABELS[s]} {n:,}" for s, n in sorted(preview.counts.items())
+        ))
+        problems = [r for r in preview.rows if r.status != "NEW"]
+        if problems:
+            st.dataframe(pd.DataFrame(problems, columns=roster.RosterRow._fields).drop(columns=["password"]),
+                         use_container_width=True, hide_index=True)
+        if preview.counts.get("NEW") and st.button("✅ 가입 실행", key="roster_apply"):
+            result = roster.enroll(conn, rows, st.session_state.user['user_id'], prefix)
+            st.session_state["roster_result"] = result
+    except Exception as e:
+        st.error(e)
+    finally:
+        conn.close()
+
+    result = st.session_state.get("roster_result")
+    if result is not None:
+        st.success(f"가입 완료 {result.counts.get('CREATED', 0):,}명 ({result.elapsed_ms:,}ms)")
+        st.download_button("📥 결과 보고서 (초기 비밀번호 포함)", roster.report_csv(result),
+                           file_name="roster_result.csv", mime="text/csv")
+
+@traced_view
 def admin_view():
     if st.session_state.user['role'] != 'Admin':
         st.error("최고 관리자(Admin)만 접근 가능합니다.")
@@ -133,9 +308,11 @@ def admin_view():
     st.header("⚙️ 시스템 관리자(Admin) 페이지")
     
     # 탭으로 화면 구성
-    tab1, tab2 = st.tabs(["📊 대시보드 (통계/로그)", "👥 회원/권한 관리"])
+    tab1, tab2, tab3 = st.tabs(["📊 대시보드 (통계/로그)", "👥 회원/권한 관리", "🎓 명단 일괄 등록"])
     
     with tab1:
         dashboard_view()
     with tab2:
-        user_role_management()
\ No newline at end of file
+        user_role_management()
+    with tab3:
+        roster_enrollment()
\ No newline at end of file
@@ -5,6 +5,9 @@ import game
 import expert
 import content_mgr
 import admin
+import sqltrace
+import stats
+import profile_cache
 
 def init_session():
     """세션 초기화"""
@@ -13,6 +16,23 @@ def init_session():
     if "show_auth" not in st.session_state:
         st.session_state.show_auth = False
 
+def refresh_user():
+    """
+    로그인한 사용자의 프로필(포인트/역할 등)을 캐시에서 다시 읽어 세션에 반영
+    (캐시는 profile_cache.TTL_SEC초마다만 DB 조회, 계정이 삭제됐으면 로그아웃)
+    """
+    if st.session_state.user is None:
+        return
+    try:
+        fresh = profile_cache.get(st.session_state.user['user_id'])
+    except Exception:
+        # DB에 잠시 접속할 수 없으면 세션에 있던 값으로 계속
+        return
+    if fresh is None:
+        st.session_state.user = None
+    else:
+        st.session_state.user.update(fresh)
+
 def get_role_badge(role):
     """역할에 따른 HTML 배지 디자인 반환"""
     
@@ -64,6 +84,9 @@ def main():
         page_icon="🌱"
     )
     init_session()
+    refresh_user()
+    # 관리자 대시보드 통계 스냅샷 갱신 스레드 (프로세스당 1개)
+    stats.start_scheduler()
 
     # --- 헤더 영역 ---
     col1, col2 = st.columns([3, 1.2])
@@ -188,10 +211,17 @@ def main():
     elif choice == "⚙️ 시스템 관리 (계정/로그)":
         admin.admin_view()
 
+    # --- SQL 디버그 패널 (관리자 전용) ---
+    if st.session_state.user and st.session_state.user['role'] == 'Admin':
+        if st.sidebar.toggle("🧪 SQL 디버그 패널", key="sql_debug_panel"):
+            sqltrace.render_debug_panel()
+
     # --- 푸터 ---
     st.markdown("---")
     st.caption("2025 Database Project")
     st.caption("© 부산대학교 정보컴퓨터공학부 202355545 손정훈, 202355625 박소영의 식물도감 app")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # rerun 한 번 동안 실행된 쿼리를 모아서 기록
+    with sqltrace.rerun():
+        main()
\ No newline at end of file
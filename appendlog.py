@@ -0,0 +1,312 @@
+"""
+quiz_attempt / transaction_log 지연 기록 (write-behind, 기본 꺼짐)
+
+APPEND_BUFFER=1 이면 게임 함수가 두 로그 테이블 INSERT를 건너뛰고(p_defer),
+이 모듈이 행을 프로세스별 스풀 파일에 모았다가 APPEND_BATCH_SIZE건이 쌓이거나
+APPEND_FLUSH_SEC초가 지나면 COPY(또는 여러 행 INSERT) 한 번으로 기록함.
+포인트 잔액(user_account.points)과 멱등 키는 지금처럼 게임 함수 안에서 바로 반영되고,
+로그만 최대 APPEND_FLUSH_SEC초 늦게 보임.
+
+크래시 대비
+- 행은 스풀 파일(APPEND_SPOOL_DIR)에 한 줄씩 바로 씀
+- 배치를 DB에 쓸 때 append_batch 테이블에 배치 ID를 같은 트랜잭션으로 남김
+  -> 커밋 후 스풀 파일을 지우기 전에 죽어도, 다음 시작 때 같은 배치를 두 번 넣지 않음
+- 프로세스가 시작되면 남아 있는 스풀 파일(죽은 프로세스 것)을 먼저 DB에 반영
+- 정상 종료 시 atexit으로 남은 행을 모두 기록
+- 배치 파일 이름은 만든 시각(ns)으로 시작 -> 만든 순서대로 기록
+- DB에 연결할 수 없으면 그 자리에서 멈추고 다음 flush에 다시 시도,
+  배치 자체가 실패하면(삭제된 user_plant를 가리키는 FK 오류 등) 건너뛰고 다음 배치를 계속 기록하고
+  APPEND_MAX_ATTEMPTS번 실패한 배치는 dead-*.jsonl로 옮겨 둠 (스풀이 끝없이 쌓이지 않도록, 확인 후 수동 처리)
+"""
+import atexit
+import datetime
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from db import get_conn
+
+ENABLED = os.getenv("APPEND_BUFFER", "0") == "1"
+BATCH_SIZE = int(os.getenv("APPEND_BATCH_SIZE", "500"))
+FLUSH_SEC = float(os.getenv("APPEND_FLUSH_SEC", "2"))
+# "copy" = COPY FROM STDIN, "values" = 여러 행 INSERT (execute_values)
+FLUSH_METHOD = os.getenv("APPEND_FLUSH_METHOD", "copy")
+SPOOL_DIR = os.getenv("APPEND_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "pium_append_spool"))
+# 1이면 스풀 파일에 쓸 때마다 fsync (서버 전원 장애까지 대비, 대신 느려짐)
+SPOOL_FSYNC = os.getenv("APPEND_SPOOL_FSYNC", "0") == "1"
+# 이만큼 실패한 배치는 dead-*.jsonl로 옮기고 더 시도하지 않음
+MAX_ATTEMPTS = int(os.getenv("APPEND_MAX_ATTEMPTS", "5"))
+
+COLUMNS = {
+    "quiz_attempt": ("user_plant_id", "step_id", "is_correct", "used_continue", "attempted_at"),
+    "transaction_log": ("user_id", "transaction_type", "amount", "logged_at"),
+}
+
+
+def _now():
+    return datetime.datetime.now().isoformat(sep=" ")
+
+
+_last_ns = 0
+_name_lock = threading.Lock()
+
+
+def _spool_name():
+    """만든 시각(ns, 프로세스 안에서 항상 증가) + 임의 값 -> 이름순 정렬 = 만든 순서"""
+    global _last_ns
+    with _name_lock:
+        _last_ns = max(time.time_ns(), _last_ns + 1)
+        return f"{_last_ns:020d}-{uuid.uuid4().hex[:12]}"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_rows(cursor, table, rows, method=None):
+    """rows를 table에 한 번에 기록 (호출한 쪽 트랜잭션 안에서)"""
+    if not rows:
+        return
+    columns = COLUMNS[table]
+    if (method or FLUSH_METHOD) == "copy":
+        buf = io.StringIO()
+        for row in rows:
+            buf.write("\t".join("\\N" if v is None else str(v) for v in row) + "\n")
+        buf.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+    else:
+        execute_values(cursor, f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s", rows, page_size=1000)
+
+
+def write_batch(batch_id, rows_by_table, conn=None, method=None):
+    """
+    배치 1개를 한 트랜잭션으로 기록, 이미 기록된 배치면 건너뜀
+    반환: 새로 기록한 행 수 (이미 있던 배치면 0)
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+        if conn is None:
+            raise psycopg2.OperationalError("DB 연결 실패")
+    try:
+        cur = conn.cursor()
+        total = sum(len(rows) for rows in rows_by_table.values())
+        cur.execute(
+            "INSERT INTO append_batch (batch_id, row_count) VALUES (%s, %s) ON CONFLICT (batch_id) DO NOTHING",
+            (batch_id, total),
+        )
+        if cur.rowcount == 0:
+            conn.rollback()
+            return 0
+        for table, rows in rows_by_table.items():
+            write_rows(cur, table, rows, method)
+        conn.commit()
+        return total
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def read_spool(path):
+    """스풀 파일 -> {table: [row, ...]} (마지막 줄이 잘려 있으면 무시)"""
+    rows_by_table = {table: [] for table in COLUMNS}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            rows_by_table[record["t"]].append(tuple(record["r"]))
+    return rows_by_table
+
+
+class AppendBuffer:
+    """프로세스당 1개. 행 추가는 스풀 파일에 한 줄, 기록은 백그라운드 스레드"""
+
+    def __init__(self, spool_dir=SPOOL_DIR, batch_size=BATCH_SIZE, flush_sec=FLUSH_SEC):
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.flush_sec = flush_sec
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._count = 0
+        self._stats = {"rows_added": 0, "rows_flushed": 0, "batches": 0, "failures": 0, "dead_batches": 0,
+                       "last_error": None}
+        # 배치 파일 이름 -> 실패 횟수
+        self._attempts = {}
+
+        os.makedirs(spool_dir, exist_ok=True)
+        self._open_spool()
+        self._thread = threading.Thread(target=self._run, name="appendlog-flusher", daemon=True)
+        self._thread.start()
+
+    def _open_spool(self):
+        self._spool_path = os.path.join(self.spool_dir, f"open-{os.getpid()}-{_spool_name()}.jsonl")
+        self._spool = open(self._spool_path, "a", encoding="utf-8")
+
+    def add(self, table, row):
+        line = json.dumps({"t": table, "r": list(row)}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._spool.write(line)
+            self._spool.flush()
+            if SPOOL_FSYNC:
+                os.fsync(self._spool.fileno())
+            self._count += 1
+            self._stats["rows_added"] += 1
+            full = self._count >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _seal(self):
+        """현재 버퍼를 배치로 확정: 스풀 파일을 batch-*.jsonl로 바꾸고 새 스풀을 엶"""
+        with self._lock:
+            if self._count == 0:
+                return
+            # DB 기록은 확정된 스풀 파일을 읽어서 함 (크래시 복구와 같은 경로)
+            self._count = 0
+            self._spool.close()
+            os.replace(self._spool_path, os.path.join(self.spool_dir, f"batch-{_spool_name()}.jsonl"))
+            self._open_spool()
+
+    def flush(self):
+        """
+        모아둔 행 + 이전에 실패한 배치를 DB에 기록
+        실패한 배치는 스풀 디렉터리에 남겨 두고 다음 flush 때 다시 시도 (MAX_ATTEMPTS번까지)
+        """
+        with self._flush_lock:
+            self._seal()
+            return self._write_spooled()
+
+    def _pending_batches(self):
+        """기록할 배치 파일 이름 (만든 순서), 죽은 프로세스가 남긴 스풀은 배치로 확정해서 포함"""
+        names = []
+        for name in os.listdir(self.spool_dir):
+            if name.startswith("open-"):
+                pid = int(name.split("-")[1])
+                if pid == os.getpid() or _pid_alive(pid):
+                    continue
+                # open-{pid}-{시각}-... -> batch-{시각}-... (같은 파일은 항상 같은 배치 ID)
+                sealed = "batch-" + name.split("-", 2)[2]
+                try:
+                    os.replace(os.path.join(self.spool_dir, name), os.path.join(self.spool_dir, sealed))
+                except FileNotFoundError:
+                    continue
+                name = sealed
+            if name.startswith("batch-"):
+                names.append(name)
+        return sorted(names)
+
+    def _write_spooled(self):
+        written = 0
+        for name in self._pending_batches():
+            path = os.path.join(self.spool_dir, name)
+            # 같은 스풀 디렉터리를 쓰는 다른 프로세스가 먼저 처리했을 수 있음 (append_batch가 중복을 막음)
+            try:
+                count = write_batch(name[len("batch-"):-len(".jsonl")], read_spool(path))
+            except FileNotFoundError:
+                continue
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                # DB 연결 문제 -> 배치 탓이 아니므로 횟수를 세지 않고 다음 flush에 다시
+                self._stats["failures"] += 1
+                self._stats["last_error"] = str(e)
+                break
+            except Exception as e:
+                self._stats["failures"] += 1
+                self._stats["last_error"] = f"{name}: {e}"
+                self._attempts[name] = self._attempts.get(name, 0) + 1
+                if self._attempts[name] >= MAX_ATTEMPTS:
+                    self._bury(name)
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._attempts.pop(name, None)
+            written += count
+            self._stats["rows_flushed"] += count
+            self._stats["batches"] += 1
+        return written
+
+    def _bury(self, name):
+        """계속 실패하는 배치를 dead-*.jsonl로 옮김 (이후 flush에서 제외)"""
+        try:
+            os.replace(os.path.join(self.spool_dir, name), os.path.join(self.spool_dir, "dead-" + name))
+        except FileNotFoundError:
+            pass
+        self._attempts.pop(name, None)
+        self._stats["dead_batches"] += 1
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self._stats["failures"] += 1
+                self._stats["last_error"] = str(e)
+
+    def close(self):
+        """남은 행을 모두 기록하고 종료 (atexit)"""
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=self.flush_sec + 5)
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._spool.close()
+                if self._count == 0 and os.path.exists(self._spool_path) and os.path.getsize(self._spool_path) == 0:
+                    os.remove(self._spool_path)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "pending": self._count}
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = AppendBuffer()
+            atexit.register(_buffer.close)
+        return _buffer
+
+
+def record_attempt(user_plant_id, step_id, is_correct, used_continue=False):
+    get_buffer().add("quiz_attempt", (user_plant_id, step_id, is_correct, used_continue, _now()))
+
+
+def record_transaction(user_id, tx_type, amount):
+    if amount:
+        get_buffer().add("transaction_log", (user_id, tx_type, amount, _now()))
+
+
+def flush():
+    return get_buffer().flush() if _buffer is not None else 0
+
+
+def stats():
+    return _buffer.stats() if _buffer is not None else None
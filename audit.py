@@ -0,0 +1,173 @@
+"""
+감사 로그 탐색 (content_mgr.view_audit_logs)
+
+- 필터: 처리자(admin_id), 작업 종류(action_type), 대상 ID(target_id), 기간, details 전문 검색
+- keyset 페이지네이션: 정렬 키 (created_at, log_id) 최신순, 앞/뒤 양방향
+  OFFSET 없이 이전 페이지의 첫/마지막 행 키에서 이어서 읽으므로 몇 번째 페이지든 비용이 같음
+- CSV 내보내기: 서버 측 커서(named cursor)로 EXPORT_CHUNK행씩 받아 바로 써 내려감 -> 행 수와 상관없이 메모리 일정
+
+    python audit.py export --action-type HIDE_TIP_REPORT --search 숨김 > audit.csv
+"""
+import csv
+import io
+import os
+import re
+from collections import namedtuple
+
+PAGE_SIZE = int(os.getenv("AUDIT_PAGE_SIZE", "50"))
+EXPORT_CHUNK = int(os.getenv("AUDIT_EXPORT_CHUNK", "5000"))
+
+# content_mgr.insert_audit_log에서 쓰는 작업 종류
+ACTION_TYPES = [
+    "ADD_PLANT", "EDIT_PLANT", "DEL_PLANT", "ADD_QUIZ", "EDIT_QUIZ", "IMPORT_CATALOG",
+    "REQ_DONE", "REQ_REJECT", "UPDATE_CONFIG", "ENROLL_ROSTER",
+    "HIDE_TIP_REPORT", "IGNORE_REPORT", "HIDE", "UNHIDE",
+]
+
+# 빈 값(None / 빈 목록 / 빈 문자열)은 조건 없음, date_to는 그 날짜 포함
+AuditFilter = namedtuple(
+    "AuditFilter",
+    ["admin_id", "action_types", "target_id", "search", "date_from", "date_to"],
+    defaults=(None, None, None, None, None, None),
+)
+
+COLUMNS = ["log_id", "created_at", "admin", "action_type", "target_id", "details", "ip_address"]
+SELECT = """
+    SELECT l.log_id, l.created_at, u.name AS admin, l.action_type, l.target_id, l.details, l.ip_address
+    FROM audit_log l
+    LEFT JOIN user_account u ON u.user_id = l.admin_id
+"""
+# create_tables.sql의 idx_audit_details_fts와 같은 식이어야 인덱스를 탐
+FTS_VECTOR = "to_tsvector('simple', COALESCE(l.details, ''))"
+
+
+def search_query(text):
+    """
+    검색어 -> tsquery 문자열 (단어마다 접두어 일치, 모두 포함)
+    예: '몬스 숨김' -> '몬스:* & 숨김:*'  (한국어 형태소 분석 없이 'simple' 사전이라 접두어로 보완)
+    """
+    words = [re.sub(r"[&|!():*<>'\\\\]", "", w) for w in (text or "").split()]
+    return " & ".join(f"{w}:*" for w in words if w)
+
+
+def build_filter(f):
+    """AuditFilter -> (WHERE 절, 파라미터)"""
+    where = ["TRUE"]
+    params = []
+    if f.admin_id is not None:
+        where.append("l.admin_id = %s")
+        params.append(f.admin_id)
+    if f.action_types:
+        where.append("l.action_type = ANY(%s)")
+        params.append(list(f.action_types))
+    if f.target_id is not None:
+        where.append("l.target_id = %s")
+        params.append(f.target_id)
+    tsquery = search_query(f.search)
+    if tsquery:
+        where.append(f"{FTS_VECTOR} @@ to_tsquery('simple', %s)")
+        params.append(tsquery)
+    if f.date_from is not None:
+        where.append("l.created_at >= %s")
+        params.append(f.date_from)
+    if f.date_to is not None:
+        where.append("l.created_at < %s::date + 1")
+        params.append(f.date_to)
+    return "WHERE " + " AND ".join(where), params
+
+
+def build_page_query(f, key=None, direction="next", page_size=PAGE_SIZE):
+    """
+    keyset 페이지 쿼리 -> (sql, params)
+    key: 기준 행의 (created_at, log_id), 첫 페이지(가장 최신)면 None
+    direction: "next" = key보다 오래된 쪽, "prev" = key보다 최신 쪽 (오름차순으로 읽고 fetch_page가 뒤집음)
+    한 행을 더 가져와서 그 방향으로 더 있는지 판단함
+    """
+    where, params = build_filter(f)
+    if key is not None:
+        op = "<" if direction == "next" else ">"
+        where += f" AND (l.created_at, l.log_id) {op} (%s, %s)"
+        params += list(key)
+    order = "DESC" if direction == "next" else "ASC"
+    sql = f"""
+        {SELECT}
+        {where}
+        ORDER BY l.created_at {order}, l.log_id {order}
+        LIMIT %s
+    """
+    return sql, params + [page_size + 1]
+
+
+def fetch_page(cursor, f, key=None, direction="next", page_size=PAGE_SIZE):
+    """-> (최신순 행 목록, 그 방향으로 더 있는지)"""
+    sql, params = build_page_query(f, key, direction, page_size)
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "prev":
+        rows.reverse()
+    return rows, has_more
+
+
+def page_key(row):
+    """행 -> keyset 키 (created_at, log_id)"""
+    return (row[1], row[0])
+
+
+def iter_csv(conn, f, limit=None, chunk=EXPORT_CHUNK):
+    """
+    필터에 맞는 로그를 최신순 CSV 텍스트 조각으로 (첫 조각은 헤더)
+    서버 측 커서라 chunk행씩만 메모리에 올라옴, conn의 트랜잭션은 호출한 쪽에서 끝낼 것
+    """
+    where, params = build_filter(f)
+    sql = f"{SELECT} {where} ORDER BY l.created_at DESC, l.log_id DESC"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params = params + [limit]
+    cur = conn.cursor(name="audit_export")
+    cur.itersize = chunk
+    try:
+        cur.execute(sql, tuple(params))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(COLUMNS)
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows:
+                break
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        cur.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from db import get_conn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--admin-id", type=int)
+    parser.add_argument("--action-type", action="append", choices=ACTION_TYPES)
+    parser.add_argument("--target-id", type=int)
+    parser.add_argument("--search")
+    parser.add_argument("--date-from")
+    parser.add_argument("--date-to")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    conn = get_conn()
+    try:
+        flt = AuditFilter(args.admin_id, args.action_type, args.target_id, args.search, args.date_from, args.date_to)
+        for part in iter_csv(conn, flt, args.limit):
+            sys.stdout.write(part)
+        conn.rollback()
+    finally:
+        conn.close()
@@ -1,26 +1,48 @@
 import streamlit as st
 import pandas as pd
 from db import get_conn
+from sqltrace import traced_view
+import passwords
+import profile_cache
 
 def login_user(login_id, password):
-    """로그인 처리 함수"""
+    """
+    로그인 처리 함수
+    비밀번호 검증은 passwords 프로세스 풀에서 (로그인이 몰려도 화면 스레드를 붙잡지 않음)
+    평문으로 저장된 예전 계정은 로그인 성공 시 argon2 해시로 바꿔 저장
+    """
     conn = get_conn()
     cursor = conn.cursor()
     
     # 학번, 이름, 학과 등 정보까지 다 조회
     query = """
-        SELECT user_id, login_id, role, points, student_id, name, department 
+        SELECT user_id, login_id, role, points, student_id, name, department, password_hash
         FROM user_account 
-        WHERE login_id = %s AND password_hash = %s
+        WHERE login_id = %s
     """
-    cursor.execute(query, (login_id, password))
+    cursor.execute(query, (login_id,))
     user_data = cursor.fetchone()
     
+    # 해시 검증을 기다리는 동안 DB 커넥션을 붙잡고 있지 않도록 먼저 반납
     conn.close()
+
+    # 없는 ID도 가짜 해시로 검증 (응답 시간으로 ID 존재 여부를 알 수 없게)
+    ok, new_hash = passwords.verify(user_data[7] if user_data else None, password)
+    if ok and new_hash:
+        conn = get_conn()
+        try:
+            # 그 사이 비밀번호가 바뀌었으면 덮어쓰지 않음
+            conn.cursor().execute(
+                "UPDATE user_account SET password_hash = %s WHERE user_id = %s AND password_hash = %s",
+                (new_hash, user_data[0], user_data[7]),
+            )
+            conn.commit()
+        finally:
+            conn.close()
     
-    if user_data:
+    if ok:
         # 세션에 저장할 딕셔너리 생성
-        return {
+        user = {
             "user_id": user_data[0],
             "login_id": user_data[1],
             "role": user_data[2],
@@ -29,6 +51,9 @@ def login_user(login_id, password):
             "name": user_data[5],
             "department": user_data[6]
         }
+        # 방금 읽은 값으로 프로필 캐시 채움 (첫 화면에서 다시 조회하지 않도록)
+        profile_cache.prime(user)
+        return user
     else:
         return None
 
@@ -43,21 +68,25 @@ def register_user(login_id, password, student_id, name, department):
         if cursor.fetchone():
             return False, "이미 존재하는 ID입니다."
             
-        # 신규 회원가입 (기본 role='User', points=1000)
+        # 신규 회원가입 (기본 role='User', points=1000), 비밀번호는 argon2 해시로 저장
         insert_sql = """
             INSERT INTO user_account(login_id, password_hash, student_id, name, department, role, points)
             VALUES (%s, %s, %s, %s, %s, 'User', 1000)
         """
-        cursor.execute(insert_sql, (login_id, password, student_id, name, department))
+        cursor.execute(insert_sql, (login_id, passwords.make_hash(password), student_id, name, department))
         conn.commit()
         return True, "회원가입 성공! 로그인해주세요."
         
+    except passwords.PasswordBusy as e:
+        conn.rollback()
+        return False, str(e)
     except Exception as e:
         conn.rollback()
         return False, f"오류 발생: {e}"
     finally:
         conn.close()
 
+@traced_view
 def auth_view():
     """로그인/회원가입 화면 UI"""
     st.header("🔐 로그인 / 회원가입")
@@ -71,7 +100,11 @@ def auth_view():
         login_pw = st.text_input("비밀번호", type="password", key="login_pw_input")
         
         if st.button("로그인 실행"):
-            user_info = login_user(login_id, login_pw)
+            try:
+                user_info = login_user(login_id, login_pw)
+            except passwords.PasswordBusy as e:
+                st.warning(str(e))
+                return
             if user_info:
                 st.session_state.user = user_info
                 st.session_state.show_auth = False # 모달 닫기
@@ -0,0 +1 @@
+"""성능 측정/부하 테스트 스크립트 모음 (python -m bench.<이름> 으로 실행)"""
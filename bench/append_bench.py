@@ -0,0 +1,121 @@
+"""
+로그 테이블(quiz_attempt + transaction_log) 기록 처리량 벤치마크
+
+- per_row: 지금처럼 요청마다 두 테이블에 한 행씩 INSERT + 커밋
+- values / copy: appendlog.write_batch로 batch_size건씩 한 트랜잭션 (여러 행 INSERT / COPY)
+- buffer_add: 지연 기록을 켰을 때 요청 경로에서 드는 비용 (스풀 파일에 한 줄 쓰기)
+
+    python -m bench.append_bench --rows 20000 --batch-size 500 --out append_bench.json
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import uuid
+
+import appendlog
+from db import get_conn
+from bench.common import drop_fixture, percentiles, seed_players, write_result
+
+
+def make_actions(players, step_id, count):
+    """액션 1건 = quiz_attempt 1행 + transaction_log 1행"""
+    now = appendlog._now()
+    actions = []
+    for i in range(count):
+        user_id, user_plant_id = players[i % len(players)]
+        actions.append((
+            (user_plant_id, step_id, True, False, now),
+            (user_id, "QUIZ_REWARD", 100, now),
+        ))
+    return actions
+
+
+def run_per_row(conn, actions):
+    cur = conn.cursor()
+    samples = []
+    for attempt, log in actions:
+        started = time.perf_counter()
+        cur.execute("""
+            INSERT INTO quiz_attempt (user_plant_id, step_id, is_correct, used_continue, attempted_at)
+            VALUES (%s, %s, %s, %s, %s)
+        """, attempt)
+        cur.execute("INSERT INTO transaction_log (user_id, transaction_type, amount, logged_at) VALUES (%s, %s, %s, %s)", log)
+        conn.commit()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run_batched(conn, actions, batch_size, method):
+    samples = []
+    for start in range(0, len(actions), batch_size):
+        chunk = actions[start:start + batch_size]
+        rows = {"quiz_attempt": [a for a, _ in chunk], "transaction_log": [l for _, l in chunk]}
+        started = time.perf_counter()
+        appendlog.write_batch(f"bench-{uuid.uuid4().hex}", rows, conn, method)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run_buffer_add(actions):
+    """스풀 파일 쓰기 비용만 측정 (flush가 일어나지 않게 크게 잡고, 끝나면 스풀 디렉터리 삭제)"""
+    spool_dir = tempfile.mkdtemp(prefix="pium_append_bench_")
+    buffer = appendlog.AppendBuffer(spool_dir=spool_dir, batch_size=len(actions) * 2 + 1, flush_sec=3600)
+    samples = []
+    try:
+        for attempt, log in actions:
+            started = time.perf_counter()
+            buffer.add("quiz_attempt", attempt)
+            buffer.add("transaction_log", log)
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        buffer._spool.close()
+        shutil.rmtree(spool_dir, ignore_errors=True)
+    return samples
+
+
+def summarize(samples, actions_count):
+    total_sec = sum(samples) / 1000
+    return {
+        "actions_per_sec": round(actions_count / total_sec, 1) if total_sec else None,
+        "total_sec": round(total_sec, 3),
+        "latency_ms": percentiles(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000, help="액션 수 (테이블별 행 수)")
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=appendlog.BATCH_SIZE)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    cur = conn.cursor()
+    prefix, _, step_ids, players = seed_players(cur, args.players, steps=1, tag="append")
+    conn.commit()
+    actions = make_actions(players, step_ids[0], args.rows)
+
+    results = {}
+    try:
+        results["per_row"] = summarize(run_per_row(conn, actions), len(actions))
+        results["values"] = summarize(run_batched(conn, actions, args.batch_size, "values"), len(actions))
+        results["copy"] = summarize(run_batched(conn, actions, args.batch_size, "copy"), len(actions))
+        results["buffer_add"] = summarize(run_buffer_add(actions), len(actions))
+    finally:
+        conn.rollback()
+        cur.execute("DELETE FROM append_batch WHERE batch_id LIKE 'bench-%'")
+        drop_fixture(cur, prefix)
+        conn.commit()
+        conn.close()
+
+    write_result(args.out, "append_log", {
+        "rows": args.rows,
+        "batch_size": args.batch_size,
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
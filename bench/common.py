@@ -0,0 +1,92 @@
+"""벤치마크 스크립트 공통 헬퍼"""
+import json
+import os
+import platform
+import statistics
+import time
+import uuid
+
+
+def percentiles(samples_ms):
+    """지연시간 목록(ms) -> p50/p95/p99/평균"""
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def timed(func, *args, **kwargs):
+    """(결과, 걸린 시간 ms)"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def write_result(path, name, data):
+    """결과를 JSON 파일로 저장 (릴리스 간 비교용), path가 없으면 출력만"""
+    record = {
+        "benchmark": name,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        **data,
+    }
+    text = json.dumps(record, ensure_ascii=False, indent=2, default=str)
+    print(text)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return record
+
+
+def seed_players(cur, count, steps=5, points=1_000_000, tag="bench", plant=True):
+    """
+    벤치마크용 데이터 생성: 식물 1종(steps단계, 정답은 모두 O) + 유저 count명 + 각자 user_plant 1개
+    (plant=False면 user_plant는 만들지 않고 user_plant_id 자리에 None, 비밀번호는 'bench')
+    반환: (prefix, species_id, step_ids, [(user_id, user_plant_id), ...])
+    prefix로 시작하는 login_id/common_name은 drop_fixture()로 정리
+    """
+    prefix = f"{tag}-{uuid.uuid4().hex[:8]}"
+    cur.execute(
+        "INSERT INTO plant_species (common_name, category, difficulty) VALUES (%s, 'leaf', 3) RETURNING species_id",
+        (prefix,),
+    )
+    species_id = cur.fetchone()[0]
+    cur.execute("""
+        INSERT INTO species_step (species_id, step_order, stage_name, quiz_question, correct_answer)
+        SELECT %s, g, 'Step ' || g, 'bench question ' || g, TRUE FROM generate_series(1, %s) g
+        RETURNING step_id
+    """, (species_id, steps))
+    step_ids = sorted(r[0] for r in cur.fetchall())
+    cur.execute("""
+        INSERT INTO user_account (login_id, password_hash, name, department, role, points)
+        SELECT %s || '-' || g, 'bench', 'bench ' || g, 'bench', 'User', %s FROM generate_series(1, %s) g
+        RETURNING user_id
+    """, (prefix, points, count))
+    user_ids = sorted(r[0] for r in cur.fetchall())
+    if not plant:
+        return prefix, species_id, step_ids, [(u, None) for u in user_ids]
+    cur.execute("""
+        INSERT INTO user_plant (user_id, species_id)
+        SELECT u, %s FROM unnest(%s::int[]) u
+        RETURNING user_id, user_plant_id
+    """, (species_id, user_ids))
+    players = sorted(cur.fetchall())
+    return prefix, species_id, step_ids, players
+
+
+def drop_fixture(cur, prefix):
+    """seed_players로 만든 데이터 삭제 (FK CASCADE로 시도/로그까지 삭제)"""
+    cur.execute("DELETE FROM user_account WHERE login_id LIKE %s", (prefix + "-%",))
+    cur.execute("DELETE FROM plant_species WHERE common_name = %s", (prefix,))
@@ -0,0 +1,70 @@
+"""
+관리자 대시보드 패널 조회 벤치마크
+
+- serial: 예전처럼 연결 1개로 패널 쿼리를 차례대로
+- parallel: dashboard.fetch (패널마다 풀 연결, 동시에) - 매번 캐시를 비움
+- cached: dashboard.fetch (데이터가 안 바뀐 rerun, 버전 확인 쿼리 1개만)
+- slowest_panel: 패널별 단독 조회 시간 중 최댓값 (parallel이 가까워야 하는 값)
+
+    python -m bench.dashboard_bench --repeat 20 --out dashboard_bench.json
+"""
+import argparse
+
+import dashboard
+from db import get_conn
+from bench.common import percentiles, timed, write_result
+
+
+def run_serial(conn):
+    cur = conn.cursor()
+    for panel in dashboard.PANELS.values():
+        cur.execute(panel.sql)
+        cur.fetchall()
+
+
+def run_parallel():
+    dashboard.invalidate()
+    return dashboard.fetch()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    try:
+        run_serial(conn)  # 캐시 데우기
+        conn.rollback()
+        serial = []
+        for _ in range(args.repeat):
+            serial.append(timed(run_serial, conn)[1])
+            conn.rollback()
+    finally:
+        conn.close()
+
+    parallel, per_panel = [], {name: [] for name in dashboard.PANELS}
+    for _ in range(args.repeat):
+        results, ms = timed(run_parallel)
+        parallel.append(ms)
+        for name, result in results.items():
+            per_panel[name].append(result.elapsed_ms)
+
+    dashboard.fetch()
+    cached = [timed(dashboard.fetch)[1] for _ in range(args.repeat)]
+
+    panels = {name: percentiles(samples) for name, samples in per_panel.items()}
+    write_result(args.out, "dashboard", {
+        "repeat": args.repeat,
+        "workers": dashboard.MAX_WORKERS,
+        "serial_ms": percentiles(serial),
+        "parallel_ms": percentiles(parallel),
+        "cached_ms": percentiles(cached),
+        "slowest_panel_p50_ms": max(p["p50"] for p in panels.values()),
+        "panels_ms": panels,
+    })
+
+
+if __name__ == "__main__":
+    main()
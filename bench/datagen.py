@@ -0,0 +1,350 @@
+"""
+대규모 합성 데이터 생성기 (성능 작업용 기준 데이터)
+
+user_account, plant_species, species_step, user_plant, quiz_attempt, transaction_log,
+expert_tip, tip_report, audit_log를 COPY로 채움.
+- 같은 --seed면 같은 데이터 (날짜도 --start-date 기준이라 실행 시각과 무관)
+- 인기 식물/활동 많은 유저/신고 많이 받는 팁은 Zipf 분포로 치우치게 생성
+- FK와 CHECK 제약을 지킴: 시도 단계는 해당 식물의 단계 범위 안, user_plant는 (user, species) 중복 없음,
+  포인트 = 1000 + transaction_log 합계 (음수가 될 유저는 BALANCE_ADJUST 로그로 보정)
+- id는 각 테이블의 현재 최대값 다음부터 직접 지정하고, 끝나면 시퀀스를 맞춤
+
+    python -m bench.datagen --scale small                      # 1만 유저 / 20만 시도
+    python -m bench.datagen --scale large --seed 7             # 100만 유저 / 2천만 시도 / 5만 팁
+    python -m bench.datagen --users 50000 --attempts 1000000   # 개별 지정 (프리셋 값을 덮어씀)
+    python -m bench.datagen --scale medium --truncate          # 생성 전에 대상 테이블 비우기 (주의)
+"""
+import argparse
+import bisect
+import datetime
+import io
+import itertools
+import random
+import time
+from array import array
+
+import partitions
+import rollup
+from db import get_conn
+from hangul import choseong_key
+
+SCALES = {
+    "small": {"users": 10_000, "species": 500, "attempts": 200_000, "tips": 1_000, "reports": 500, "audits": 5_000},
+    "medium": {"users": 100_000, "species": 2_000, "attempts": 2_000_000, "tips": 10_000, "reports": 5_000, "audits": 50_000},
+    "large": {"users": 1_000_000, "species": 5_000, "attempts": 20_000_000, "tips": 50_000, "reports": 25_000, "audits": 500_000},
+}
+TABLES = ["user_account", "plant_species", "species_step", "user_plant", "quiz_attempt",
+          "transaction_log", "expert_tip", "tip_report", "audit_log"]
+ID_COLUMNS = {
+    "user_account": "user_id", "plant_species": "species_id", "species_step": "step_id",
+    "user_plant": "user_plant_id", "quiz_attempt": "attempt_id", "transaction_log": "log_id",
+    "expert_tip": "tip_id", "tip_report": "report_id", "audit_log": "log_id",
+}
+
+START_POINTS = 1000
+REWARD, PENALTY, REVIVE = 100, 50, 300
+SYLLABLES = list("몬스테라고무나무산세베리아스킨답서스필로덴드론알로카시아칼라데아선인장다육이장미국화수국라벤더로즈마리바질민트")
+CATEGORIES = ["leaf", "flower", "succulent", "herb", "vegetable", "tree"]
+SUN_LEVELS = ["Low", "Mid", "High"]
+STAGES = ["Seed", "Sprout", "Leaf", "Bud", "Flower", "Fruit", "Harvest"]
+DEPARTMENTS = ["컴퓨터공학과", "경영학과", "생명과학과", "원예학과", "디자인학과", "기계공학과", "국어국문학과", "화학과"]
+REPORT_REASONS = ["잘못된 정보", "광고/홍보", "욕설/비방", "중복 게시물", "기타"]
+AUDIT_ACTIONS = ["ADD_PLANT", "EDIT_PLANT", "DEL_PLANT", "ADD_QUIZ", "EDIT_QUIZ", "REQ_DONE", "REQ_REJECT",
+                 "UPDATE_CONFIG", "HIDE_TIP_REPORT", "IGNORE_REPORT", "UNHIDE"]
+
+
+def zipf_sampler(rng, n, s):
+    """0..n-1 중 하나를 Zipf(s) 가중치로 뽑는 함수 (0번이 가장 자주 뽑힘)"""
+    cum = list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+    total = cum[-1]
+    return lambda: bisect.bisect_left(cum, rng.random() * total)
+
+
+class CopyStream(io.TextIOBase):
+    """행 generator -> COPY FROM STDIN용 파일 객체 (전체를 메모리에 올리지 않음)"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buf = ""
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        parts = [self._buf]
+        length = len(self._buf)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = "\t".join("\\N" if v is None else str(v) for v in row) + "\n"
+            parts.append(line)
+            length += len(line)
+            self.count += 1
+        data = "".join(parts)
+        if size < 0:
+            self._buf = ""
+            return data
+        self._buf = data[size:]
+        return data[:size]
+
+
+class Generator:
+    def __init__(self, counts, seed, start_date, days):
+        self.counts = counts
+        self.seed = seed
+        self.start = datetime.datetime.fromisoformat(start_date)
+        self.span_sec = days * 86400
+        self.base = {}
+
+    def rng(self, name):
+        """테이블별 독립 난수 (한 테이블 개수를 바꿔도 다른 테이블 데이터는 그대로)"""
+        return random.Random(f"{self.seed}:{name}")
+
+    def ts(self, rng):
+        return self.start + datetime.timedelta(seconds=rng.randrange(self.span_sec))
+
+    # --- 생성 ---
+
+    def users(self):
+        rng = self.rng("users")
+        base = self.base["user_account"]
+        self.roles = {"Expert": array("i"), "Content": array("i"), "Admin": array("i")}
+        dept = zipf_sampler(rng, len(DEPARTMENTS), 1.0)
+        for n in range(1, self.counts["users"] + 1):
+            uid = base + n
+            r = rng.random()
+            role = "User" if r < 0.97 else "Expert" if r < 0.99 else "Content" if r < 0.995 else "Admin"
+            if role != "User":
+                self.roles[role].append(uid)
+            yield (uid, f"gen{self.seed}-{n}", "pw", f"{2020 + n % 6}{n:07d}", f"user{n}",
+                   DEPARTMENTS[dept()], role, START_POINTS, self.ts(rng))
+        # 팁/감사 로그 작성자가 최소 1명은 있도록
+        for role in ("Expert", "Admin"):
+            if not self.roles[role]:
+                self.roles[role].append(base + 1)
+
+    def species(self):
+        rng = self.rng("species")
+        base = self.base["plant_species"]
+        for n in range(1, self.counts["species"] + 1):
+            name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))) + f" {n}"
+            yield (base + n, name, choseong_key(name), rng.choice(CATEGORIES), rng.randint(1, 5),
+                   rng.choice(SUN_LEVELS), f"합성 데이터 식물 {n}")
+
+    def steps(self):
+        """종마다 3~7단계, 단계 id는 종 순서대로 연속 -> first_step[i], step_count[i]로 역산"""
+        rng = self.rng("steps")
+        step_id = self.base["species_step"]
+        self.first_step = array("i")
+        self.step_count = array("b")
+        for n in range(1, self.counts["species"] + 1):
+            count = rng.randint(3, 7)
+            self.first_step.append(step_id + 1)
+            self.step_count.append(count)
+            for order in range(1, count + 1):
+                step_id += 1
+                yield (step_id, self.base["plant_species"] + n, order, STAGES[order - 1],
+                       f"합성 퀴즈 {n}-{order} (O/X)?", rng.random() < 0.5, "합성 해설")
+
+    def user_plants(self):
+        """유저당 평균 2개 (기하분포), 인기 식물 위주, (user, species) 중복 없음"""
+        rng = self.rng("user_plants")
+        pick_species = zipf_sampler(rng, self.counts["species"], 1.1)
+        self.up_user = array("i")
+        self.up_species = array("i")
+        self.up_step = array("b")
+        up_id = self.base["user_plant"]
+        for n in range(1, self.counts["users"] + 1):
+            owned = set()
+            want = 1
+            while rng.random() < 0.5 and want < 20:
+                want += 1
+            for _ in range(want * 3):
+                if len(owned) >= want:
+                    break
+                owned.add(pick_species())
+            for sp in sorted(owned):
+                up_id += 1
+                steps = self.step_count[sp]
+                current = rng.randint(1, steps)
+                completed = current == steps and rng.random() < 0.6
+                self.up_user.append(self.base["user_account"] + n)
+                self.up_species.append(sp)
+                self.up_step.append(current)
+                yield (up_id, self.base["user_account"] + n, self.base["plant_species"] + sp + 1,
+                       current, completed, 0, self.ts(rng))
+
+    def attempt_events(self):
+        """
+        시도 1건과 그에 따른 포인트 로그(없으면 None)를 같은 순서로 생성
+        quiz_attempt / transaction_log 두 번의 COPY에서 각각 다시 돌려도 결과가 같음
+        """
+        rng = self.rng("attempts")
+        n_plants = len(self.up_user)
+        order = list(range(n_plants))
+        rng.shuffle(order)
+        pick = zipf_sampler(rng, n_plants, 0.8)
+        for _ in range(self.counts["attempts"]):
+            i = order[pick()]
+            sp = self.up_species[i]
+            step_order = rng.randint(1, self.up_step[i])
+            step_id = self.first_step[sp] + step_order - 1
+            at = self.ts(rng)
+            r = rng.random()
+            if r < 0.7:
+                yield (self.up_plant_id(i), step_id, True, False, at), (self.up_user[i], "QUIZ_REWARD", REWARD, at)
+            elif step_order == 1:
+                yield (self.up_plant_id(i), step_id, False, False, at), (self.up_user[i], "PENALTY_STEP1", -PENALTY, at)
+            elif r < 0.82:
+                yield (self.up_plant_id(i), step_id, False, True, at), (self.up_user[i], "FORCE_PASS", -REVIVE, at)
+            else:
+                yield (self.up_plant_id(i), step_id, False, False, at), None
+
+    def up_plant_id(self, index):
+        return self.base["user_plant"] + index + 1
+
+    def attempts(self):
+        base = self.base["quiz_attempt"]
+        for n, (attempt, _) in enumerate(self.attempt_events(), start=1):
+            yield (base + n,) + attempt
+
+    def transactions(self):
+        """포인트 로그 + 잔액이 음수가 될 유저의 보정 로그"""
+        log_id = self.base["transaction_log"]
+        user_base = self.base["user_account"]
+        totals = array("q", bytes(8 * (self.counts["users"] + 1)))
+        for _, log in self.attempt_events():
+            if log is None:
+                continue
+            log_id += 1
+            totals[log[0] - user_base] += log[2]
+            yield (log_id,) + log
+        adjust_at = self.start + datetime.timedelta(seconds=self.span_sec)
+        for n in range(1, self.counts["users"] + 1):
+            if START_POINTS + totals[n] < 0:
+                log_id += 1
+                yield (log_id, user_base + n, "BALANCE_ADJUST", -(START_POINTS + totals[n]), adjust_at)
+
+    def tips(self):
+        rng = self.rng("tips")
+        base = self.base["expert_tip"]
+        pick_species = zipf_sampler(rng, self.counts["species"], 1.1)
+        experts = self.roles["Expert"]
+        for n in range(1, self.counts["tips"] + 1):
+            sp = pick_species()
+            step_id = self.first_step[sp] + rng.randrange(self.step_count[sp]) if rng.random() < 0.5 else None
+            yield (base + n, rng.choice(experts), self.base["plant_species"] + sp + 1, step_id,
+                   f"합성 팁 {n}", "물은 흙이 마르면 주세요. " * rng.randint(1, 5), rng.random() < 0.03, self.ts(rng))
+
+    def reports(self):
+        rng = self.rng("reports")
+        base = self.base["tip_report"]
+        if not self.counts["tips"]:
+            return
+        pick_tip = zipf_sampler(rng, self.counts["tips"], 1.2)
+        for n in range(1, self.counts["reports"] + 1):
+            yield (base + n, self.base["expert_tip"] + pick_tip() + 1,
+                   self.base["user_account"] + rng.randint(1, self.counts["users"]),
+                   rng.choice(REPORT_REASONS), self.ts(rng))
+
+    def audits(self):
+        rng = self.rng("audits")
+        base = self.base["audit_log"]
+        admins = list(self.roles["Admin"]) + list(self.roles["Content"])
+        for n in range(1, self.counts["audits"] + 1):
+            action = rng.choice(AUDIT_ACTIONS)
+            yield (base + n, rng.choice(admins), action, rng.randint(1, max(1, self.counts["species"])),
+                   f"합성 감사 로그: {action}", f"10.0.{rng.randrange(256)}.{rng.randrange(256)}", self.ts(rng))
+
+
+def copy_rows(conn, table, columns, rows):
+    started = time.perf_counter()
+    stream = CopyStream(rows)
+    cur = conn.cursor()
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", stream, size=1 << 20)
+    conn.commit()
+    elapsed = time.perf_counter() - started
+    print(f"  {table}: {stream.count:,} rows in {elapsed:.1f}s ({stream.count / max(elapsed, 1e-9):,.0f} rows/s)")
+    return stream.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for key in SCALES["small"]:
+        parser.add_argument(f"--{key}", type=int, help=f"{key} 개수 (프리셋 덮어쓰기)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-date", default="2025-03-01")
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--truncate", action="store_true", help="대상 테이블을 TRUNCATE ... RESTART IDENTITY CASCADE 후 생성")
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for key in counts:
+        if getattr(args, key) is not None:
+            counts[key] = getattr(args, key)
+    gen = Generator(counts, args.seed, args.start_date, args.days)
+
+    conn = get_conn()
+    cur = conn.cursor()
+    if args.truncate:
+        cur.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+        # log_id가 1부터 다시 시작하므로 포인트 흐름 롤업도 처음부터
+        rollup.reset(cur)
+        conn.commit()
+    # 생성 기간의 월 파티션을 먼저 만들어 둠 (없으면 모두 DEFAULT 파티션으로 들어감)
+    if partitions.ensure(conn, start=gen.start.date()) is None:
+        raise SystemExit("다른 프로세스가 파티션 작업 중입니다. 잠시 후 다시 실행하세요.")
+    for table in TABLES:
+        cur.execute(f"SELECT COALESCE(MAX({ID_COLUMNS[table]}), 0) FROM {table}")
+        gen.base[table] = cur.fetchone()[0]
+    conn.commit()
+
+    print(f"generating {counts} (seed={args.seed})")
+    started = time.perf_counter()
+    try:
+        copy_rows(conn, "user_account", ["user_id", "login_id", "password_hash", "student_id", "name",
+                                         "department", "role", "points", "created_at"], gen.users())
+        copy_rows(conn, "plant_species", ["species_id", "common_name", "search_key", "category", "difficulty",
+                                          "sun_level", "description"], gen.species())
+        copy_rows(conn, "species_step", ["step_id", "species_id", "step_order", "stage_name", "quiz_question",
+                                         "correct_answer", "explanation"], gen.steps())
+        copy_rows(conn, "user_plant", ["user_plant_id", "user_id", "species_id", "current_step", "is_completed",
+                                       "action_seq", "created_at"], gen.user_plants())
+        copy_rows(conn, "quiz_attempt", ["attempt_id", "user_plant_id", "step_id", "is_correct", "used_continue",
+                                         "attempted_at"], gen.attempts())
+        copy_rows(conn, "transaction_log", ["log_id", "user_id", "transaction_type", "amount", "logged_at"],
+                  gen.transactions())
+        copy_rows(conn, "expert_tip", ["tip_id", "expert_id", "species_id", "step_id", "title", "content",
+                                       "is_hidden", "created_at"], gen.tips())
+        copy_rows(conn, "tip_report", ["report_id", "tip_id", "reporter_id", "reason", "created_at"], gen.reports())
+        copy_rows(conn, "audit_log", ["log_id", "admin_id", "action_type", "target_id", "details", "ip_address",
+                                      "created_at"], gen.audits())
+
+        # 포인트 = 시작 포인트 + 로그 합계 (보정 로그 덕분에 CHECK (points >= 0) 만족)
+        cur.execute("""
+            UPDATE user_account u SET points = %s + t.total
+            FROM (SELECT user_id, SUM(amount) AS total FROM transaction_log
+                  WHERE user_id > %s GROUP BY user_id) t
+            WHERE u.user_id = t.user_id
+        """, (START_POINTS, gen.base["user_account"]))
+        for table in TABLES:
+            column = ID_COLUMNS[table]
+            cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                        f"(SELECT COALESCE(MAX({column}), 1) FROM {table}))")
+        conn.commit()
+
+        # 통계 갱신도 커밋해야 반납(rollback) 후에 남음
+        for table in TABLES:
+            cur.execute(f"ANALYZE {table}")
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"done in {time.perf_counter() - started:.1f}s")
+    print("포인트 흐름 롤업 반영: python rollup.py --settle 0")
+
+
+if __name__ == "__main__":
+    main()
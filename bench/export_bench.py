@@ -0,0 +1,51 @@
+"""
+데이터 내보내기(exporter.py) 처리량 벤치마크
+
+데이터셋 x 형식마다 한 번씩 내보내고 행 수, 파일 크기, MB/s, 행/초, 최대 메모리(RSS)를 기록
+--chunk를 바꿔 가며 돌리면 묶음 크기에 따른 처리량/메모리 차이를 볼 수 있음
+
+    python -m bench.datagen --scale large --truncate
+    python -m bench.export_bench --dir /tmp/pium_export --out export_bench.json
+"""
+import argparse
+import os
+import resource
+import sys
+
+import exporter
+from bench.common import write_result
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, 리눅스는 KB
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default="export_bench_out")
+    parser.add_argument("--datasets", nargs="+", choices=list(exporter.DATASETS), default=list(exporter.DATASETS))
+    parser.add_argument("--formats", nargs="+", choices=exporter.FORMATS, default=exporter.FORMATS)
+    parser.add_argument("--chunk", type=int, default=exporter.CHUNK_ROWS)
+    parser.add_argument("--keep", action="store_true", help="내보낸 파일을 지우지 않음")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    results = []
+    for name in args.datasets:
+        for fmt in args.formats:
+            path = os.path.join(args.dir, f"{name}.{'parquet' if fmt == 'parquet' else 'jsonl'}")
+            res = exporter.export(name, path, fmt, chunk=args.chunk)
+            results.append({**res._asdict(), "peak_rss_mb": peak_rss_mb()})
+            print(f"  {name:16} {fmt:8} {res.rows:>12,} rows {res.bytes / 1e6:>10,.1f}MB "
+                  f"{res.mb_per_sec:>8}MB/s {res.rows_per_sec:>12,} rows/s")
+            if not args.keep:
+                os.remove(path)
+
+    write_result(args.out, "export", {"chunk_rows": args.chunk, "runs": results})
+
+
+if __name__ == "__main__":
+    main()
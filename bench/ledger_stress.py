@@ -0,0 +1,173 @@
+"""
+포인트 원장 동시성 스트레스 테스트
+
+여러 스레드가 적은 수의 유저에게 정답/1단계 패널티/부활을 동시에 보내고
+(일부 요청은 같은 멱등 키로 중복 제출), 끝난 뒤 아래를 확인함
+- 모든 유저의 잔액 = 시작 잔액 + transaction_log 합계
+- 잔액이 음수인 유저 없음 (CHECK 위반 에러 0건)
+- 같은 멱등 키는 transaction_log에 한 번만 반영
+커넥션을 못 받은 스레드의 요청은 outcomes["checkout_failed"]로 집계되고 실패로 처리 (종료 코드 1)
+요청은 건마다 따로 커밋되고, 커밋된 transaction_log 행이 0이면 실패 (검사가 빈 결과로 통과하지 않도록)
+
+    python -m bench.ledger_stress --players 20 --ops 500 --out ledger_stress.json
+    DB_POOL_MAX=20 python -m bench.ledger_stress --threads 16 --players 20 --ops 500
+"""
+import argparse
+import random
+import threading
+import time
+
+import psycopg2
+
+import game_config
+from db import get_conn, get_pool
+from bench.common import drop_fixture, percentiles, seed_players, write_result
+
+START_POINTS = 500
+ACTIONS = [
+    ("pium_answer_correct", "quiz_reward"),
+    ("pium_step1_penalty", "step1_penalty"),
+    ("pium_rescue", "revive_cost"),
+]
+
+
+def worker(thread_no, args, players, step_ids, cfg, prefix, samples, errors, lock):
+    rng = random.Random(args.seed + thread_no)
+    conn = get_conn()
+    if conn is None:
+        # 풀 대기 시간 초과 등: 이 스레드의 요청 전체를 실패로 집계 (결과에서 조용히 빠지지 않도록)
+        with lock:
+            errors["checkout_failed"] = errors.get("checkout_failed", 0) + args.ops
+        return
+    # 요청 1건 = 트랜잭션 1개 (autocommit이 안 먹는 연결이어도 아래에서 건마다 커밋/rollback)
+    conn.autocommit = True
+    cur = conn.cursor()
+    local_samples, local_errors = [], {}
+    try:
+        for i in range(args.ops):
+            user_id, user_plant_id = rng.choice(players)
+            func_name, cost_field = rng.choice(ACTIONS)
+            # dup_rate 확률로 다른 스레드와 겹칠 수 있는 키 사용 (중복 제출 재현)
+            if rng.random() < args.dup_rate:
+                idem_key = f"{prefix}-dup-{user_plant_id}-{rng.randrange(args.dup_keys)}"
+            else:
+                idem_key = f"{prefix}-{thread_no}-{i}"
+            params = (user_plant_id, step_ids[0], user_id, getattr(cfg, cost_field), cfg.version, idem_key)
+
+            started = time.perf_counter()
+            try:
+                cur.execute(f"SELECT * FROM {func_name}(%s, %s, %s, %s, %s, %s)", params)
+                cur.fetchone()
+                conn.commit()
+                outcome = "ok"
+            except psycopg2.Error as e:
+                conn.rollback()
+                outcome = e.pgcode or "error"
+            local_samples.append((time.perf_counter() - started) * 1000)
+            local_errors[outcome] = local_errors.get(outcome, 0) + 1
+    finally:
+        conn.close()
+
+    with lock:
+        samples.extend(local_samples)
+        for code, count in local_errors.items():
+            errors[code] = errors.get(code, 0) + count
+
+
+def verify(cur, prefix):
+    """불변식 확인 -> (위반 목록, 커밋된 transaction_log 행 수)"""
+    problems = []
+    cur.execute("""
+        SELECT u.user_id, u.points, %s + COALESCE(SUM(t.amount), 0)
+        FROM user_account u
+        LEFT JOIN transaction_log t ON t.user_id = u.user_id
+        WHERE u.login_id LIKE %s
+        GROUP BY u.user_id, u.points
+    """, (START_POINTS, prefix + "-%"))
+    for user_id, points, expected in cur.fetchall():
+        if points != expected:
+            problems.append(f"user {user_id}: points {points} != start + log {expected}")
+        if points < 0:
+            problems.append(f"user {user_id}: negative balance {points}")
+
+    # 멱등 키 1개당 원장 반영 1건: point_request의 반영 금액 합 = transaction_log 합
+    cur.execute("""
+        SELECT
+            (SELECT COALESCE(SUM(r.amount), 0) FROM point_request r
+             JOIN user_account u ON u.user_id = r.user_id
+             WHERE u.login_id LIKE %s AND r.balance_after IS NOT NULL),
+            (SELECT COALESCE(SUM(t.amount), 0) FROM transaction_log t
+             JOIN user_account u ON u.user_id = t.user_id
+             WHERE u.login_id LIKE %s)
+    """, (prefix + "-%", prefix + "-%"))
+    by_key, by_log = cur.fetchone()
+    if by_key != by_log:
+        problems.append(f"idempotency: point_request sum {by_key} != transaction_log sum {by_log}")
+
+    # 아무것도 커밋되지 않았으면 위 검사는 손대지 않은 잔액끼리 비교한 것이라 의미가 없음
+    cur.execute("""
+        SELECT COUNT(*) FROM transaction_log t JOIN user_account u ON u.user_id = t.user_id
+        WHERE u.login_id LIKE %s
+    """, (prefix + "-%",))
+    committed = cur.fetchone()[0]
+    if committed == 0:
+        problems.append("no transaction_log rows were committed")
+    return problems, committed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, help="기본: DB_POOL_MAX - 1 (메인 스레드가 커넥션 1개 사용)")
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--ops", type=int, default=500, help="스레드당 요청 수")
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--dup-keys", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+    if args.threads is None:
+        args.threads = max(1, get_pool().maxconn - 1)
+
+    conn = get_conn()
+    cur = conn.cursor()
+    prefix, _, step_ids, players = seed_players(cur, args.players, steps=5, points=START_POINTS, tag="ledger")
+    conn.commit()
+    cfg = game_config.load(conn)
+
+    samples, errors, lock = [], {}, threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(n, args, players, step_ids, cfg, prefix, samples, errors, lock))
+        for n in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    try:
+        problems, committed = verify(cur, prefix)
+    finally:
+        conn.rollback()
+        cur.execute("DELETE FROM point_request WHERE idempotency_key LIKE %s", (prefix + "-%",))
+        drop_fixture(cur, prefix)
+        conn.commit()
+        conn.close()
+
+    write_result(args.out, "ledger_stress", {
+        "threads": args.threads,
+        "players": args.players,
+        "requests": len(samples),
+        "committed_log_rows": committed,
+        "throughput_per_sec": round(len(samples) / elapsed, 1),
+        "outcomes": errors,
+        "latency_ms": percentiles(samples),
+        "problems": problems,
+    })
+    if problems or errors.get("checkout_failed"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
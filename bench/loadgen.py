@@ -0,0 +1,266 @@
+"""
+동시 접속 플레이어 부하 생성기 (로컬 PostgreSQL 대상)
+
+유저 N명과 식물 1종을 만들고, 플레이어마다 스레드 1개로
+로그인(auth.login_user) -> 식물 심기 -> 퀴즈(정답/오답) -> 부활 또는 초기화 -> 졸업하면 다시 심기
+를 think time 간격으로 반복함. 게임 액션은 engine.GameEngine으로 처리 (화면과 같은 경로).
+
+결과: 액션별 처리량 / p50·p95·p99 지연시간 / 결과별 건수(에러율), 락 대기 세션 수,
+커넥션 풀 대기, 데드락 수를 JSON으로 저장 (릴리스 간 비교용)
+실제로 커밋된 포인트 액션 수(committed_point_actions)도 함께 기록하고, 0이면 실패로 끝냄
+
+    DB_POOL_MAX=50 python -m bench.loadgen --players 50 --duration 60 --think-ms 500 --out loadgen.json
+
+풀 크기(DB_POOL_MAX)보다 플레이어가 많으면 풀 대기가 늘어나는 것까지 측정됨
+"""
+import argparse
+import random
+import threading
+import time
+
+import auth
+import engine
+import game_config
+import ledger
+from db import get_conn, pool_stats
+from bench.common import drop_fixture, percentiles, seed_players, write_result
+
+
+class Recorder:
+    """액션별 지연시간 + 결과 집계 (스레드 공용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.outcomes = {}
+
+    def record(self, action, elapsed_ms, outcome):
+        with self._lock:
+            self.samples.setdefault(action, []).append(elapsed_ms)
+            counts = self.outcomes.setdefault(action, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def timed(self, action, func, *args):
+        """func 실행 시간 기록, 결과가 ActionResult면 outcome, 예외면 예외 이름으로 집계"""
+        started = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            self.record(action, (time.perf_counter() - started) * 1000, type(e).__name__)
+            return None
+        outcome = getattr(result, "outcome", engine.OK)
+        self.record(action, (time.perf_counter() - started) * 1000, outcome)
+        return result
+
+    def summary(self, elapsed_sec):
+        report = {}
+        for action, samples in sorted(self.samples.items()):
+            counts = self.outcomes[action]
+            failed = sum(n for outcome, n in counts.items() if outcome != engine.OK)
+            report[action] = {
+                "per_sec": round(len(samples) / elapsed_sec, 2),
+                "error_rate": round(failed / len(samples), 4),
+                "outcomes": counts,
+                "latency_ms": percentiles(samples),
+            }
+        return report
+
+
+class LockMonitor(threading.Thread):
+    """interval초마다 락 대기 중인 세션 수를 샘플링"""
+
+    def __init__(self, interval):
+        super().__init__(name="loadgen-lock-monitor", daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        conn = get_conn()
+        conn.autocommit = True
+        try:
+            cur = conn.cursor()
+            while not self.stopped.wait(self.interval):
+                cur.execute("""
+                    SELECT COUNT(*) FROM pg_stat_activity
+                    WHERE datname = current_database() AND wait_event_type = 'Lock'
+                """)
+                self.samples.append(cur.fetchone()[0])
+                # pg_stat_activity는 트랜잭션 안에서 첫 조회 값이 고정되므로 샘플마다 트랜잭션을 끝냄
+                conn.commit()
+        finally:
+            conn.close()
+
+    def summary(self):
+        if not self.samples:
+            return {"samples": 0}
+        return {
+            "samples": len(self.samples),
+            "mean_waiting_sessions": round(sum(self.samples) / len(self.samples), 3),
+            "max_waiting_sessions": max(self.samples),
+            "share_of_samples_with_waits": round(sum(1 for n in self.samples if n) / len(self.samples), 3),
+        }
+
+
+def db_counters():
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT xact_commit, xact_rollback, deadlocks
+            FROM pg_stat_database WHERE datname = current_database()
+        """)
+        commits, rollbacks, deadlocks = cur.fetchone()
+        return {"xact_commit": commits, "xact_rollback": rollbacks, "deadlocks": deadlocks}
+    finally:
+        conn.close()
+
+
+def committed_actions(prefix):
+    """부하 중 실제로 커밋된 포인트 액션 수 (멱등 키마다 point_request 1행)"""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT COUNT(*) FROM point_request r JOIN user_account u ON u.user_id = r.user_id
+            WHERE u.login_id LIKE %s
+        """, (prefix + "-%",))
+        return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def plant(user_id, species_id):
+    """도감의 '키우기 시작'과 같은 INSERT (졸업한 식물이 있으면 지우고 다시 심음)"""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM user_plant WHERE user_id = %s AND species_id = %s", (user_id, species_id))
+        cur.execute("INSERT INTO user_plant(user_id, species_id) VALUES (%s, %s)", (user_id, species_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def player(login_id, species_id, args, deadline, rec, rng):
+    eng = engine.default_engine()
+
+    def think():
+        if args.think_ms:
+            time.sleep(rng.expovariate(1000 / args.think_ms))
+
+    user = rec.timed("login", auth.login_user, login_id, "bench")
+    if not user:
+        return
+    user_id = user["user_id"]
+    rec.timed("plant", plant, user_id, species_id)
+
+    failed_high = False
+    while time.monotonic() < deadline:
+        think()
+        plants = rec.timed("load_plants", eng.get_user_plants, user_id)
+        if not plants:
+            continue
+        p = plants[0]
+        if p.is_completed:
+            rec.timed("plant", plant, user_id, species_id)
+            continue
+        quiz = eng.get_quiz(p.species_id, p.current_step)
+        if quiz is None:
+            break
+        cfg = game_config.current()
+        req = engine.ActionRequest(user_id, p.user_plant_id, quiz.step_id, cfg,
+                                   ledger.plant_action_key(p.user_plant_id, p.action_seq))
+
+        if failed_high:
+            # 2단계 이상 오답 후 선택지: 부활 또는 무료 초기화
+            if rng.random() < args.rescue_rate:
+                rec.timed("rescue", eng.rescue, req)
+            else:
+                rec.timed("reset", eng.reset, req)
+            failed_high = False
+            continue
+
+        if rng.random() < args.correct_rate:
+            rec.timed("answer_correct", eng.answer_correct, req)
+            if rng.random() < args.double_submit:
+                # 같은 키로 한 번 더 제출 (중복 제출 재현, outcome=duplicate가 정상)
+                rec.timed("double_submit", eng.answer_correct, req)
+        elif p.current_step == 1:
+            rec.timed("step1_penalty", eng.step1_penalty, req)
+        else:
+            failed_high = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="측정 시간(초)")
+    parser.add_argument("--think-ms", type=float, default=500, help="액션 사이 평균 대기(ms, 지수분포), 0이면 대기 없음")
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--correct-rate", type=float, default=0.7)
+    parser.add_argument("--rescue-rate", type=float, default=0.5)
+    parser.add_argument("--double-submit", type=float, default=0.0, help="정답 제출을 한 번 더 보내는 비율")
+    parser.add_argument("--lock-sample-sec", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-data", action="store_true", help="끝난 뒤 생성한 유저/식물을 지우지 않음")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    cur = conn.cursor()
+    prefix, species_id, _, players = seed_players(cur, args.players, steps=args.steps, tag="load", plant=False)
+    conn.commit()
+    conn.close()
+
+    rec = Recorder()
+    monitor = LockMonitor(args.lock_sample_sec)
+    before = db_counters()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(
+            target=player,
+            args=(f"{prefix}-{n}", species_id, args, deadline, rec, random.Random(args.seed + n)),
+            name=f"player-{n}",
+        )
+        for n in range(1, len(players) + 1)
+    ]
+    started = time.monotonic()
+    monitor.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+    monitor.stopped.set()
+    monitor.join()
+    after = db_counters()
+    committed = committed_actions(prefix)
+
+    if not args.keep_data:
+        conn = get_conn()
+        cur = conn.cursor()
+        drop_fixture(cur, prefix)
+        conn.commit()
+        conn.close()
+
+    actions = rec.summary(elapsed)
+    total = sum(len(s) for s in rec.samples.values())
+    write_result(args.out, "loadgen", {
+        "players": args.players,
+        "duration_sec": round(elapsed, 2),
+        "think_ms": args.think_ms,
+        "total_actions": total,
+        "actions_per_sec": round(total / elapsed, 2),
+        "committed_point_actions": committed,
+        "actions": actions,
+        "lock_waits": monitor.summary(),
+        "db": {key: after[key] - before[key] for key in after},
+        "pool": pool_stats(),
+    })
+    if total and not committed:
+        raise SystemExit("커밋된 포인트 액션이 없습니다 (측정한 작업이 모두 rollback됨)")
+
+
+if __name__ == "__main__":
+    main()
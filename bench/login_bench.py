@@ -0,0 +1,96 @@
+"""
+로그인(비밀번호 검증) 처리량 벤치마크
+
+- hash_cost: 현재 argon2 파라미터로 검증 1회에 걸리는 시간 (한 코어, 풀 없이)
+- storm: --threads개 스레드가 --duration초 동안 auth.login_user를 계속 호출 (수업 시작 직후 로그인 폭주)
+  -> 로그인/초, 작업 프로세스 1개(=코어 1개)당 로그인/초, 지연시간, 대기열 초과(PasswordBusy) 수
+- 작업 프로세스 수는 PASSWORD_WORKERS 환경 변수로 바꿔 가며 측정
+
+    PASSWORD_WORKERS=4 python -m bench.login_bench --users 200 --threads 32 --duration 20 --out login_bench.json
+"""
+import argparse
+import random
+import threading
+import time
+
+import auth
+import passwords
+from db import get_conn
+from bench.common import drop_fixture, percentiles, seed_players, timed, write_result
+
+PASSWORD = "bench"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--samples", type=int, default=20, help="hash_cost 측정 횟수")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    stored = passwords.hash_password(PASSWORD)
+    hash_cost = percentiles([timed(passwords.check, stored, PASSWORD)[1] for _ in range(args.samples)])
+
+    conn = get_conn()
+    cur = conn.cursor()
+    prefix, _, _, _ = seed_players(cur, args.users, plant=False)
+    # 모두 이미 해시된 상태에서 측정 (평문 -> 해시 전환은 첫 로그인 한 번뿐이라 제외)
+    cur.execute("UPDATE user_account SET password_hash = %s WHERE login_id LIKE %s", (stored, prefix + "-%"))
+    conn.commit()
+    login_ids = [f"{prefix}-{n}" for n in range(1, args.users + 1)]
+
+    latencies, failures = [], {"busy": 0, "wrong": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = []
+        while time.monotonic() < deadline:
+            try:
+                user, ms = timed(auth.login_user, rng.choice(login_ids), PASSWORD)
+            except passwords.PasswordBusy:
+                with lock:
+                    failures["busy"] += 1
+                continue
+            local.append(ms)
+            if user is None:
+                with lock:
+                    failures["wrong"] += 1
+        with lock:
+            latencies.extend(local)
+
+    try:
+        passwords.verify(stored, PASSWORD)  # 작업 프로세스 띄우기
+        started = time.monotonic()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+    finally:
+        drop_fixture(cur, prefix)
+        conn.commit()
+        conn.close()
+
+    per_sec = len(latencies) / elapsed
+    workers = max(1, passwords.WORKERS)
+    write_result(args.out, "login_storm", {
+        "workers": passwords.WORKERS,
+        "queue_max": passwords.QUEUE_MAX,
+        "threads": args.threads,
+        "hash_cost_ms": hash_cost,
+        "logins": len(latencies),
+        "logins_per_sec": round(per_sec, 1),
+        "logins_per_sec_per_core": round(per_sec / workers, 1),
+        "latency_ms": percentiles(latencies),
+        "failures": failures,
+        "pool": passwords.stats(),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+SQL 실행 계획 회귀 검사
+
+앱 모듈에 들어 있는 SQL 문자열을 모두 모아(AST) 큰 합성 DB(bench.datagen)에서
+EXPLAIN (ANALYZE, BUFFERS)를 실행하고, 아래 중 하나라도 걸리면 실패(종료 코드 1)로 처리함
+- 큰 테이블(--large-rows 이상)에 Seq Scan (기준 파일에서 허용한 테이블 제외)
+- 예상 행 수와 실제 행 수 차이가 --row-ratio배 이상
+- 실행 시간이 기준 파일(plan_baseline.json)의 max_ms 초과
+
+    python -m bench.datagen --scale medium
+    python -m bench.plan_check                       # 검사
+    python -m bench.plan_check --update-baseline     # 현재 결과로 기준 갱신 (실행 시간 x2, 최소 5ms)
+    python -m bench.plan_check --list                # 수집된 SQL 목록만 출력
+
+파라미터(%s)는 PREPARE로 타입을 알아낸 뒤 타입별 예시 값(--int-value 등)으로 채움.
+INSERT/UPDATE/DELETE도 실제로 실행되므로 문장마다 트랜잭션 안에서 실행하고 ROLLBACK 함.
+"""
+import argparse
+import ast
+import datetime
+import hashlib
+import json
+import os
+import re
+
+from db import get_conn
+from sqltrace import normalize_sql
+from bench.common import write_result
+
+MODULES = ["plant.py", "game.py", "engine.py", "catalog.py", "game_config.py", "expert.py",
+           "content_mgr.py", "admin.py", "dashboard.py", "auth.py", "app.py"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plan_baseline.json")
+SQL_START = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+
+
+class Statement:
+    def __init__(self, module, func, line, sql):
+        self.module = module
+        self.func = func
+        self.line = line
+        self.sql = sql
+        digest = hashlib.sha1(normalize_sql(sql).encode("utf-8")).hexdigest()[:8]
+        # 줄 번호는 코드가 바뀌면 밀리므로 id는 함수 이름 + SQL 모양으로
+        self.id = f"{module}:{func}:{digest}"
+
+
+def collect_module(path):
+    """모듈 안의 SQL 문자열 상수 -> [Statement] (f-string 등 동적으로 만든 SQL은 제외)"""
+    module = os.path.basename(path)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    found = []
+
+    def visit(node, func):
+        if isinstance(node, ast.JoinedStr):
+            # f-string 조각은 완전한 SQL이 아님 -> collect_dynamic에서 처리
+            return
+        for child in ast.iter_child_nodes(node):
+            name = child.name if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) else func
+            if isinstance(child, ast.Constant) and isinstance(child.value, str) and SQL_START.match(child.value):
+                found.append(Statement(module, func, child.lineno, child.value))
+            visit(child, name)
+
+    visit(tree, "<module>")
+    return found
+
+
+def collect_dynamic():
+    """문자열 상수가 아닌, 함수로 조립하는 SQL (대표 입력으로 생성)"""
+    import audit
+    import moderation
+    import plant
+    import rollup
+
+    statements = []
+    for term, difficulty, sort_option, after in [
+        ("", None, "이름순 (가나다)", None),
+        ("", None, "이름순 (가나다)", ("몬스테라", 1)),
+        ("몬스", None, plant.RELEVANCE_SORT, None),
+        ("ㅁㅅ", 3, "게임 난이도 낮은순", None),
+    ]:
+        sql, params = plant.build_catalog_query(term, difficulty, sort_option, after, plant.DEFAULT_PAGE_SIZE)
+        stmt = Statement("plant.py", "build_catalog_query", 0, sql)
+        stmt.params = list(params)
+        statements.append(stmt)
+
+    for granularity, group_by in [("hour", "type"), ("day", "department")]:
+        sql, params = rollup.series_query(granularity, group_by, rollup.MAX_DAYS, types=["QUIZ_REWARD"])
+        stmt = Statement("rollup.py", "series_query", 0, sql)
+        stmt.params = list(params)
+        statements.append(stmt)
+
+    key = (datetime.datetime(2025, 6, 1), 1000)
+    for flt, after, direction in [
+        (audit.AuditFilter(), None, "next"),
+        (audit.AuditFilter(), key, "next"),
+        (audit.AuditFilter(action_types=["HIDE_TIP_REPORT"]), key, "prev"),
+        (audit.AuditFilter(admin_id=1), None, "next"),
+        (audit.AuditFilter(target_id=1), None, "next"),
+        (audit.AuditFilter(search="숨김"), None, "next"),
+    ]:
+        sql, params = audit.build_page_query(flt, after, direction)
+        stmt = Statement("audit.py", "build_page_query", 0, sql)
+        stmt.params = list(params)
+        statements.append(stmt)
+
+    # moderation은 cursor를 받아 바로 실행하므로 SQL만 가로챔
+    class Capture:
+        def execute(self, sql, params):
+            stmt = Statement("moderation.py", func, 0, sql)
+            stmt.params = list(params)
+            statements.append(stmt)
+
+        def fetchall(self):
+            return []
+
+    for func, flt in [("report_queue", moderation.TipFilter()), ("tip_list", moderation.TipFilter()),
+                      ("tip_list", moderation.TipFilter(species_id=1, hidden=False)),
+                      ("tip_list", moderation.TipFilter(expert_id=1))]:
+        getattr(moderation, func)(Capture(), flt, (datetime.datetime(2025, 6, 1), 1000))
+
+    where, params = plant.build_filter("몬스", None)
+    stmt = Statement("plant.py", "estimate_total", 0, f"SELECT COUNT(*) FROM plant_species {where}")
+    stmt.params = list(params)
+    statements.append(stmt)
+    return statements
+
+
+def collect():
+    statements = []
+    for name in MODULES:
+        path = os.path.join(ROOT, name)
+        if os.path.exists(path):
+            statements.extend(collect_module(path))
+    statements.extend(collect_dynamic())
+    # 같은 함수의 같은 SQL은 한 번만
+    unique = {}
+    for stmt in statements:
+        unique.setdefault(stmt.id, stmt)
+    return list(unique.values())
+
+
+def to_prepared(sql):
+    """psycopg2 %s 자리표시자 -> $1, $2 ... (%% -> %)"""
+    counter = iter(range(1, 1000))
+    sql = re.sub(r"%s", lambda _: f"${next(counter)}", sql)
+    return sql.replace("%%", "%")
+
+
+def sample_value(pg_type, args):
+    if pg_type in ("integer", "bigint", "smallint", "numeric"):
+        return args.int_value
+    if pg_type == "boolean":
+        return False
+    if pg_type.startswith("timestamp") or pg_type == "date":
+        return "2025-06-01"
+    if pg_type.endswith("[]"):
+        return "{%s}" % args.int_value
+    return args.text_value
+
+
+def walk(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def explain(cur, stmt, args):
+    """-> (plan JSON, 실행 시간 ms), 문장마다 트랜잭션을 rollback으로 끝냄 (psycopg2가 첫 문장에서 BEGIN)"""
+    try:
+        cur.execute("DEALLOCATE ALL")
+        cur.execute(f"PREPARE plan_check_stmt AS {to_prepared(stmt.sql)}")
+        cur.execute("SELECT parameter_types::text[] FROM pg_prepared_statements WHERE name = 'plan_check_stmt'")
+        types = cur.fetchone()[0] or []
+        params = getattr(stmt, "params", None) or [sample_value(t, args) for t in types]
+        placeholders = ", ".join(["%s"] * len(params))
+        execute = f"EXECUTE plan_check_stmt({placeholders})" if params else "EXECUTE plan_check_stmt"
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {execute}", params)
+        result = cur.fetchone()[0][0]
+    finally:
+        cur.connection.rollback()
+    return result["Plan"], result["Execution Time"]
+
+
+def table_sizes(cur):
+    cur.execute("""
+        SELECT c.relname, c.reltuples::bigint FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')
+    """)
+    return dict(cur.fetchall())
+
+
+def check(stmt, plan, runtime_ms, sizes, baseline, args):
+    """계획 -> 문제 목록"""
+    problems = []
+    allowed = set(baseline.get("allow_seq_scan", []))
+    for node in walk(plan):
+        relation = node.get("Relation Name")
+        if node["Node Type"] == "Seq Scan" and relation not in allowed and sizes.get(relation, 0) >= args.large_rows:
+            problems.append(f"Seq Scan on {relation} ({sizes[relation]:,} rows)")
+        estimated = node.get("Plan Rows", 0)
+        actual = node.get("Actual Rows", 0) * max(node.get("Actual Loops", 1), 1)
+        low, high = sorted((max(estimated, 1), max(actual, 1)))
+        if high / low >= args.row_ratio and high >= args.min_rows_for_ratio:
+            problems.append(f"row estimate {estimated:,} vs actual {actual:,} at {node['Node Type']}"
+                            + (f" on {relation}" if relation else ""))
+    max_ms = baseline.get("max_ms")
+    if max_ms is not None and runtime_ms > max_ms:
+        problems.append(f"runtime {runtime_ms:.1f}ms > baseline {max_ms:.1f}ms")
+    return problems
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--only", help="id에 이 문자열이 들어간 문장만 (예: expert.py)")
+    parser.add_argument("--large-rows", type=int, default=100_000, help="이 행 수 이상이면 큰 테이블")
+    parser.add_argument("--row-ratio", type=float, default=100)
+    parser.add_argument("--min-rows-for-ratio", type=int, default=1000)
+    parser.add_argument("--int-value", type=int, default=1)
+    parser.add_argument("--text-value", default="몬스테라")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    statements = [s for s in collect() if not args.only or args.only in s.id]
+    if args.list:
+        for stmt in statements:
+            print(f"{stmt.id}  (line {stmt.line})\n    {normalize_sql(stmt.sql)[:160]}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    conn = get_conn()
+    cur = conn.cursor()
+    sizes = table_sizes(cur)
+    conn.rollback()
+
+    results, failures = {}, 0
+    try:
+        for stmt in statements:
+            entry = baseline.get(stmt.id, {})
+            try:
+                plan, runtime_ms = explain(cur, stmt, args)
+            except Exception as e:
+                results[stmt.id] = {"error": str(e).strip(), "line": stmt.line}
+                failures += 1
+                continue
+            problems = check(stmt, plan, runtime_ms, sizes, entry, args)
+            if problems and not args.update_baseline:
+                failures += 1
+            results[stmt.id] = {
+                "line": stmt.line,
+                "runtime_ms": round(runtime_ms, 3),
+                "plan_root": plan["Node Type"],
+                "shared_hit": plan.get("Shared Hit Blocks"),
+                "shared_read": plan.get("Shared Read Blocks"),
+                "problems": problems,
+            }
+            if args.update_baseline:
+                entry["max_ms"] = round(max(runtime_ms * 2, 5.0), 1)
+                baseline[stmt.id] = entry
+    finally:
+        conn.close()
+
+    for stmt_id, result in results.items():
+        status = "ERROR" if "error" in result else "FAIL" if result["problems"] else "ok"
+        print(f"[{status:5}] {stmt_id} {result.get('runtime_ms', '')}")
+        for problem in result.get("problems", []) + ([result["error"]] if "error" in result else []):
+            print(f"        - {problem}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(baseline.items())), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"baseline updated: {args.baseline}")
+
+    if args.out:
+        write_result(args.out, "plan_check", {
+            "statements": len(statements),
+            "failures": failures,
+            "table_rows": {k: v for k, v in sizes.items() if v >= args.large_rows},
+            "results": results,
+        })
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+퀴즈 처리 지연시간 벤치마크: 기존(문장별 왕복) vs DB 함수 1회 호출
+
+    python -m bench.quiz_bench --iterations 500 --out quiz_bench.json
+
+기존 방식은 변경 전 game.py의 process_correct_answer / apply_rescue_option 쿼리 순서를 그대로 재현함
+"""
+import argparse
+
+import game_config
+from db import get_conn
+from bench.common import drop_fixture, percentiles, seed_players, timed, write_result
+
+
+def legacy_correct(conn, user_plant_id, step_id, user_id, reward):
+    cur = conn.cursor()
+    cur.execute("INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct) VALUES (%s, %s, true)", (user_plant_id, step_id))
+    cur.execute("SELECT config_value FROM game_config WHERE config_key = %s", ('quiz_reward',))
+    cur.fetchone()
+    cur.execute("UPDATE user_account SET points = points + %s WHERE user_id = %s", (reward, user_id))
+    cur.execute("INSERT INTO transaction_log(user_id, transaction_type, amount) VALUES (%s, 'QUIZ_REWARD', %s)", (user_id, reward))
+    cur.execute("SELECT MAX(step_order) FROM species_step WHERE species_id = (SELECT species_id FROM species_step WHERE step_id=%s)", (step_id,))
+    max_step = cur.fetchone()[0]
+    cur.execute("SELECT step_order FROM species_step WHERE step_id=%s", (step_id,))
+    current_ord = cur.fetchone()[0]
+    if current_ord < max_step:
+        cur.execute("UPDATE user_plant SET current_step = current_step + 1 WHERE user_plant_id = %s", (user_plant_id,))
+    else:
+        cur.execute("UPDATE user_plant SET is_completed = true WHERE user_plant_id = %s", (user_plant_id,))
+    conn.commit()
+
+
+def legacy_rescue(conn, user_plant_id, step_id, user_id, cost):
+    cur = conn.cursor()
+    cur.execute("SELECT config_value FROM game_config WHERE config_key = %s", ('revive_cost',))
+    cur.fetchone()
+    cur.execute("SELECT points FROM user_account WHERE user_id=%s", (user_id,))
+    cur.fetchone()
+    cur.execute("UPDATE user_account SET points = points - %s WHERE user_id = %s", (cost, user_id))
+    cur.execute("INSERT INTO transaction_log(user_id, transaction_type, amount) VALUES (%s, 'FORCE_PASS', %s)", (user_id, -cost))
+    cur.execute("SELECT species_id, current_step FROM user_plant WHERE user_plant_id = %s", (user_plant_id,))
+    species_id, current_step = cur.fetchone()
+    cur.execute("SELECT MAX(step_order) FROM species_step WHERE species_id = %s", (species_id,))
+    max_step = cur.fetchone()[0]
+    cur.execute("INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct, used_continue) VALUES (%s, %s, false, true)", (user_plant_id, step_id))
+    if current_step >= max_step:
+        cur.execute("UPDATE user_plant SET is_completed = true WHERE user_plant_id = %s", (user_plant_id,))
+    else:
+        cur.execute("UPDATE user_plant SET current_step = current_step + 1 WHERE user_plant_id = %s", (user_plant_id,))
+    conn.commit()
+
+
+def function_call(conn, func_name, args):
+    cur = conn.cursor()
+    cur.execute(f"SELECT * FROM {func_name}({', '.join(['%s'] * len(args))})", args)
+    cur.fetchone()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    cur = conn.cursor()
+    prefix, _, step_ids, players = seed_players(cur, 1, steps=2)
+    conn.commit()
+    user_id, user_plant_id = players[0]
+    cfg = game_config.load(conn)
+
+    def reset_plant():
+        conn.autocommit = False
+        cur.execute("UPDATE user_plant SET current_step = 1, is_completed = FALSE WHERE user_plant_id = %s", (user_plant_id,))
+        conn.commit()
+
+    samples = {"legacy_correct": [], "function_correct": [], "legacy_rescue": [], "function_rescue": []}
+    try:
+        for _ in range(args.iterations):
+            reset_plant()
+            samples["legacy_correct"].append(timed(legacy_correct, conn, user_plant_id, step_ids[0], user_id, cfg.quiz_reward)[1])
+            reset_plant()
+            samples["legacy_rescue"].append(timed(legacy_rescue, conn, user_plant_id, step_ids[0], user_id, cfg.revive_cost)[1])
+
+            # 함수 방식은 game.call_game_function과 같이 autocommit으로 1회 왕복
+            reset_plant()
+            conn.autocommit = True
+            samples["function_correct"].append(timed(
+                function_call, conn, "pium_answer_correct",
+                (user_plant_id, step_ids[0], user_id, cfg.quiz_reward, cfg.version))[1])
+            reset_plant()
+            conn.autocommit = True
+            samples["function_rescue"].append(timed(
+                function_call, conn, "pium_rescue",
+                (user_plant_id, step_ids[0], user_id, cfg.revive_cost, cfg.version))[1])
+    finally:
+        conn.rollback()
+        conn.autocommit = False
+        drop_fixture(cur, prefix)
+        conn.commit()
+        conn.close()
+
+    write_result(args.out, "quiz_actions", {
+        "iterations": args.iterations,
+        "latency_ms": {name: percentiles(values) for name, values in samples.items()},
+    })
+
+
+if __name__ == "__main__":
+    main()
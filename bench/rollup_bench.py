@@ -0,0 +1,86 @@
+"""
+포인트 흐름 롤업 벤치마크
+
+- catch_up: 밀린 transaction_log를 롤업에 반영하는 처리량 (행/초)
+- series: 최근 --days일 시계열 조회 - 롤업 테이블 vs 원본 transaction_log 집계
+
+    python -m bench.datagen --scale large --truncate
+    python -m bench.rollup_bench --days 90 --out rollup_bench.json
+"""
+import argparse
+
+import rollup
+from db import get_conn
+from bench.common import percentiles, timed, write_result
+
+# 같은 결과를 원본에서 바로 집계 (비교용)
+RAW_SQL = {
+    "hour": """
+        SELECT date_trunc('hour', l.logged_at) AS bucket, l.transaction_type AS grp,
+               SUM(l.amount) FILTER (WHERE l.amount > 0), -SUM(l.amount) FILTER (WHERE l.amount < 0), COUNT(*)
+        FROM transaction_log l
+        WHERE l.logged_at >= CURRENT_DATE - %s AND l.transaction_type = ANY(%s)
+        GROUP BY 1, 2 ORDER BY 1, 2
+    """,
+    "day": """
+        SELECT l.logged_at::date AS bucket, COALESCE(u.department, '(미지정)') AS grp,
+               SUM(l.amount) FILTER (WHERE l.amount > 0), -SUM(l.amount) FILTER (WHERE l.amount < 0), COUNT(*)
+        FROM transaction_log l LEFT JOIN user_account u ON u.user_id = l.user_id
+        WHERE l.logged_at >= CURRENT_DATE - %s AND l.transaction_type = ANY(%s)
+        GROUP BY 1, 2 ORDER BY 1, 2
+    """,
+}
+GROUP_BY = {"hour": "type", "day": "department"}
+
+
+def run(cur, sql, params):
+    cur.execute(sql, params)
+    return len(cur.fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=rollup.MAX_DAYS)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--raw-repeat", type=int, default=3, help="원본 집계는 느리므로 반복 수를 따로")
+    parser.add_argument("--batch", type=int, default=rollup.BATCH)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    types = ["QUIZ_REWARD", "PENALTY_STEP1", "FORCE_PASS"]
+    catch_up = rollup.catch_up(batch=args.batch, settle_sec=0)
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM transaction_log")
+        raw_rows = cur.fetchone()[0]
+        series = {}
+        for granularity in ("hour", "day"):
+            sql, params = rollup.series_query(granularity, GROUP_BY[granularity], args.days, types)
+            rows = run(cur, sql, params)
+            series[granularity] = {
+                "group_by": GROUP_BY[granularity],
+                "result_rows": rows,
+                "rollup_ms": percentiles([timed(run, cur, sql, params)[1] for _ in range(args.repeat)]),
+                "raw_ms": percentiles([
+                    timed(run, cur, RAW_SQL[granularity], (args.days - 1, types))[1] for _ in range(args.raw_repeat)
+                ]),
+            }
+        conn.rollback()
+    finally:
+        conn.close()
+
+    write_result(args.out, "points_rollup", {
+        "transaction_log_rows": raw_rows,
+        "days": args.days,
+        "catch_up": {
+            **catch_up._asdict(),
+            "rows_per_sec": round(catch_up.rows / (catch_up.elapsed_ms / 1000), 1) if catch_up.elapsed_ms else None,
+        },
+        "series": series,
+    })
+
+
+if __name__ == "__main__":
+    main()
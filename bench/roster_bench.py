@@ -0,0 +1,78 @@
+"""
+명단 일괄 가입(roster.py) 벤치마크
+
+--students명 명단을 만들어 한 번에 가입시키고 걸린 시간을 기록 (기존 방식인 auth.register_user
+한 명씩 가입과 비교하려면 --compare N: N명을 한 명씩 가입시킨 시간에서 전체 예상 시간을 계산)
+만든 계정은 끝나면 모두 삭제
+
+    python -m bench.roster_bench --students 10000 --out roster_bench.json
+"""
+import argparse
+import time
+import uuid
+
+import roster
+from db import get_conn
+from bench.common import drop_fixture, write_result
+
+
+def make_rows(tag, count):
+    return [(n + 2, f"{tag}{n:07d}", f"학생{n}", "bench") for n in range(count)]
+
+
+def one_by_one(conn, prefix, rows):
+    """auth.register_user와 같은 순서: 중복 ID SELECT -> INSERT -> 커밋 (한 명씩)"""
+    cur = conn.cursor()
+    for _, student_id, name, department in rows:
+        login_id = f"{prefix}{student_id}"
+        cur.execute("SELECT 1 FROM user_account WHERE login_id = %s", (login_id,))
+        if cur.fetchone() is None:
+            cur.execute("""
+                INSERT INTO user_account (login_id, password_hash, student_id, name, department, role, points)
+                VALUES (%s, 'bench', %s, %s, %s, 'User', 1000)
+            """, (login_id, student_id, name, department))
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--compare", type=int, default=0, help="한 명씩 가입을 이 인원만큼 측정")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    tag = uuid.uuid4().hex[:6]
+    rows = make_rows(tag, args.students)
+    conn = get_conn()
+    try:
+        result = roster.enroll(conn, rows, prefix=prefix + "-")
+        # 같은 명단을 다시 넣으면 모두 EXISTS (중복 검사만의 비용)
+        again = roster.enroll(conn, rows, prefix=prefix + "-")
+
+        single = None
+        if args.compare:
+            sample = make_rows(tag + "s", args.compare)
+            started = time.perf_counter()
+            one_by_one(conn, prefix + "-", sample)
+            per_user_ms = (time.perf_counter() - started) * 1000 / args.compare
+            single = {"users": args.compare, "per_user_ms": round(per_user_ms, 3),
+                      "estimated_total_ms": round(per_user_ms * args.students, 1)}
+    finally:
+        cur = conn.cursor()
+        drop_fixture(cur, prefix)
+        conn.commit()
+        conn.close()
+
+    write_result(args.out, "roster_enroll", {
+        "students": args.students,
+        "counts": result.counts,
+        "elapsed_ms": result.elapsed_ms,
+        "students_per_sec": round(args.students / (result.elapsed_ms / 1000), 1) if result.elapsed_ms else None,
+        "recheck_ms": again.elapsed_ms,
+        "one_by_one": single,
+    })
+
+
+if __name__ == "__main__":
+    main()
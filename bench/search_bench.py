@@ -0,0 +1,114 @@
+"""
+도감 이름 검색 벤치마크 (기존 LIKE 순차 스캔 vs pg_trgm GIN + 초성 키)
+
+임시 테이블 plant_species(세션 전용, 실제 테이블을 가림)에 식물 N건을 만들고
+plant.build_catalog_query가 만드는 실제 검색 쿼리의 지연시간을 측정함
+
+    python -m bench.search_bench --rows 100000 --out search_bench.json
+"""
+import argparse
+import io
+import random
+import time
+
+from db import get_conn
+from hangul import choseong_key
+from plant import RELEVANCE_SORT, build_catalog_query
+from bench.common import percentiles, write_result
+
+SYLLABLES = list("몬스테라고무나무산세베리아스킨답서스필로덴드론알로카시아칼라데아"
+                 "선인장다육이장미국화수국라벤더로즈마리바질민트레몬토마토딸기블루베리")
+SUFFIXES = ["", "", "", " 미니", " 화이트", " 골드", " 바리에가타", " 자이언트"]
+
+
+def make_name(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))) + rng.choice(SUFFIXES)
+
+
+def load_species(cur, rows, seed):
+    """임시 plant_species 테이블에 COPY로 rows건 적재, 생성된 이름 목록 반환"""
+    rng = random.Random(seed)
+    cur.execute("CREATE TEMP TABLE plant_species (LIKE public.plant_species INCLUDING DEFAULTS) ON COMMIT DROP")
+    buf = io.StringIO()
+    names = []
+    for i in range(1, rows + 1):
+        name = f"{make_name(rng)} {i}"
+        names.append(name)
+        buf.write(f"{i}\t{name}\t{choseong_key(name)}\tleaf\t{rng.randint(1, 5)}\tMid\n")
+    buf.seek(0)
+    cur.copy_expert(
+        "COPY plant_species (species_id, common_name, search_key, category, difficulty, sun_level) FROM STDIN",
+        buf,
+    )
+    cur.execute("ANALYZE plant_species")
+    return names
+
+
+def make_terms(names, count, seed):
+    """부분 문자열 / 초성 / 오타(한 글자 바꿈) 검색어"""
+    rng = random.Random(seed + 1)
+    terms = {"substring": [], "choseong": [], "typo": []}
+    for _ in range(count):
+        base = rng.choice(names).split()[0]
+        start = rng.randint(0, max(0, len(base) - 3))
+        part = base[start:start + 3]
+        terms["substring"].append(part)
+        terms["choseong"].append(choseong_key(part))
+        pos = rng.randrange(len(base))
+        terms["typo"].append(base[:pos] + rng.choice(SYLLABLES) + base[pos + 1:])
+    return terms
+
+
+def run_queries(cur, queries, repeat):
+    samples = []
+    for _ in range(repeat):
+        for sql, params in queries:
+            started = time.perf_counter()
+            cur.execute(sql, params)
+            cur.fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--terms", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        names = load_species(cur, args.rows, args.seed)
+        terms = make_terms(names, args.terms, args.seed)
+        results = {}
+
+        # 1. 기존 방식: LIKE '%검색어%' (btree 인덱스 사용 불가 -> 순차 스캔)
+        legacy = [
+            ("SELECT species_id, common_name FROM plant_species WHERE common_name LIKE %s ORDER BY common_name", (f"%{t}%",))
+            for t in terms["substring"]
+        ]
+        results["legacy_like_seqscan"] = run_queries(cur, legacy, args.repeat)
+
+        # 2. trgm GIN 인덱스 생성 후 실제 검색 쿼리 (유사도 정렬 + 첫 페이지)
+        cur.execute("CREATE INDEX ON plant_species USING gin (common_name gin_trgm_ops)")
+        cur.execute("CREATE INDEX ON plant_species USING gin (search_key gin_trgm_ops)")
+        cur.execute("ANALYZE plant_species")
+        for kind, kind_terms in terms.items():
+            queries = []
+            for t in kind_terms:
+                sql, params = build_catalog_query(t, None, RELEVANCE_SORT, None, 20)
+                queries.append((sql, tuple(params)))
+            results[f"trgm_{kind}"] = run_queries(cur, queries, args.repeat)
+    finally:
+        conn.rollback()
+        conn.close()
+
+    write_result(args.out, "search", {"rows": args.rows, "terms": args.terms, "latency_ms": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+관리자 대시보드 통계: 원본 VIEW vs 스냅샷(MATERIALIZED VIEW) 벤치마크
+
+- dashboard: 대시보드 한 번 그릴 때의 통계 조회 3개를 원본 VIEW / 스냅샷으로 각각 --repeat번
+- refresh: 스냅샷별 REFRESH (일반 / CONCURRENTLY) 걸린 시간
+- read_during_refresh: 갱신하는 동안 다른 연결에서 스냅샷을 읽는 지연시간
+  (일반 REFRESH는 ACCESS EXCLUSIVE 락으로 조회가 막히고, CONCURRENTLY는 막히지 않음)
+
+사용자 100만 명 기준 측정:
+    python -m bench.datagen --scale large --truncate
+    python -m bench.stats_bench --repeat 20 --out stats_bench.json
+"""
+import argparse
+import threading
+import time
+
+import stats
+from db import get_conn
+from bench.common import percentiles, timed, write_result
+
+DASHBOARD_LIVE = [
+    "SELECT * FROM plant_completion_stats",
+    "SELECT * FROM point_distribution",
+    "SELECT * FROM active_department_stats ORDER BY avg_points DESC",
+]
+DASHBOARD_SNAPSHOT = [
+    "SELECT * FROM mv_plant_completion_stats ORDER BY species_id",
+    "SELECT * FROM mv_point_distribution ORDER BY bucket_start",
+    "SELECT * FROM mv_active_department_stats ORDER BY avg_points DESC",
+]
+
+
+def run_queries(cur, queries):
+    for sql in queries:
+        cur.execute(sql)
+        cur.fetchall()
+
+
+def bench_dashboard(cur, queries, repeat):
+    run_queries(cur, queries)  # 캐시 데우기
+    return percentiles([timed(run_queries, cur, queries)[1] for _ in range(repeat)])
+
+
+def bench_refresh(conn, repeat):
+    result = {}
+    for view_name in stats.SNAPSHOTS.values():
+        result[view_name] = {
+            mode: percentiles([
+                stats.refresh(view_name, conn, concurrently=(mode == "concurrently")) for _ in range(repeat)
+            ])
+            for mode in ("plain", "concurrently")
+        }
+    return result
+
+
+def read_during_refresh(view_name, concurrently, interval_ms):
+    """갱신 1회가 도는 동안 다른 연결에서 interval_ms마다 스냅샷을 읽은 지연시간"""
+    samples = []
+    done = threading.Event()
+
+    def reader():
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            while not done.is_set():
+                _, ms = timed(run_queries, cur, [f"SELECT COUNT(*) FROM {view_name}"])
+                conn.rollback()
+                samples.append(ms)
+                time.sleep(interval_ms / 1000)
+        finally:
+            conn.close()
+
+    thread = threading.Thread(target=reader, name="stats-bench-reader")
+    thread.start()
+    time.sleep(interval_ms * 3 / 1000)  # 갱신 전 조회 몇 번
+    try:
+        refresh_ms = stats.refresh(view_name, concurrently=concurrently)
+    finally:
+        done.set()
+        thread.join()
+    return {"refresh_ms": refresh_ms, "read_latency_ms": percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--refresh-repeat", type=int, default=3)
+    parser.add_argument("--read-interval-ms", type=float, default=20)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    conn = get_conn()
+    conn.autocommit = True
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT (SELECT COUNT(*) FROM user_account), (SELECT COUNT(*) FROM user_plant)")
+        users, user_plants = cur.fetchone()
+        # 스냅샷이 비어 있으면 비교가 의미 없으므로 먼저 한 번 채움
+        stats.refresh_all(conn)
+
+        dashboard = {
+            "live_view": bench_dashboard(cur, DASHBOARD_LIVE, args.repeat),
+            "snapshot": bench_dashboard(cur, DASHBOARD_SNAPSHOT, args.repeat),
+        }
+        refresh = bench_refresh(conn, args.refresh_repeat)
+    finally:
+        conn.close()
+    # 갱신이 실제로 커밋되었는지 다른 연결에서 확인 (반납 때 rollback된 갱신을 재지 않도록)
+    current = stats.ages()
+    missing = [name for name in stats.SNAPSHOTS.values() if name not in current or current[name].refreshed_at is None]
+    if missing:
+        raise SystemExit(f"stat_refresh에 갱신 기록이 없습니다: {', '.join(missing)}")
+
+    blocking = {
+        view_name: {
+            "plain": read_during_refresh(view_name, False, args.read_interval_ms),
+            "concurrently": read_during_refresh(view_name, True, args.read_interval_ms),
+        }
+        for view_name in stats.SNAPSHOTS.values()
+    }
+
+    write_result(args.out, "stats_snapshot", {
+        "users": users,
+        "user_plants": user_plants,
+        "repeat": args.repeat,
+        "dashboard_ms": dashboard,
+        "refresh_ms": refresh,
+        "read_during_refresh": blocking,
+    })
+
+
+if __name__ == "__main__":
+    main()
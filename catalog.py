@@ -0,0 +1,130 @@
+"""
+도감 캐시 (plant_species + species_step)
+
+도감/퀴즈 데이터는 읽기가 대부분이고 쓰기는 content_mgr에서만 일어나므로
+프로세스 메모리에 캐시해 두고, content_mgr가 저장할 때마다 bump_version()으로 무효화함
+- 크기 제한: 최근에 쓴 식물 CATALOG_CACHE_SIZE개 (LRU)
+- TTL: CATALOG_CACHE_TTL초가 지나면 다시 조회 (다른 서버 프로세스의 수정 반영용)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from db import get_conn
+
+MAX_SPECIES = int(os.getenv("CATALOG_CACHE_SIZE", "2000"))
+TTL_SEC = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+
+_lock = threading.Lock()
+_version = 0
+# species_id -> (조회 시각, 조회 당시 버전, 식물 dict)
+_species = OrderedDict()
+# (조회 시각, 조회 당시 버전, [(species_id, common_name), ...])
+_names = None
+
+
+def version():
+    return _version
+
+
+def bump_version():
+    """도감 데이터가 바뀌었을 때 호출 (커밋 이후) -> 캐시 전체 무효화"""
+    global _version, _names
+    with _lock:
+        _version += 1
+        _species.clear()
+        _names = None
+
+
+def _fresh(loaded_at, loaded_version):
+    return loaded_version == _version and time.monotonic() - loaded_at < TTL_SEC
+
+
+def _query(sql, params, conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        return cur.fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def get_species(species_id, conn=None):
+    """
+    식물 1종 + 단계 목록 (단계는 step_order 순)
+    반환: {"species_id", "common_name", ..., "steps": [(step_id, step_order, stage_name,
+           quiz_question, correct_answer, explanation), ...]} / 없으면 None
+    """
+    with _lock:
+        entry = _species.get(species_id)
+        if entry and _fresh(entry[0], entry[1]):
+            _species.move_to_end(species_id)
+            return entry[2]
+
+    loaded_version = _version
+    rows = _query("""
+        SELECT s.species_id, s.common_name, s.category, s.difficulty, s.sun_level, s.image_url, s.description,
+               st.step_id, st.step_order, st.stage_name, st.quiz_question, st.correct_answer, st.explanation
+        FROM plant_species s
+        LEFT JOIN species_step st ON st.species_id = s.species_id
+        WHERE s.species_id = %s
+        ORDER BY st.step_order
+    """, (species_id,), conn)
+    if not rows:
+        return None
+
+    first = rows[0]
+    species = {
+        "species_id": first[0],
+        "common_name": first[1],
+        "category": first[2],
+        "difficulty": first[3],
+        "sun_level": first[4],
+        "image_url": first[5],
+        "description": first[6],
+        "steps": [tuple(r[7:]) for r in rows if r[7] is not None],
+    }
+    with _lock:
+        _species[species_id] = (time.monotonic(), loaded_version, species)
+        _species.move_to_end(species_id)
+        while len(_species) > MAX_SPECIES:
+            _species.popitem(last=False)
+    return species
+
+
+def get_steps(species_id, conn=None):
+    species = get_species(species_id, conn)
+    return species["steps"] if species else []
+
+
+def get_step(species_id, step_order, conn=None):
+    """해당 단계의 (step_id, stage_name, quiz_question, correct_answer, explanation) / 없으면 None"""
+    for step_id, order, stage_name, question, answer, explanation in get_steps(species_id, conn):
+        if order == step_order:
+            return step_id, stage_name, question, answer, explanation
+    return None
+
+
+def max_step(species_id, conn=None):
+    """마지막 단계 번호 (단계가 없으면 0)"""
+    steps = get_steps(species_id, conn)
+    return steps[-1][1] if steps else 0
+
+
+def species_names(conn=None):
+    """선택 박스용 [(species_id, common_name), ...] (species_id 순)"""
+    global _names
+    with _lock:
+        if _names and _fresh(_names[0], _names[1]):
+            return _names[2]
+
+    loaded_version = _version
+    names = _query("SELECT species_id, common_name FROM plant_species ORDER BY species_id", None, conn)
+    with _lock:
+        _names = (time.monotonic(), loaded_version, names)
+    return names
@@ -0,0 +1,392 @@
+"""
+도감 일괄 가져오기 (plant_species + species_step, CSV / JSON / JSONL)
+
+학기 초에 수백 종을 한 번에 등록할 때 쓰는 도구 (content_mgr "📦 일괄 등록" 탭, 명령줄)
+1. 파일 검증 (DB 없이): 필수 값, 길이, category/sun_level/difficulty 허용 값,
+   같은 식물 이름이 서로 다른 값으로 두 번 / 같은 (식물, step_order)가 두 번 나오면 오류
+2. COPY로 임시 테이블(import_species / import_step)에 적재
+3. 현재 DB와 비교한 diff (신규 / 수정 / 변경 없음) -> dry-run은 여기까지 보여주고 rollback
+4. 적용: 식물은 common_name, 단계는 (species_id, step_order) 기준 UPSERT 두 번 + 요약 감사 로그 1행을
+   한 트랜잭션으로 커밋 (중간에 실패하면 아무것도 반영되지 않음)
+
+빈 값은 "기존 값 유지" (새 식물이면 NULL), 파일에 없는 식물/단계는 건드리지 않음 (삭제 없음)
+
+파일 형식
+- CSV: 한 행 = 단계 1개 (식물 컬럼은 단계마다 반복), step_order가 빈 행은 식물 정보만
+    common_name,category,difficulty,sun_level,scientific_name,image_url,description,
+    step_order,stage_name,quiz_question,correct_answer,explanation
+- JSON: 식물 객체 목록 [{"common_name": ..., "category": ..., "steps": [{"step_order": 1, ...}]}]
+- JSONL: 한 줄에 식물 객체 1개 (JSON과 같은 모양)
+correct_answer는 true/false, 1/0, O/X
+
+    python catalog_import.py plants.csv            # dry-run (diff만 출력)
+    python catalog_import.py plants.jsonl --apply --admin content
+"""
+import csv
+import io
+import json
+import os
+import time
+from collections import namedtuple
+
+from db import copy_rows
+from hangul import choseong_key
+
+# content_mgr 등록 폼과 같은 선택지
+CATEGORIES = ["leaf", "flower", "fruit", "succulent"]
+SUN_LEVELS = ["Low", "Mid", "High"]
+DIFFICULTY_RANGE = (1, 5)
+FORMATS = ["csv", "json", "jsonl"]
+
+# 컬럼 -> 최대 길이 (create_tables.sql 2, 3번과 같게), None이면 제한 없음
+SPECIES_FIELDS = {
+    "scientific_name": 150,
+    "category": 20,
+    "difficulty": None,
+    "sun_level": 20,
+    "image_url": None,
+    "description": None,
+}
+STEP_FIELDS = {
+    "stage_name": 20,
+    "quiz_question": None,
+    "correct_answer": None,
+    "explanation": None,
+}
+NAME_MAX = 100
+_TRUE = {"true", "t", "1", "o", "y", "yes", "참"}
+_FALSE = {"false", "f", "0", "x", "n", "no", "거짓"}
+
+# kind: "species" / "step", action: "new" / "update" / "same", fields: 바뀌는 컬럼 목록
+DiffRow = namedtuple("DiffRow", ["kind", "common_name", "step_order", "action", "fields"])
+ImportResult = namedtuple("ImportResult", [
+    "applied", "species_new", "species_updated", "species_same",
+    "steps_new", "steps_updated", "steps_same", "diff", "errors", "elapsed_ms",
+])
+
+
+def detect_format(filename):
+    """파일 이름 확장자 -> 형식 ("csv" / "json" / "jsonl")"""
+    ext = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if ext == "ndjson":
+        return "jsonl"
+    return ext if ext in FORMATS else "csv"
+
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _to_int(value):
+    value = _text(value)
+    return None if value is None else int(value)
+
+
+def _to_bool(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    value = _text(value)
+    if value is None:
+        return None
+    if value.lower() in _TRUE:
+        return True
+    if value.lower() in _FALSE:
+        return False
+    raise ValueError(f"참/거짓 값이 아님: {value}")
+
+
+def _json_line(line_no, line):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"{line_no}행: {e}") from None
+
+
+def _records(text, fmt):
+    """파일 내용 -> (위치 표시, 식물 dict, 단계 dict 목록) 목록"""
+    if fmt == "csv":
+        for line_no, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+            row = {k.strip(): v for k, v in row.items() if k}
+            has_step = _text(row.get("step_order")) is not None
+            yield f"{line_no}행", row, [row] if has_step else []
+        return
+    if fmt == "json":
+        items = json.loads(text)
+        if isinstance(items, dict):
+            items = items.get("species", [])
+        numbered = ((f"{i}번째 항목", item) for i, item in enumerate(items, start=1))
+    else:
+        numbered = ((f"{i}행", _json_line(i, line)) for i, line in enumerate(text.splitlines(), start=1)
+                    if line.strip())
+    for where, item in numbered:
+        yield where, item, (item.get("steps") or []) if isinstance(item, dict) else []
+
+
+def _species_values(row):
+    values = {
+        "scientific_name": _text(row.get("scientific_name")),
+        "category": _text(row.get("category")),
+        "difficulty": _to_int(row.get("difficulty")),
+        "sun_level": _text(row.get("sun_level")),
+        "image_url": _text(row.get("image_url")),
+        "description": _text(row.get("description")),
+    }
+    errors = []
+    if values["category"] is not None and values["category"] not in CATEGORIES:
+        errors.append(f"category는 {', '.join(CATEGORIES)} 중 하나: {values['category']}")
+    if values["sun_level"] is not None and values["sun_level"] not in SUN_LEVELS:
+        errors.append(f"sun_level은 {', '.join(SUN_LEVELS)} 중 하나: {values['sun_level']}")
+    low, high = DIFFICULTY_RANGE
+    if values["difficulty"] is not None and not low <= values["difficulty"] <= high:
+        errors.append(f"difficulty는 {low}~{high}: {values['difficulty']}")
+    return values, errors
+
+
+def _step_values(row):
+    values = {
+        "stage_name": _text(row.get("stage_name")),
+        "quiz_question": _text(row.get("quiz_question")),
+        "correct_answer": _to_bool(row.get("correct_answer")),
+        "explanation": _text(row.get("explanation")),
+    }
+    errors = [f"{field} 값이 없음" for field in ("stage_name", "quiz_question", "correct_answer")
+              if values[field] is None]
+    return values, errors
+
+
+def _length_errors(values, limits):
+    return [f"{field}는 {limit}자 이하" for field, limit in limits.items()
+            if limit and isinstance(values.get(field), str) and len(values[field]) > limit]
+
+
+def parse(text, fmt):
+    """
+    파일 내용 검증 -> (species, steps, errors)
+    species: {common_name: 값 dict}, steps: {(common_name, step_order): 값 dict}, errors: ["위치: 내용", ...]
+    같은 식물이 여러 행에 나오면 값을 합침 (빈 값은 무시, 서로 다른 값이면 오류)
+    """
+    species, steps, errors = {}, {}, []
+    try:
+        records = list(_records(text, fmt))
+    except (ValueError, TypeError, AttributeError) as e:
+        return species, steps, [f"파일을 읽을 수 없음 ({fmt}): {e}"]
+
+    for where, row, step_rows in records:
+        if not isinstance(row, dict):
+            errors.append(f"{where}: 객체가 아님")
+            continue
+        name = _text(row.get("common_name"))
+        if name is None:
+            errors.append(f"{where}: common_name 값이 없음")
+            continue
+        if len(name) > NAME_MAX:
+            errors.append(f"{where}: common_name은 {NAME_MAX}자 이하")
+            continue
+        try:
+            values, problems = _species_values(row)
+        except ValueError as e:
+            errors.append(f"{where} ({name}): {e}")
+            continue
+        problems += _length_errors(values, SPECIES_FIELDS)
+        merged = species.setdefault(name, dict.fromkeys(SPECIES_FIELDS))
+        for field, value in values.items():
+            if value is None:
+                continue
+            if merged[field] is not None and merged[field] != value:
+                problems.append(f"{field} 값이 앞의 행과 다름 ({merged[field]} / {value})")
+            else:
+                merged[field] = value
+        errors += [f"{where} ({name}): {p}" for p in problems]
+
+        for step_row in step_rows:
+            try:
+                order = _to_int(step_row.get("step_order"))
+                step, problems = _step_values(step_row)
+            except (ValueError, AttributeError) as e:
+                errors.append(f"{where} ({name}): {e}")
+                continue
+            if order is None or order < 1:
+                errors.append(f"{where} ({name}): step_order는 1 이상")
+                continue
+            problems += _length_errors(step, STEP_FIELDS)
+            if (name, order) in steps:
+                problems.append(f"{order}단계가 두 번 나옴")
+            errors += [f"{where} ({name} {order}단계): {p}" for p in problems]
+            steps[(name, order)] = step
+    if not species and not errors:
+        errors.append("가져올 식물이 없음")
+    return species, steps, errors
+
+
+def _load_staging(cur, species, steps):
+    cur.execute("""
+        CREATE TEMP TABLE import_species (
+            common_name VARCHAR(100) PRIMARY KEY, search_key VARCHAR(100), scientific_name VARCHAR(150),
+            category VARCHAR(20), difficulty SMALLINT, sun_level VARCHAR(20), image_url TEXT, description TEXT
+        ) ON COMMIT DROP;
+        CREATE TEMP TABLE import_step (
+            common_name VARCHAR(100), step_order INT, stage_name VARCHAR(20), quiz_question TEXT,
+            correct_answer BOOLEAN, explanation TEXT, PRIMARY KEY (common_name, step_order)
+        ) ON COMMIT DROP;
+    """)
+    copy_rows(cur, "import_species", ["common_name", "search_key", *SPECIES_FIELDS], (
+        (name, choseong_key(name), *values.values()) for name, values in species.items()
+    ))
+    copy_rows(cur, "import_step", ["common_name", "step_order", *STEP_FIELDS], (
+        (name, order, *values.values()) for (name, order), values in steps.items()
+    ))
+    cur.execute("ANALYZE import_species; ANALYZE import_step")
+
+
+def _changed_array(fields, new, old):
+    """빈 값은 기존 값 유지이므로, 새 값이 있고 기존과 다른 컬럼 이름 배열"""
+    cases = ", ".join(
+        f"CASE WHEN {new}.{f} IS NOT NULL AND {new}.{f} IS DISTINCT FROM {old}.{f} THEN '{f}' END"
+        for f in fields
+    )
+    return f"ARRAY_REMOVE(ARRAY[{cases}]::TEXT[], NULL)"
+
+
+def _diff(cur):
+    """임시 테이블 vs 현재 도감 -> [DiffRow] (식물 이름, 단계 순)"""
+    cur.execute(f"""
+        SELECT 'species', i.common_name, NULL::INT, s.species_id IS NULL,
+               {_changed_array(SPECIES_FIELDS, "i", "s")}
+        FROM import_species i
+        LEFT JOIN plant_species s ON s.common_name = i.common_name
+        UNION ALL
+        SELECT 'step', i.common_name, i.step_order, t.step_id IS NULL,
+               {_changed_array(STEP_FIELDS, "i", "t")}
+        FROM import_step i
+        LEFT JOIN plant_species s ON s.common_name = i.common_name
+        LEFT JOIN species_step t ON t.species_id = s.species_id AND t.step_order = i.step_order
+        ORDER BY 2, 3 NULLS FIRST
+    """)
+    diff = []
+    for kind, name, order, is_new, fields in cur.fetchall():
+        action = "new" if is_new else ("update" if fields else "same")
+        diff.append(DiffRow(kind, name, order, action, [] if is_new else fields))
+    return diff
+
+
+def _apply(cur):
+    """UPSERT 두 번 (바뀐 행만 UPDATE하므로 변경 없는 행은 건드리지 않음)"""
+    cur.execute(f"""
+        INSERT INTO plant_species (common_name, search_key, {', '.join(SPECIES_FIELDS)})
+        SELECT common_name, search_key, {', '.join(SPECIES_FIELDS)} FROM import_species
+        ON CONFLICT (common_name) DO UPDATE
+        SET {', '.join(f"{f} = COALESCE(EXCLUDED.{f}, plant_species.{f})" for f in SPECIES_FIELDS)}
+        WHERE CARDINALITY({_changed_array(SPECIES_FIELDS, "EXCLUDED", "plant_species")}) > 0
+    """)
+    cur.execute(f"""
+        INSERT INTO species_step (species_id, step_order, {', '.join(STEP_FIELDS)})
+        SELECT s.species_id, i.step_order, {', '.join("i." + f for f in STEP_FIELDS)}
+        FROM import_step i
+        JOIN plant_species s ON s.common_name = i.common_name
+        ON CONFLICT (species_id, step_order) DO UPDATE
+        SET stage_name = EXCLUDED.stage_name, quiz_question = EXCLUDED.quiz_question,
+            correct_answer = EXCLUDED.correct_answer,
+            explanation = COALESCE(EXCLUDED.explanation, species_step.explanation)
+        WHERE CARDINALITY({_changed_array(STEP_FIELDS, "EXCLUDED", "species_step")}) > 0
+    """)
+
+
+def _count(diff, kind, action):
+    return sum(1 for d in diff if d.kind == kind and d.action == action)
+
+
+def summary(result):
+    """감사 로그/화면용 한 줄 요약"""
+    return (f"식물 신규 {result.species_new}, 수정 {result.species_updated}, 그대로 {result.species_same} / "
+            f"단계 신규 {result.steps_new}, 수정 {result.steps_updated}, 그대로 {result.steps_same}")
+
+
+def run_import(conn, text, fmt, admin_id=None, apply=False, source=""):
+    """
+    검증 -> 임시 테이블 적재 -> diff -> (apply면) 반영 + 감사 로그 + 커밋 -> ImportResult
+    dry-run이거나 오류가 있으면 rollback (도감은 그대로)
+    반영했으면 호출한 쪽에서 catalog.bump_version()
+    """
+    started = time.perf_counter()
+    species, steps, errors = parse(text, fmt)
+
+    def result(applied, diff, errors):
+        counts = [_count(diff, kind, action) for kind in ("species", "step") for action in ("new", "update", "same")]
+        return ImportResult(applied, *counts, diff, errors, round((time.perf_counter() - started) * 1000, 1))
+
+    if errors:
+        return result(False, [], errors)
+    cur = conn.cursor()
+    try:
+        if apply:
+            # 비교 ~ 반영 사이에 다른 관리자의 수정이 끼어들지 않도록 (조회는 막지 않음)
+            cur.execute("LOCK TABLE plant_species, species_step IN SHARE ROW EXCLUSIVE MODE")
+        _load_staging(cur, species, steps)
+        cur.execute("""
+            SELECT common_name FROM import_species i
+            WHERE category IS NULL AND NOT EXISTS (SELECT 1 FROM plant_species s WHERE s.common_name = i.common_name)
+            ORDER BY common_name
+        """)
+        errors = [f"{name}: 새 식물은 category 값이 필요함" for (name,) in cur.fetchall()]
+        diff = _diff(cur)
+        report = result(False, diff, errors)
+        changed = any(d.action != "same" for d in diff)
+        if not apply or errors or not changed:
+            conn.rollback()
+            return report
+        _apply(cur)
+        cur.execute("""
+            INSERT INTO audit_log (admin_id, action_type, target_id, details)
+            VALUES (%s, 'IMPORT_CATALOG', NULL, %s)
+        """, (admin_id, f"일괄 등록{f' ({source})' if source else ''}: {summary(report)}"))
+        conn.commit()
+        return report._replace(applied=True, elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+    except Exception:
+        conn.rollback()
+        raise
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from db import get_conn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=FORMATS, help="기본: 확장자로 판단")
+    parser.add_argument("--apply", action="store_true", help="지정하지 않으면 dry-run")
+    parser.add_argument("--admin", help="감사 로그에 남길 관리자 login_id")
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8-sig") as f:
+        content = f.read()
+    conn = get_conn()
+    try:
+        admin_id = None
+        if args.admin:
+            cur = conn.cursor()
+            cur.execute("SELECT user_id FROM user_account WHERE login_id = %s", (args.admin,))
+            row = cur.fetchone()
+            if row is None:
+                sys.exit(f"관리자 계정 없음: {args.admin}")
+            admin_id = row[0]
+            conn.rollback()
+        res = run_import(conn, content, args.format or detect_format(args.file), admin_id, args.apply,
+                         os.path.basename(args.file))
+    finally:
+        conn.close()
+
+    for error in res.errors:
+        print(f"오류 {error}")
+    for d in res.diff:
+        if d.action != "same":
+            label = d.common_name if d.kind == "species" else f"{d.common_name} {d.step_order}단계"
+            print(f"{d.action:6} {label} {', '.join(d.fields)}")
+    print(summary(res), f"({res.elapsed_ms:,}ms)")
+    print("반영함" if res.applied else "반영 안 함 (dry-run 또는 오류/변경 없음)")
+    if res.errors:
+        sys.exit(1)
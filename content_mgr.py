@@ -1,6 +1,16 @@
 import streamlit as st
 import pandas as pd
 from db import get_conn
+from sqltrace import traced_view
+from hangul import choseong_key
+import catalog
+import game_config
+import audit
+import moderation
+import catalog_import
+
+# 화면에서 한 번에 내보낼 수 있는 최대 행 수 (더 많으면 python audit.py export)
+AUDIT_EXPORT_UI_LIMIT = 100_000
 
 def insert_audit_log(cursor, admin_id, action_type, target_id, details):
     """감사 로그 기록용 헬퍼 함수"""
@@ -9,157 +19,275 @@ def insert_audit_log(cursor, admin_id, action_type, target_id, details):
         VALUES (%s, %s, %s, %s)
     """, (admin_id, action_type, target_id, details))
 
+@traced_view
 def manage_game_config():
     """1. 경제 파라미터 조정"""
     st.markdown("#### 💰 경제 시스템 설정")
     conn = get_conn()
     cur = conn.cursor()
     
-    cur.execute("SELECT config_key, config_value FROM game_config")
-    configs = dict(cur.fetchall())
+    # 편집 화면은 항상 DB의 최신 값으로
+    cfg = game_config.load(conn)
+    st.caption(f"설정 버전: v{cfg.version}")
     
     with st.form("config_form"):
-        col1, col2 = st.columns(2)
-        revive_cost = col1.number_input("이어하기 비용", value=int(configs.get('revive_cost', 500)))
-        quiz_reward = col2.number_input("퀴즈 보상", value=int(configs.get('quiz_reward', 100)))
+        col1, col2, col3 = st.columns(3)
+        revive_cost = col1.number_input("이어하기 비용", value=cfg.revive_cost)
+        quiz_reward = col2.number_input("퀴즈 보상", value=cfg.quiz_reward)
+        step1_penalty = col3.number_input("1단계 오답 패널티", value=cfg.step1_penalty)
         
         if st.form_submit_button("설정 저장"):
             try:
-                cur.execute("UPDATE game_config SET config_value=%s WHERE config_key='revive_cost'", (str(revive_cost),))
-                cur.execute("UPDATE game_config SET config_value=%s WHERE config_key='quiz_reward'", (str(quiz_reward),))
-                insert_audit_log(cur, st.session_state.user['user_id'], 'UPDATE_CONFIG', 0, f"이어하기:{revive_cost}, 보상:{quiz_reward}")
+                new_version = game_config.save(cur, {
+                    'revive_cost': revive_cost,
+                    'quiz_reward': quiz_reward,
+                    'step1_penalty': step1_penalty,
+                })
+                insert_audit_log(cur, st.session_state.user['user_id'], 'UPDATE_CONFIG', new_version, f"이어하기:{revive_cost}, 보상:{quiz_reward}, 패널티:{step1_penalty}")
                 conn.commit()
-                st.success("설정 저장 완료")
+                # 게임 화면이 쓰는 스냅샷도 바로 갱신
+                game_config.refresh(conn)
+                st.success(f"설정 저장 완료 (v{new_version})")
             except Exception as e:
                 conn.rollback()
                 st.error(f"오류: {e}")
     conn.close()
 
+def _keyset_pager(state_key, last_key, has_next):
+    """
+    다음/이전 버튼 (plant.py 도감과 같은 방식: 각 페이지 시작 위치의 스택)
+    반환값 없이 눌리면 스택을 바꾸고 rerun
+    """
+    cursors = st.session_state[state_key]
+    c1, c2, c3 = st.columns([1, 2, 1])
+    if c1.button("◀ 이전", disabled=len(cursors) == 1, key=f"{state_key}_prev"):
+        cursors.pop()
+        st.rerun()
+    c2.caption(f"페이지 {len(cursors)}")
+    if c3.button("다음 ▶", disabled=not has_next, key=f"{state_key}_next"):
+        cursors.append(last_key)
+        st.rerun()
+
+def _page_cursors(state_key, signature):
+    """필터가 바뀌면 첫 페이지로 -> 현재 페이지 시작 위치"""
+    if st.session_state.get(f"{state_key}_signature") != signature:
+        st.session_state[f"{state_key}_signature"] = signature
+        st.session_state[state_key] = [None]
+    return st.session_state[state_key][-1]
+
+def _selected_ids(df, editor_key):
+    """data_editor에서 '선택' 체크한 행의 tip_id 목록"""
+    if df.empty:
+        st.info("이 페이지에 남은 항목이 없습니다.")
+        return []
+    edited = st.data_editor(
+        df, key=editor_key, hide_index=True, use_container_width=True,
+        disabled=[c for c in df.columns if c != "선택"],
+        column_config={"선택": st.column_config.CheckboxColumn("선택", default=False)},
+    )
+    return edited.loc[edited["선택"].astype(bool), "tip_id"].tolist()
+
+def _run_batch(conn, action, tip_ids, *args):
+    """선택한 팁들을 한 트랜잭션으로 처리 (감사 로그는 팁마다 1행)"""
+    cur = conn.cursor()
+    try:
+        count = action(cur, st.session_state.user['user_id'], tip_ids, *args)
+        conn.commit()
+        return count
+    except Exception as e:
+        conn.rollback()
+        st.error(f"처리 실패: {e}")
+        return None
+
+@traced_view
 def manage_tips_moderation():
-    """2. [UPGRADE] 신고 관리 및 숨김 처리"""
+    """2. [UPGRADE] 신고 관리 및 숨김 처리 (팁 단위 신고 묶음 + 페이지 + 일괄 처리)"""
     st.markdown("#### 🚨 신고/숨김 관리")
     
     conn = get_conn()
+    if conn is None:
+        return
     cur = conn.cursor()
+
+    # --- 공통 필터 ---
+    cur.execute("SELECT user_id, name FROM user_account WHERE role = 'Expert' ORDER BY name")
+    experts = dict(cur.fetchall())
+    species = dict(catalog.species_names(conn))
+    with st.expander("🔎 필터", expanded=False):
+        c1, c2, c3 = st.columns(3)
+        species_id = c1.selectbox("식물", [None] + list(species), key="mod_species",
+                                  format_func=lambda s: "전체" if s is None else species[s])
+        expert_id = c2.selectbox("작성자", [None] + list(experts), key="mod_expert",
+                                 format_func=lambda e: "전체" if e is None else experts[e])
+        hidden = c3.selectbox("상태", [None, False, True], key="mod_hidden",
+                              format_func=lambda h: {None: "전체", False: "✅ 게시 중", True: "🚫 숨김"}[h])
+    flt = moderation.TipFilter(species_id, expert_id, hidden)
     
-    # --- [PART 1] 들어온 신고 목록 (최우선 표시) ---
+    # --- [PART 1] 들어온 신고 목록 (최우선 표시, 팁 단위로 묶음) ---
     st.markdown("##### 🔥 접수된 신고 목록 (처리 필요)")
-    
-    # 신고 내역 조회 (팁 정보 + 신고 사유)
-    sql_report = """
-        SELECT r.report_id, t.tip_id, t.title, t.content, r.reason, u.name, r.created_at
-        FROM tip_report r
-        JOIN expert_tip t ON r.tip_id = t.tip_id
-        JOIN user_account u ON r.reporter_id = u.user_id
-        ORDER BY r.created_at DESC
-    """
-    cur.execute(sql_report)
-    reports = cur.fetchall()
-    
-    if not reports:
+    after = _page_cursors("mod_report_cursors", flt)
+    groups, has_next = moderation.report_queue(cur, flt, after)
+    conn.rollback()
+
+    if not groups and after is None:
         st.success("현재 접수된 신고가 없습니다. 깨끗하네요! ✨")
     else:
-        for rep in reports:
-            rid, tid, title, content, reason, reporter, date = rep
-            
-            with st.expander(f"🚨 신고됨: {title} (신고자: {reporter})", expanded=True):
-                st.error(f"**신고 사유:** {reason}")
-                st.markdown(f"**원본 내용:** {content}")
-                st.caption(f"신고일: {date}")
-                
-                c1, c2 = st.columns(2)
-                with c1:
-                    # 신고 수락 -> 팁 숨김 + 신고 내역 삭제(처리됨)
-                    if st.button("⛔ 신고 수락 (팁 숨기기)", key=f"accept_rep_{rid}", type="primary"):
-                        try:
-                            # 1. 팁 숨김
-                            cur.execute("UPDATE expert_tip SET is_hidden=TRUE WHERE tip_id=%s", (tid,))
-                            # 2. 신고 내역 삭제 (처리 완료)
-                            cur.execute("DELETE FROM tip_report WHERE report_id=%s", (rid,))
-                            # 3. 로그
-                            insert_audit_log(cur, st.session_state.user['user_id'], 'HIDE_TIP_REPORT', tid, f"신고 수락 및 숨김: {title}")
-                            conn.commit()
-                            st.success("처리 완료 (숨김 처리됨)")
-                            st.rerun()
-                        except Exception as e: st.error(e)
-                with c2:
-                    # 신고 반려 -> 팁 유지 + 신고 내역 삭제
-                    if st.button("❌ 신고 반려 (무시)", key=f"ignore_rep_{rid}"):
-                        try:
-                            cur.execute("DELETE FROM tip_report WHERE report_id=%s", (rid,))
-                            insert_audit_log(cur, st.session_state.user['user_id'], 'IGNORE_REPORT', tid, f"신고 반려: {title}")
-                            conn.commit()
-                            st.info("신고를 반려했습니다.")
-                            st.rerun()
-                        except Exception as e: st.error(e)
+        df = pd.DataFrame([{
+            "선택": False,
+            "tip_id": g.tip_id,
+            "제목": g.title,
+            "식물": g.species,
+            "작성자": g.author,
+            "신고 수": g.report_count,
+            "최근 사유": " / ".join(g.reasons),
+            "마지막 신고": g.latest_at,
+            "상태": "🚫 숨김" if g.is_hidden else "✅ 게시",
+        } for g in groups], columns=["선택", "tip_id", "제목", "식물", "작성자", "신고 수", "최근 사유", "마지막 신고", "상태"])
+        selected = _selected_ids(df, f"mod_report_editor_{len(st.session_state['mod_report_cursors'])}")
+
+        c1, c2, _ = st.columns([1, 1, 2])
+        with c1:
+            # 신고 수락 -> 팁 숨김 + 그 팁의 신고 모두 처리됨
+            if st.button(f"⛔ 선택 수락 (숨김) {len(selected)}건", type="primary", disabled=not selected, key="mod_accept"):
+                count = _run_batch(conn, moderation.accept_reports, selected)
+                if count is not None:
+                    st.session_state["mod_flash"] = f"{count}건 신고 수락 (숨김 처리됨)"
+                    st.rerun()
+        with c2:
+            # 신고 반려 -> 팁 유지 + 신고 내역 삭제
+            if st.button(f"❌ 선택 반려 {len(selected)}건", disabled=not selected, key="mod_dismiss"):
+                count = _run_batch(conn, moderation.dismiss_reports, selected)
+                if count is not None:
+                    st.session_state["mod_flash"] = f"{count}건 신고를 반려했습니다."
+                    st.rerun()
+        _keyset_pager("mod_report_cursors",
+                      (groups[-1].latest_at, groups[-1].tip_id) if groups else None, has_next)
+
+    if st.session_state.get("mod_flash"):
+        st.success(st.session_state.pop("mod_flash"))
 
     st.divider()
 
-    # --- [PART 2] 전체 팁 모니터링 (기존 기능) ---
+    # --- [PART 2] 전체 팁 모니터링 ---
     st.markdown("##### 🛡️ 전체 게시물 모니터링")
-    
-    sql_all = """
-        SELECT t.tip_id, s.common_name, t.title, t.content, u.name, t.is_hidden, t.created_at
-        FROM expert_tip t
-        JOIN plant_species s ON t.species_id = s.species_id
-        JOIN user_account u ON t.expert_id = u.user_id
-        ORDER BY t.created_at DESC
-    """
-    cur.execute(sql_all)
-    all_tips = cur.fetchall()
-    
-    if all_tips:
-        for tip in all_tips:
-            tid, pname, title, content, writer, is_hidden, date = tip
-            
-            # 숨김 상태면 회색 배경
-            bg_style = "background-color: #f0f2f6; opacity: 0.6;" if is_hidden else ""
-            badge = "🚫 [숨김]" if is_hidden else "✅ [게시]"
-            
-            with st.container():
-                st.markdown(f"""
-                <div style="{bg_style} padding: 10px; border: 1px solid #ddd; border-radius: 5px; margin-bottom: 5px;">
-                    <small>{badge} | {pname} | {writer}</small><br>
-                    <b>{title}</b><br>{content}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # 토글 버튼
-                if is_hidden:
-                    if st.button("복구", key=f"rec_{tid}"):
-                        cur.execute("UPDATE expert_tip SET is_hidden=FALSE WHERE tip_id=%s", (tid,))
-                        insert_audit_log(cur, st.session_state.user['user_id'], 'UNHIDE', tid, f"복구: {title}")
-                        conn.commit()
-                        st.rerun()
-                else:
-                    if st.button("숨김", key=f"hid_{tid}"):
-                        cur.execute("UPDATE expert_tip SET is_hidden=TRUE WHERE tip_id=%s", (tid,))
-                        insert_audit_log(cur, st.session_state.user['user_id'], 'HIDE', tid, f"숨김: {title}")
-                        conn.commit()
-                        st.rerun()
+    after = _page_cursors("mod_tip_cursors", flt)
+    tips, has_next = moderation.tip_list(cur, flt, after)
+    conn.rollback()
+
+    if not tips:
+        st.info("조건에 맞는 게시물이 없습니다.")
+    else:
+        df = pd.DataFrame([{
+            "선택": False,
+            "tip_id": t.tip_id,
+            "상태": "🚫 숨김" if t.is_hidden else "✅ 게시",
+            "식물": t.species,
+            "작성자": t.author,
+            "제목": t.title,
+            "내용": t.content,
+            "작성일": t.created_at,
+        } for t in tips])
+        selected = _selected_ids(df, f"mod_tip_editor_{len(st.session_state['mod_tip_cursors'])}")
+
+        c1, c2, _ = st.columns([1, 1, 2])
+        with c1:
+            if st.button(f"숨김 {len(selected)}건", disabled=not selected, key="mod_hide"):
+                count = _run_batch(conn, moderation.set_hidden, selected, True)
+                if count is not None:
+                    st.session_state["mod_flash"] = f"{count}건 숨김 처리"
+                    st.rerun()
+        with c2:
+            if st.button(f"복구 {len(selected)}건", disabled=not selected, key="mod_unhide"):
+                count = _run_batch(conn, moderation.set_hidden, selected, False)
+                if count is not None:
+                    st.session_state["mod_flash"] = f"{count}건 복구"
+                    st.rerun()
+        _keyset_pager("mod_tip_cursors", (tips[-1].created_at, tips[-1].tip_id), has_next)
     conn.close()
 
+@traced_view
 def view_audit_logs():
-    """3. 감사 로그 조회"""
+    """3. 감사 로그 조회 (필터 + keyset 페이지 + CSV 내보내기)"""
     st.markdown("#### 📜 감사 로그 (Audit Log)")
     conn = get_conn()
+    if conn is None:
+        return
+    cur = conn.cursor()
+
+    # 처리자 후보: 감사 로그를 남기는 역할 (audit_log 전체 DISTINCT는 비쌈)
+    cur.execute("SELECT user_id, name, login_id FROM user_account WHERE role IN ('Content', 'Admin') ORDER BY name")
+    admins = {uid: f"{name} ({login})" for uid, name, login in cur.fetchall()}
+
+    with st.expander("🔎 필터", expanded=True):
+        c1, c2, c3 = st.columns(3)
+        admin_id = c1.selectbox("처리자", [None] + list(admins), format_func=lambda a: "전체" if a is None else admins[a])
+        action_types = c2.multiselect("작업 종류", audit.ACTION_TYPES)
+        target_text = c3.text_input("대상 ID", placeholder="예: 12").strip()
+        c4, c5, c6 = st.columns([2, 1, 1])
+        search = c4.text_input("내용 검색 (details)", placeholder="예: 몬스테라 숨김").strip()
+        date_from = c5.date_input("시작일", value=None)
+        date_to = c6.date_input("종료일", value=None)
+
+    if target_text and not target_text.isdigit():
+        st.warning("대상 ID는 숫자로 입력해주세요.")
+        target_text = ""
+    flt = audit.AuditFilter(admin_id, action_types, int(target_text) if target_text else None,
+                            search, date_from, date_to)
+
+    # --- 페이지 상태 (필터가 바뀌면 첫 페이지로) ---
+    # audit_page: (기준 키, 방향, 페이지 번호), 첫 페이지는 (None, "next", 1)
+    if st.session_state.get("audit_filter") != flt:
+        st.session_state["audit_filter"] = flt
+        st.session_state["audit_page"] = (None, "next", 1)
+    key, direction, page_no = st.session_state["audit_page"]
+
     try:
-        df = pd.read_sql("""
-            SELECT l.log_id, u.name AS admin, l.action_type, l.details, l.created_at 
-            FROM audit_log l JOIN user_account u ON l.admin_id=u.user_id 
-            ORDER BY l.created_at DESC LIMIT 50
-        """, conn)
-        st.dataframe(df, use_container_width=True, hide_index=True)
-    except: st.error("로그 조회 실패")
+        rows, has_more = audit.fetch_page(cur, flt, key, direction)
+    except Exception as e:
+        st.error(f"로그 조회 실패: {e}")
+        conn.close()
+        return
+    conn.rollback()
+
+    # 최신 쪽으로 왔는데 더 없으면 첫 페이지
+    if direction == "prev" and not has_more:
+        page_no = 1
+    has_newer = page_no > 1
+    has_older = has_more if direction == "next" else bool(rows)
+
+    st.caption(f"페이지 {page_no} · 최신순 {audit.PAGE_SIZE}건씩")
+    st.dataframe(pd.DataFrame(rows, columns=audit.COLUMNS), use_container_width=True, hide_index=True)
+
+    b1, b2, b3, _ = st.columns([1, 1, 1, 3])
+    if b1.button("⏮ 처음", disabled=not has_newer, key="audit_first"):
+        st.session_state["audit_page"] = (None, "next", 1)
+        st.rerun()
+    if b2.button("◀ 최신", disabled=not has_newer or not rows, key="audit_prev"):
+        st.session_state["audit_page"] = (audit.page_key(rows[0]), "prev", page_no - 1)
+        st.rerun()
+    if b3.button("다음 ▶", disabled=not has_older or not rows, key="audit_next"):
+        st.session_state["audit_page"] = (audit.page_key(rows[-1]), "next", page_no + 1)
+        st.rerun()
+
+    # --- CSV 내보내기 (서버 측 커서로 조각씩, 화면에서는 최대 EXPORT_UI_LIMIT건) ---
+    with st.expander("⬇️ CSV 내보내기"):
+        st.caption(f"현재 필터 결과를 최신순으로 최대 {AUDIT_EXPORT_UI_LIMIT:,}건 내보냅니다. "
+                   "그보다 많으면 서버에서 `python audit.py export ...`를 사용하세요.")
+        if st.button("CSV 만들기", key="audit_export_btn"):
+            data = "".join(audit.iter_csv(conn, flt, AUDIT_EXPORT_UI_LIMIT))
+            conn.rollback()
+            st.download_button("audit_log.csv 다운로드", data.encode("utf-8-sig"),
+                               file_name="audit_log.csv", mime="text/csv", key="audit_download")
     conn.close()
 
+@traced_view
 def manage_plants_and_quizzes():
     """4. 식물 데이터 관리 (신청/등록/수정/삭제/퀴즈)"""
     st.markdown("#### 🌱 식물 및 퀘스트 데이터 관리")
     
-    tab_req, tab1, tab1_edit, tab2, tab3, tab4 = st.tabs([
+    tab_req, tab1, tab1_edit, tab2, tab3, tab4, tab_import = st.tabs([
         "📩 신청 내역", "1. 새 식물 등록", "1.5. 식물 정보 수정", 
-        "2. 퀴즈 추가", "3. 퀴즈 수정", "🚨 4. 식물 삭제"
+        "2. 퀴즈 추가", "3. 퀴즈 수정", "🚨 4. 식물 삭제", "📦 일괄 등록"
     ])
     
     conn = get_conn()
@@ -191,18 +319,19 @@ def manage_plants_and_quizzes():
     with tab1:
         with st.form("new_plant"):
             name = st.text_input("이름")
-            cat = st.selectbox("종류", ["leaf", "flower", "fruit", "succulent"])
+            cat = st.selectbox("종류", catalog_import.CATEGORIES)
             c1, c2 = st.columns(2)
             diff = c1.slider("난이도", 1, 5, 2)
-            sun = c2.selectbox("광량", ["Low", "Mid", "High"])
+            sun = c2.selectbox("광량", catalog_import.SUN_LEVELS)
             img = st.text_input("이미지 URL")
             desc = st.text_area("설명", height=100)
             if st.form_submit_button("등록"):
                 try:
-                    cursor.execute("INSERT INTO plant_species(common_name, category, difficulty, sun_level, image_url, description) VALUES (%s, %s, %s, %s, %s, %s) RETURNING species_id", (name, cat, diff, sun, img, desc))
+                    cursor.execute("INSERT INTO plant_species(common_name, search_key, category, difficulty, sun_level, image_url, description) VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING species_id", (name, choseong_key(name), cat, diff, sun, img, desc))
                     nid = cursor.fetchone()[0]
                     insert_audit_log(cursor, st.session_state.user['user_id'], 'ADD_PLANT', nid, f"등록: {name}")
                     conn.commit()
+                    catalog.bump_version()
                     st.success("등록 완료")
                 except Exception as e: st.error(e)
 
@@ -221,9 +350,10 @@ def manage_plants_and_quizzes():
                 ni = st.text_input("이미지", info[1] or "")
                 nd = st.text_area("설명", info[2] or "")
                 if st.form_submit_button("수정 저장"):
-                    cursor.execute("UPDATE plant_species SET common_name=%s, image_url=%s, description=%s WHERE species_id=%s", (nn, ni, nd, epid))
+                    cursor.execute("UPDATE plant_species SET common_name=%s, search_key=%s, image_url=%s, description=%s WHERE species_id=%s", (nn, choseong_key(nn), ni, nd, epid))
                     insert_audit_log(cursor, st.session_state.user['user_id'], 'EDIT_PLANT', epid, f"수정: {nn}")
                     conn.commit()
+                    catalog.bump_version()
                     st.success("완료")
                     st.rerun()
 
@@ -243,6 +373,7 @@ def manage_plants_and_quizzes():
                     sid = cursor.fetchone()[0]
                     insert_audit_log(cursor, st.session_state.user['user_id'], 'ADD_QUIZ', sid, f"퀴즈추가: {sn} {st_ord}")
                     conn.commit()
+                    catalog.bump_version()
                     st.success("완료")
 
     # [탭 3: 퀴즈 수정]
@@ -265,6 +396,7 @@ def manage_plants_and_quizzes():
                         cursor.execute("UPDATE species_step SET quiz_question=%s, correct_answer=%s, explanation=%s WHERE step_id=%s", (nq, na, ne, qid))
                         insert_audit_log(cursor, st.session_state.user['user_id'], 'EDIT_QUIZ', qid, f"퀴즈수정: {tn}")
                         conn.commit()
+                        catalog.bump_version()
                         st.success("완료")
                         st.rerun()
 
@@ -280,12 +412,67 @@ def manage_plants_and_quizzes():
                     cursor.execute("DELETE FROM plant_species WHERE species_id=%s", (dpid,))
                     insert_audit_log(cursor, st.session_state.user['user_id'], 'DEL_PLANT', dpid, f"삭제: {dn}")
                     conn.commit()
+                    catalog.bump_version()
                     st.success("삭제됨")
                     st.session_state['dpid'] = None
                     st.rerun()
 
+    # [탭 5: 일괄 등록]
+    with tab_import:
+        import_catalog(conn)
+
     conn.close()
 
+def import_catalog(conn):
+    """CSV/JSON/JSONL 파일로 식물+퀴즈 일괄 등록 (먼저 dry-run 결과를 보고 반영)"""
+    st.caption("빈 값은 기존 값 유지, 파일에 없는 식물/단계는 그대로 둡니다. 형식은 catalog_import.py 설명 참고")
+    up = st.file_uploader("도감 파일", type=["csv", "json", "jsonl"], key="import_file")
+    if up is None:
+        return
+    fmt = catalog_import.detect_format(up.name)
+    text = up.getvalue().decode("utf-8-sig")
+
+    try:
+        res = catalog_import.run_import(conn, text, fmt)
+    except Exception as e:
+        st.error(e)
+        return
+    if res.errors:
+        st.error(f"오류 {len(res.errors)}건 - 고친 뒤 다시 올려 주세요.")
+        st.dataframe(pd.DataFrame({"오류": res.errors}), use_container_width=True, hide_index=True)
+        return
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("식물 신규", res.species_new)
+    c2.metric("식물 수정", res.species_updated)
+    c3.metric("단계 신규", res.steps_new)
+    c4.metric("단계 수정", res.steps_updated)
+    changes = [d for d in res.diff if d.action != "same"]
+    st.caption(f"변경 없음: 식물 {res.species_same} / 단계 {res.steps_same} (검사 {res.elapsed_ms:,}ms)")
+    if not changes:
+        st.info("반영할 변경이 없습니다.")
+        return
+    st.dataframe(pd.DataFrame([{
+        "구분": "식물" if d.kind == "species" else "단계",
+        "식물": d.common_name,
+        "단계": d.step_order,
+        "작업": "신규" if d.action == "new" else "수정",
+        "바뀌는 항목": ", ".join(d.fields),
+    } for d in changes]), use_container_width=True, hide_index=True)
+
+    if st.button("✅ 반영", key="import_apply"):
+        try:
+            res = catalog_import.run_import(conn, text, fmt, st.session_state.user['user_id'], apply=True, source=up.name)
+        except Exception as e:
+            st.error(e)
+            return
+        if res.applied:
+            catalog.bump_version()
+            st.success(f"반영 완료: {catalog_import.summary(res)}")
+        else:
+            st.error("반영하지 못했습니다: " + "; ".join(res.errors or ["변경 없음"]))
+
+@traced_view
 def content_mgr_view():
     if st.session_state.user['role'] not in ['Content', 'Admin']:
         st.error("권한이 없습니다.")
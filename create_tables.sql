@@ -1,4 +1,7 @@
 -- [1. 기존 테이블/뷰 삭제]
+DROP MATERIALIZED VIEW IF EXISTS mv_plant_completion_stats, mv_point_distribution, mv_active_department_stats;
+DROP TABLE IF EXISTS stat_refresh CASCADE;
+DROP TABLE IF EXISTS tx_rollup_hourly, tx_rollup_daily, tx_rollup_user_daily, rollup_state CASCADE;
 DROP VIEW IF EXISTS active_department_stats;
 DROP VIEW IF EXISTS plant_completion_stats CASCADE;
 DROP VIEW IF EXISTS point_distribution CASCADE;
@@ -14,6 +17,13 @@ DROP TABLE IF EXISTS game_config CASCADE;
 DROP TABLE IF EXISTS species_step CASCADE;
 DROP TABLE IF EXISTS plant_species CASCADE;
 DROP TABLE IF EXISTS user_account CASCADE;
+DROP FUNCTION IF EXISTS pium_answer_correct, pium_step1_penalty, pium_rescue, pium_reset, pium_check_config_version,
+    pium_ledger_apply, pium_plant_state, pium_ensure_partitions CASCADE;
+DROP TABLE IF EXISTS point_request CASCADE;
+DROP TABLE IF EXISTS append_batch CASCADE;
+
+-- trigram 유사도 검색 (도감 이름 부분 일치/오타 허용/초성 검색)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- [2. 테이블 생성]
 -- 1. 사용자 계정
@@ -34,6 +44,7 @@ CREATE TABLE user_account (
 CREATE TABLE plant_species (
     species_id     SERIAL PRIMARY KEY,
     common_name    VARCHAR(100) NOT NULL UNIQUE,
+    search_key     VARCHAR(100),  -- 초성 검색 키 (예: 몬스테라 -> ㅁㅅㅌㄹ), content_mgr에서 저장 시 갱신
     scientific_name VARCHAR(150),
     category       VARCHAR(20) NOT NULL,
     difficulty     SMALLINT,
@@ -61,27 +72,52 @@ CREATE TABLE user_plant (
     species_id      INT NOT NULL REFERENCES plant_species(species_id) ON DELETE CASCADE,
     current_step    INT NOT NULL DEFAULT 1,
     is_completed    BOOLEAN NOT NULL DEFAULT FALSE,
+    action_seq      INT NOT NULL DEFAULT 0,  -- 퀴즈 액션마다 1 증가 (중복 제출 방지 키에 사용)
     created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
     UNIQUE (user_id, species_id)
 );
 
 -- 5. 퀴즈 시도 로그
+-- quiz_attempt / transaction_log / audit_log는 계속 쌓이기만 하므로 시각 기준 월별 RANGE 파티션
+-- (PK에 파티션 키 포함, 월별 파티션은 [5-1]의 pium_ensure_partitions가 미리 만들고 partitions.py가 보관/삭제)
 CREATE TABLE quiz_attempt (
-    attempt_id      SERIAL PRIMARY KEY,
+    attempt_id      SERIAL,
     user_plant_id   INT NOT NULL REFERENCES user_plant(user_plant_id) ON DELETE CASCADE,
     step_id         INT NOT NULL REFERENCES species_step(step_id) ON DELETE CASCADE,
     is_correct      BOOLEAN NOT NULL,
     used_continue   BOOLEAN NOT NULL DEFAULT FALSE,
-    attempted_at    TIMESTAMP NOT NULL DEFAULT NOW()
-);
+    attempted_at    TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (attempt_id, attempted_at)
+) PARTITION BY RANGE (attempted_at);
+-- 월별 파티션 범위를 벗어난 행 (pium_ensure_partitions가 해당 월 파티션을 만들 때 옮겨 감)
+CREATE TABLE quiz_attempt_default PARTITION OF quiz_attempt DEFAULT;
 
 -- 6. 포인트(머니) 트랜잭션 로그
 CREATE TABLE transaction_log (
-    log_id          BIGSERIAL PRIMARY KEY,
+    log_id          BIGSERIAL,
     user_id         INT NOT NULL REFERENCES user_account(user_id) ON DELETE CASCADE,
     transaction_type VARCHAR(20) NOT NULL,
     amount          INT NOT NULL,
-    logged_at       TIMESTAMP NOT NULL DEFAULT NOW()
+    logged_at       TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (log_id, logged_at)
+) PARTITION BY RANGE (logged_at);
+CREATE TABLE transaction_log_default PARTITION OF transaction_log DEFAULT;
+
+-- 6-1. 포인트 요청 멱등 키 (같은 폼이 두 번 제출되어도 포인트는 한 번만 움직임)
+CREATE TABLE point_request (
+    idempotency_key VARCHAR(100) PRIMARY KEY,
+    user_id         INT NOT NULL REFERENCES user_account(user_id) ON DELETE CASCADE,
+    transaction_type VARCHAR(20) NOT NULL,
+    amount          INT NOT NULL,
+    balance_after   INT,
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- 6-2. 지연 기록(appendlog.py) 배치 처리 기록 - 같은 배치를 두 번 넣지 않기 위함 (크래시 후 복구 시)
+CREATE TABLE append_batch (
+    batch_id        VARCHAR(100) PRIMARY KEY,
+    row_count       INT NOT NULL,
+    flushed_at      TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
 -- 7. 정보 신청
@@ -132,20 +168,50 @@ CREATE TABLE game_config (
 
 -- 12. [추가] 감사 로그 (Audit Log)
 CREATE TABLE audit_log (
-    log_id          SERIAL PRIMARY KEY,
+    log_id          SERIAL,
     admin_id        INT REFERENCES user_account(user_id),
     action_type     VARCHAR(50) NOT NULL,
     target_id       INT,
     details         TEXT,
     ip_address      VARCHAR(50),
-    created_at      TIMESTAMP DEFAULT NOW()
-);
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (log_id, created_at)
+) PARTITION BY RANGE (created_at);
+CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT;
 
 -- 13. 인덱스
 CREATE INDEX idx_species_name ON plant_species(common_name);
+-- LIKE '%검색어%' / 유사도(%) 검색용 trigram GIN 인덱스 (btree는 앞부분 일치만 가능)
+CREATE INDEX idx_species_name_trgm ON plant_species USING gin (common_name gin_trgm_ops);
+CREATE INDEX idx_species_search_key_trgm ON plant_species USING gin (search_key gin_trgm_ops);
+-- 도감 난이도순 keyset 페이지네이션용 (정렬 키 = COALESCE(difficulty, 0), species_id)
+CREATE INDEX idx_species_difficulty ON plant_species((COALESCE(difficulty, 0)), species_id);
+-- 명단 일괄 가입(roster.py)의 기존 가입자 확인용
+CREATE INDEX idx_user_student ON user_account(student_id);
 CREATE INDEX idx_userplant_user ON user_plant(user_id);
 CREATE INDEX idx_request_status ON plant_request(status);
 CREATE INDEX idx_tx_user_time ON transaction_log(user_id, logged_at);
+-- bench/plan_check.py가 큰 데이터에서 Seq Scan으로 잡아낸 조회들
+-- 식물 삭제/시도 조회 시 quiz_attempt FK(user_plant_id) 조인 + ON DELETE CASCADE
+CREATE INDEX idx_attempt_user_plant ON quiz_attempt(user_plant_id);
+-- 도감 상세의 공개 팁 목록 (species_id = ANY(...) AND is_hidden = FALSE ORDER BY created_at DESC)
+CREATE INDEX idx_tip_species_visible ON expert_tip(species_id, is_hidden, created_at);
+-- 중복 신고 확인 (tip_id = ? AND reporter_id = ?)
+CREATE INDEX idx_report_tip_reporter ON tip_report(tip_id, reporter_id);
+-- 감사 로그 최신순 조회 + keyset 페이지 (audit.py: ORDER BY created_at DESC, log_id DESC)
+CREATE INDEX idx_audit_created ON audit_log(created_at, log_id);
+-- 감사 로그 필터 (처리자 / 작업 종류 / 대상 ID) + 같은 정렬
+CREATE INDEX idx_audit_admin_created ON audit_log(admin_id, created_at, log_id);
+CREATE INDEX idx_audit_action_created ON audit_log(action_type, created_at, log_id);
+CREATE INDEX idx_audit_target_created ON audit_log(target_id, created_at, log_id);
+-- details 전문 검색 (한국어 사전이 없어 'simple' + 접두어 검색, audit.FTS_VECTOR와 같은 식)
+CREATE INDEX idx_audit_details_fts ON audit_log USING gin (to_tsvector('simple', COALESCE(details, '')));
+-- 관리자 대시보드 최근 포인트 로그 (ORDER BY logged_at DESC LIMIT 10)
+CREATE INDEX idx_tx_logged_at ON transaction_log(logged_at);
+-- 전문가 본인 팁 목록 (expert_id = ? ORDER BY created_at DESC)
+CREATE INDEX idx_tip_expert ON expert_tip(expert_id, created_at);
+-- 신고/숨김 관리의 전체 게시물 keyset 페이지 (ORDER BY created_at DESC, tip_id DESC)
+CREATE INDEX idx_tip_created ON expert_tip(created_at, tip_id);
 
 -- 14. 통계용 VIEW
 CREATE OR REPLACE VIEW plant_completion_stats AS
@@ -183,6 +249,81 @@ FROM user_account
 GROUP BY department
 HAVING COUNT(user_id) >= 1;
 
+-- 15. 통계 스냅샷 (MATERIALIZED VIEW)
+-- 관리자 대시보드는 위 VIEW 대신 이 스냅샷을 읽음 (stats.py가 주기적으로 REFRESH ... CONCURRENTLY)
+-- CONCURRENTLY 갱신에는 WHERE 없는 UNIQUE 인덱스가 필요 -> 각 스냅샷의 그룹 키에 UNIQUE 인덱스
+CREATE MATERIALIZED VIEW mv_plant_completion_stats AS
+SELECT * FROM plant_completion_stats;
+CREATE UNIQUE INDEX idx_mv_completion_species ON mv_plant_completion_stats(species_id);
+
+CREATE MATERIALIZED VIEW mv_point_distribution AS
+SELECT * FROM point_distribution;
+CREATE UNIQUE INDEX idx_mv_point_bucket ON mv_point_distribution(bucket_start);
+
+-- department가 NULL인 그룹도 UNIQUE 키로 구분되도록 이름을 채워 넣음
+CREATE MATERIALIZED VIEW mv_active_department_stats AS
+SELECT COALESCE(department, '(미지정)') AS department, active_user_count, avg_points
+FROM active_department_stats;
+CREATE UNIQUE INDEX idx_mv_department ON mv_active_department_stats(department);
+
+-- 스냅샷별 마지막 갱신 시각 / 걸린 시간 (대시보드의 "N분 전 갱신" 표시, 스케줄러의 오래됨 판단)
+-- refreshed_at이 NULL이면 아직 한 번도 갱신 전 (기초 데이터 입력 전에 만들어져 비어 있음)
+CREATE TABLE stat_refresh (
+    view_name       VARCHAR(60) PRIMARY KEY,
+    refreshed_at    TIMESTAMP,
+    duration_ms     INT NOT NULL DEFAULT 0
+);
+INSERT INTO stat_refresh(view_name) VALUES
+('mv_plant_completion_stats'), ('mv_point_distribution'), ('mv_active_department_stats');
+
+-- 16. 포인트 흐름 롤업 (rollup.py가 transaction_log에서 log_id 순서로 증분 집계)
+-- inflow = 지급 합계(amount > 0), outflow = 차감 합계의 절댓값(amount < 0)
+-- department는 집계 시점의 학과 (NULL이면 '(미지정)')
+CREATE TABLE tx_rollup_hourly (
+    bucket_start    TIMESTAMP NOT NULL,
+    transaction_type VARCHAR(20) NOT NULL,
+    department      VARCHAR(100) NOT NULL,
+    inflow          BIGINT NOT NULL DEFAULT 0,
+    outflow         BIGINT NOT NULL DEFAULT 0,
+    tx_count        BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, transaction_type, department)
+);
+
+CREATE TABLE tx_rollup_daily (
+    bucket_date     DATE NOT NULL,
+    transaction_type VARCHAR(20) NOT NULL,
+    department      VARCHAR(100) NOT NULL,
+    inflow          BIGINT NOT NULL DEFAULT 0,
+    outflow         BIGINT NOT NULL DEFAULT 0,
+    tx_count        BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_date, transaction_type, department)
+);
+
+-- 사용자별은 일 단위만 (시간 단위는 행 수가 너무 많음), 탈퇴하면 함께 삭제
+CREATE TABLE tx_rollup_user_daily (
+    user_id         INT NOT NULL REFERENCES user_account(user_id) ON DELETE CASCADE,
+    bucket_date     DATE NOT NULL,
+    transaction_type VARCHAR(20) NOT NULL,
+    inflow          BIGINT NOT NULL DEFAULT 0,
+    outflow         BIGINT NOT NULL DEFAULT 0,
+    tx_count        BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, bucket_date, transaction_type)
+);
+
+-- 롤업 진행 위치 (high-water mark)
+-- last_log_id: 여기까지 집계함 / safe_log_id: 여기까지는 집계해도 됨 (커밋이 끝났다고 볼 수 있는 위치)
+-- mark_log_id, mark_at: mark_at 시점에 보인 MAX(log_id) -> ROLLUP_SETTLE_SEC가 지나면 safe_log_id로 승격
+--   (log_id는 INSERT 때 받고 커밋은 그 뒤라서, 방금 보인 최대값 아래에 아직 커밋 안 된 행이 있을 수 있음)
+CREATE TABLE rollup_state (
+    source_name     VARCHAR(40) PRIMARY KEY,
+    last_log_id     BIGINT NOT NULL DEFAULT 0,
+    safe_log_id     BIGINT NOT NULL DEFAULT 0,
+    mark_log_id     BIGINT,
+    mark_at         TIMESTAMP,
+    updated_at      TIMESTAMP
+);
+INSERT INTO rollup_state(source_name) VALUES ('transaction_log');
+
 -- [4. 기초 데이터 입력]
 INSERT INTO user_account(login_id, password_hash, student_id, name, department, role, points) VALUES
 ('admin',   '1234', '999999999', '관리자',   '대학본부',       'Admin', 99999),
@@ -192,15 +333,306 @@ INSERT INTO user_account(login_id, password_hash, student_id, name, department,
 
 INSERT INTO game_config(config_key, config_value) VALUES
 ('revive_cost', '300'),
-('quiz_reward', '100');
+('quiz_reward', '100'),
+('step1_penalty', '50'),
+('config_version', '1');  -- 설정 저장 시마다 1씩 증가 (game_config.save)
 
-INSERT INTO plant_species(common_name, category, difficulty, sun_level, image_url, description) VALUES
-('몬스테라', 'leaf', 2, 'Mid', 'https://i.namu.wiki/i/ddIQpxcFo4JYdcinRHH9BCVawzyBK7QiqkvNbz_ELjl62GvRcpaJimIOfxiAlxYTYaBIUIOC_iTCF1IlNOIB1A.webp');
+INSERT INTO plant_species(common_name, search_key, category, difficulty, sun_level, image_url, description) VALUES
+('몬스테라', 'ㅁㅅㅌㄹ', 'leaf', 2, 'Mid', 'https://i.namu.wiki/i/ddIQpxcFo4JYdcinRHH9BCVawzyBK7QiqkvNbz_ELjl62GvRcpaJimIOfxiAlxYTYaBIUIOC_iTCF1IlNOIB1A.webp', NULL);
 
 INSERT INTO species_step(species_id, step_order, stage_name, quiz_question, correct_answer, explanation) VALUES
 (1, 1, 'Seed',   '몬스테라는 직사광선을 아주 좋아한다 (O/X)?', FALSE, '잎이 탈 수 있으니 간접광이 좋습니다.'),
 (1, 2, 'Sprout', '몬스테라는 물을 줄 때 흙이 마른 것을 확인해야 한다 (O/X)?', TRUE, '과습에 주의해야 합니다.');
 
+-- [5. 포인트 원장 + 게임 트랜잭션 함수]
+-- 모든 포인트 변동은 pium_ledger_apply를 거침 (조건부 차감 + 중복 요청 방지 + transaction_log 기록)
+-- 잠금 순서는 모든 함수에서 point_request(멱등 키) -> user_account -> user_plant 로 통일 (교착 상태 방지)
+-- 에러 코드: PI001 = 화면에 보여준 설정 버전이 바뀜, PI002 = 포인트 부족
+
+CREATE OR REPLACE FUNCTION pium_check_config_version(p_version INT)
+RETURNS VOID LANGUAGE plpgsql AS $$
+BEGIN
+    IF p_version IS NOT NULL AND p_version <> (
+        SELECT config_value::int FROM game_config WHERE config_key = 'config_version'
+    ) THEN
+        RAISE EXCEPTION 'CONFIG_CHANGED' USING ERRCODE = 'PI001';
+    END IF;
+END;
+$$;
+
+-- 포인트 원장: p_amount > 0 이면 지급, < 0 이면 차감
+-- p_clamp = TRUE 이면 잔액이 모자랄 때 남은 만큼만 차감 (패널티용), FALSE 이면 PI002 에러
+-- p_idem_key가 이미 처리된 키면 아무것도 바꾸지 않고 그때 결과를 applied = FALSE로 반환
+-- p_defer = TRUE 이면 transaction_log는 쓰지 않음 (appendlog.py가 모아서 한 번에 INSERT, 잔액은 여기서 바로 반영)
+CREATE OR REPLACE FUNCTION pium_ledger_apply(p_user_id INT, p_type VARCHAR, p_amount INT,
+                                             p_idem_key VARCHAR DEFAULT NULL, p_clamp BOOLEAN DEFAULT FALSE,
+                                             p_defer BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (balance INT, applied_amount INT, applied BOOLEAN)
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_before INT;
+BEGIN
+    IF p_idem_key IS NOT NULL THEN
+        -- 같은 키로 동시에 들어오면 먼저 들어온 트랜잭션이 끝날 때까지 여기서 대기
+        INSERT INTO point_request (idempotency_key, user_id, transaction_type, amount)
+        VALUES (p_idem_key, p_user_id, p_type, p_amount)
+        ON CONFLICT (idempotency_key) DO NOTHING;
+        IF NOT FOUND THEN
+            SELECT r.balance_after, r.amount INTO balance, applied_amount
+            FROM point_request r WHERE r.idempotency_key = p_idem_key;
+            applied := FALSE;
+            RETURN NEXT;
+            RETURN;
+        END IF;
+    END IF;
+
+    IF p_amount >= 0 THEN
+        UPDATE user_account SET points = points + p_amount
+        WHERE user_id = p_user_id
+        RETURNING points INTO balance;
+        applied_amount := p_amount;
+    ELSIF p_clamp THEN
+        SELECT points INTO v_before FROM user_account WHERE user_id = p_user_id FOR UPDATE;
+        UPDATE user_account SET points = GREATEST(points + p_amount, 0)
+        WHERE user_id = p_user_id
+        RETURNING points INTO balance;
+        applied_amount := balance - v_before;
+    ELSE
+        -- 잔액 확인과 차감을 한 문장으로 (동시에 두 번 차감되어도 음수가 되지 않음)
+        UPDATE user_account SET points = points + p_amount
+        WHERE user_id = p_user_id AND points >= -p_amount
+        RETURNING points INTO balance;
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'INSUFFICIENT_POINTS' USING ERRCODE = 'PI002';
+        END IF;
+        applied_amount := p_amount;
+    END IF;
+
+    IF applied_amount <> 0 AND NOT p_defer THEN
+        INSERT INTO transaction_log (user_id, transaction_type, amount)
+        VALUES (p_user_id, p_type, applied_amount);
+    END IF;
+    IF p_idem_key IS NOT NULL THEN
+        UPDATE point_request SET balance_after = balance, amount = applied_amount
+        WHERE idempotency_key = p_idem_key;
+    END IF;
+
+    applied := TRUE;
+    RETURN NEXT;
+END;
+$$;
+
+-- 아래 게임 함수들은 game.py에서 SELECT * FROM 함수(...) 한 번으로 호출
+-- 반환: new_step(현재 단계), graduated(졸업 여부), balance(처리 후 포인트), points_delta(포인트 변동),
+--       replayed(이미 처리된 요청이라 아무것도 바꾸지 않았으면 TRUE)
+-- p_defer = TRUE 이면 quiz_attempt / transaction_log INSERT를 건너뜀 (appendlog.py가 대신 기록)
+
+-- 중복 요청일 때 현재 상태를 그대로 돌려주는 헬퍼
+CREATE OR REPLACE FUNCTION pium_plant_state(p_user_plant_id INT, p_balance INT, p_delta INT)
+RETURNS TABLE (new_step INT, graduated BOOLEAN, balance INT, points_delta INT, replayed BOOLEAN)
+LANGUAGE sql AS $$
+    SELECT current_step, is_completed, p_balance, p_delta, TRUE
+    FROM user_plant WHERE user_plant_id = p_user_plant_id;
+$$;
+
+-- 정답: 보상 지급 + 다음 단계(마지막 단계면 졸업)
+CREATE OR REPLACE FUNCTION pium_answer_correct(p_user_plant_id INT, p_step_id INT, p_user_id INT,
+                                               p_reward INT, p_config_version INT, p_idem_key VARCHAR DEFAULT NULL,
+                                               p_defer BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (new_step INT, graduated BOOLEAN, balance INT, points_delta INT, replayed BOOLEAN)
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_applied BOOLEAN;
+    v_species INT;
+    v_order   INT;
+    v_max     INT;
+BEGIN
+    PERFORM pium_check_config_version(p_config_version);
+
+    SELECT l.balance, l.applied_amount, l.applied INTO balance, points_delta, v_applied
+    FROM pium_ledger_apply(p_user_id, 'QUIZ_REWARD', p_reward, p_idem_key, FALSE, p_defer) l;
+    IF NOT v_applied THEN
+        RETURN QUERY SELECT * FROM pium_plant_state(p_user_plant_id, balance, points_delta);
+        RETURN;
+    END IF;
+
+    IF NOT p_defer THEN
+        INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct) VALUES (p_user_plant_id, p_step_id, TRUE);
+    END IF;
+
+    SELECT species_id, step_order INTO v_species, v_order FROM species_step WHERE step_id = p_step_id;
+    SELECT MAX(step_order) INTO v_max FROM species_step WHERE species_id = v_species;
+
+    IF v_order < v_max THEN
+        UPDATE user_plant SET current_step = current_step + 1, action_seq = action_seq + 1
+        WHERE user_plant_id = p_user_plant_id
+        RETURNING current_step INTO new_step;
+        graduated := FALSE;
+    ELSE
+        UPDATE user_plant SET is_completed = TRUE, action_seq = action_seq + 1
+        WHERE user_plant_id = p_user_plant_id
+        RETURNING current_step INTO new_step;
+        graduated := TRUE;
+    END IF;
+
+    replayed := FALSE;
+    RETURN NEXT;
+END;
+$$;
+
+-- 1단계 오답: 패널티 차감 (잔액이 모자라면 남은 만큼만, 단계 유지)
+CREATE OR REPLACE FUNCTION pium_step1_penalty(p_user_plant_id INT, p_step_id INT, p_user_id INT,
+                                              p_penalty INT, p_config_version INT, p_idem_key VARCHAR DEFAULT NULL,
+                                              p_defer BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (new_step INT, graduated BOOLEAN, balance INT, points_delta INT, replayed BOOLEAN)
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_applied BOOLEAN;
+BEGIN
+    PERFORM pium_check_config_version(p_config_version);
+
+    SELECT l.balance, l.applied_amount, l.applied INTO balance, points_delta, v_applied
+    FROM pium_ledger_apply(p_user_id, 'PENALTY_STEP1', -p_penalty, p_idem_key, TRUE, p_defer) l;
+    IF NOT v_applied THEN
+        RETURN QUERY SELECT * FROM pium_plant_state(p_user_plant_id, balance, points_delta);
+        RETURN;
+    END IF;
+
+    IF NOT p_defer THEN
+        INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct) VALUES (p_user_plant_id, p_step_id, FALSE);
+    END IF;
+
+    UPDATE user_plant SET action_seq = action_seq + 1
+    WHERE user_plant_id = p_user_plant_id
+    RETURNING current_step INTO new_step;
+    graduated := FALSE;
+    replayed := FALSE;
+    RETURN NEXT;
+END;
+$$;
+
+-- 부활(강제 통과): 잔액이 충분할 때만 차감 + 다음 단계(마지막 단계면 졸업)
+CREATE OR REPLACE FUNCTION pium_rescue(p_user_plant_id INT, p_step_id INT, p_user_id INT,
+                                       p_cost INT, p_config_version INT, p_idem_key VARCHAR DEFAULT NULL,
+                                       p_defer BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (new_step INT, graduated BOOLEAN, balance INT, points_delta INT, replayed BOOLEAN)
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_applied BOOLEAN;
+    v_species INT;
+    v_current INT;
+    v_max     INT;
+BEGIN
+    PERFORM pium_check_config_version(p_config_version);
+
+    SELECT l.balance, l.applied_amount, l.applied INTO balance, points_delta, v_applied
+    FROM pium_ledger_apply(p_user_id, 'FORCE_PASS', -p_cost, p_idem_key, FALSE, p_defer) l;
+    IF NOT v_applied THEN
+        RETURN QUERY SELECT * FROM pium_plant_state(p_user_plant_id, balance, points_delta);
+        RETURN;
+    END IF;
+
+    SELECT species_id, current_step INTO v_species, v_current
+    FROM user_plant WHERE user_plant_id = p_user_plant_id
+    FOR UPDATE;
+    SELECT MAX(step_order) INTO v_max FROM species_step WHERE species_id = v_species;
+
+    IF NOT p_defer THEN
+        INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct, used_continue)
+        VALUES (p_user_plant_id, p_step_id, FALSE, TRUE);
+    END IF;
+
+    IF v_current >= v_max THEN
+        UPDATE user_plant SET is_completed = TRUE, action_seq = action_seq + 1
+        WHERE user_plant_id = p_user_plant_id;
+        new_step := v_current;
+        graduated := TRUE;
+    ELSE
+        UPDATE user_plant SET current_step = current_step + 1, action_seq = action_seq + 1
+        WHERE user_plant_id = p_user_plant_id
+        RETURNING current_step INTO new_step;
+        graduated := FALSE;
+    END IF;
+
+    replayed := FALSE;
+    RETURN NEXT;
+END;
+$$;
+
+-- 무료 초기화: 1단계로 되돌림 (포인트 변동 없음)
+CREATE OR REPLACE FUNCTION pium_reset(p_user_plant_id INT, p_step_id INT, p_defer BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (new_step INT, graduated BOOLEAN, balance INT, points_delta INT, replayed BOOLEAN)
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE user_plant SET current_step = 1, action_seq = action_seq + 1 WHERE user_plant_id = p_user_plant_id;
+    IF NOT p_defer THEN
+        INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct) VALUES (p_user_plant_id, p_step_id, FALSE);
+    END IF;
+
+    new_step := 1;
+    graduated := FALSE;
+    balance := NULL;
+    points_delta := 0;
+    replayed := FALSE;
+    RETURN NEXT;
+END;
+$$;
+
+-- [5-1. 월별 파티션 관리]
+-- p_parent의 p_from ~ p_to 월 파티션(이름: 테이블_pYYYYMM)이 없으면 만들고, 만든 개수를 반환
+-- 기본(DEFAULT) 파티션에 이미 그 달의 행이 있으면 새 파티션으로 옮긴 뒤 붙임 (그냥 붙이면 에러)
+-- partitions.py가 주기적으로 호출해 다음 PARTITION_MONTHS_AHEAD개월치를 미리 만들어 둠
+-- 새 파티션에는 부모 테이블에 부여된 권한([6]의 GRANT)을 그대로 복사 (파티션을 직접 조회하는 역할도 막히지 않도록)
+CREATE OR REPLACE FUNCTION pium_ensure_partitions(p_parent TEXT, p_from DATE, p_to DATE)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_key TEXT;
+    v_month DATE := date_trunc('month', p_from)::date;
+    v_next DATE;
+    v_name TEXT;
+    v_created INT := 0;
+    v_grant RECORD;
+BEGIN
+    SELECT a.attname INTO v_key
+    FROM pg_partitioned_table pt
+    JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+    WHERE pt.partrelid = p_parent::regclass;
+    IF v_key IS NULL THEN
+        RAISE EXCEPTION '% is not a partitioned table', p_parent;
+    END IF;
+
+    WHILE v_month <= p_to LOOP
+        v_next := (v_month + INTERVAL '1 month')::date;
+        v_name := format('%s_p%s', p_parent, to_char(v_month, 'YYYYMM'));
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name, p_parent);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                p_parent || '_default', v_key, v_month, v_key, v_next, v_name);
+            EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                p_parent, v_name, v_month, v_next);
+            FOR v_grant IN
+                SELECT g.grantee::regrole::text AS grantee, string_agg(g.privilege_type, ', ') AS privileges
+                FROM pg_class c, aclexplode(c.relacl) g
+                WHERE c.oid = p_parent::regclass AND g.grantee <> 0 AND g.grantee <> c.relowner
+                GROUP BY g.grantee
+            LOOP
+                EXECUTE format('GRANT %s ON %I TO %s', v_grant.privileges, v_name, v_grant.grantee);
+            END LOOP;
+            v_created := v_created + 1;
+        END IF;
+        v_month := v_next;
+    END LOOP;
+    RETURN v_created;
+END;
+$$;
+
+-- 설치 시점 기준 지난 12개월 ~ 다음 3개월
+SELECT pium_ensure_partitions(t, (CURRENT_DATE - INTERVAL '12 months')::date, (CURRENT_DATE + INTERVAL '3 months')::date)
+FROM unnest(ARRAY['quiz_attempt', 'transaction_log', 'audit_log']) AS t;
+
 -- [6] DB 권한 관리 (Authorization - GRANT/REVOKE)
 -- 주의: 이 부분은 Supabase/Postgres에서 '이미 존재하는 역할' 에러가 날 수 있으므로
 --       스크립트를 반복 실행할 때는 에러를 무시하거나 DO 블록을 사용해야 함.
@@ -219,4 +651,8 @@ $$;
 -- 권한 부여
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO app_admin;
 GRANT SELECT ON ALL TABLES IN SCHEMA public TO app_readonly;
-GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO app_admin;
\ No newline at end of file
+GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO app_admin;
+-- 이후 이 역할이 만드는 테이블/시퀀스에도 같은 권한 (새 월 파티션은 pium_ensure_partitions가 부모 권한도 복사)
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL PRIVILEGES ON TABLES TO app_admin;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT SELECT ON TABLES TO app_readonly;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT USAGE, SELECT ON SEQUENCES TO app_admin;
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+관리자 대시보드 패널 조회 (병렬 + 캐시)
+
+패널마다 독립된 쿼리이므로 풀에서 연결을 따로 빌려 동시에 실행함
+-> 화면 전체 지연시간이 쿼리 합이 아니라 가장 느린 쿼리 정도가 됨.
+결과는 프로세스 메모리에 캐시하고, 데이터 버전 표시(marker)가 바뀌었거나
+DASHBOARD_CACHE_TTL초가 지났을 때만 다시 조회함 (탭 전환 등 rerun에서는 DB를 안 읽음).
+- 통계 스냅샷 패널: stat_refresh.refreshed_at (stats.py가 갱신하면 바뀜)
+- 최근 포인트 로그: transaction_log의 MAX(log_id)
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from db import get_conn
+
+TTL_SEC = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+MAX_WORKERS = int(os.getenv("DASHBOARD_WORKERS", "4"))
+
+# marker: versions()의 키 (이 값이 바뀌면 캐시 무효)
+Panel = namedtuple("Panel", ["name", "sql", "marker"])
+# df는 실패 시 None, error는 성공 시 None
+PanelResult = namedtuple("PanelResult", ["df", "version", "fetched_at", "elapsed_ms", "error", "cached"])
+
+PANELS = {
+    p.name: p for p in [
+        Panel("completion", "SELECT * FROM mv_plant_completion_stats ORDER BY species_id",
+              "mv_plant_completion_stats"),
+        Panel("recent_log", """
+            SELECT l.logged_at, u.name, l.transaction_type, l.amount
+            FROM transaction_log l JOIN user_account u ON l.user_id = u.user_id
+            ORDER BY l.logged_at DESC LIMIT 10
+        """, "transaction_log"),
+        Panel("points", "SELECT * FROM mv_point_distribution ORDER BY bucket_start", "mv_point_distribution"),
+        Panel("departments", "SELECT * FROM mv_active_department_stats ORDER BY avg_points DESC",
+              "mv_active_department_stats"),
+    ]
+}
+
+_lock = threading.Lock()
+# 패널 이름 -> PanelResult
+_cache = {}
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="dashboard")
+        return _executor
+
+
+def versions(conn=None):
+    """패널별 데이터 버전 표시 -> {marker: 문자열} (인덱스만 읽는 가벼운 쿼리 1개)"""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT view_name, refreshed_at::text FROM stat_refresh
+            UNION ALL
+            SELECT 'transaction_log', MAX(log_id)::text FROM transaction_log
+        """)
+        return dict(cur.fetchall())
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def _load(panel, version):
+    started = time.perf_counter()
+    conn = get_conn()
+    try:
+        if conn is None:
+            raise RuntimeError("DB 연결 실패")
+        df = pd.read_sql(panel.sql, conn)
+        error = None
+    except Exception as e:
+        df, error = None, str(e)
+    finally:
+        if conn is not None:
+            conn.close()
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return PanelResult(df, version, time.time(), elapsed_ms, error, False)
+
+
+def _fresh(entry, version):
+    return (entry is not None and entry.error is None and entry.version == version
+            and time.time() - entry.fetched_at < TTL_SEC)
+
+
+def invalidate(name=None):
+    """패널 1개(name) 또는 전체 캐시 무효화"""
+    with _lock:
+        if name is None:
+            _cache.clear()
+        else:
+            _cache.pop(name, None)
+
+
+def fetch(names=None):
+    """
+    패널 결과 -> {패널 이름: PanelResult}
+    캐시가 유효한 패널은 그대로, 나머지는 병렬로 조회 (cached=True면 캐시에서 꺼낸 결과)
+    """
+    names = list(names or PANELS)
+    try:
+        current = versions()
+    except Exception:
+        # 버전을 못 읽으면 캐시를 믿지 않고 모두 다시 조회
+        current = {}
+
+    results, pending = {}, []
+    with _lock:
+        for name in names:
+            version = current.get(PANELS[name].marker)
+            entry = _cache.get(name)
+            if version is not None and _fresh(entry, version):
+                results[name] = entry._replace(cached=True)
+            else:
+                pending.append((name, version))
+
+    futures = {name: _get_executor().submit(_load, PANELS[name], version) for name, version in pending}
+    for name, future in futures.items():
+        result = future.result()
+        results[name] = result
+        if result.error is None:
+            with _lock:
+                _cache[name] = result
+    return results
@@ -1,49 +1,310 @@
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+import atexit
+import collections
+import csv
+import io
 import os
+import threading
+import time
 import streamlit as st
 from dotenv import load_dotenv
+import sqltrace
 
 # 로컬 환경일 때 .env 로드
 load_dotenv()
 
-def get_conn():
+# 서버 프로세스 전체에서 하나만 쓰는 커넥션 풀
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """풀의 커넥션이 모두 사용 중이고 대기 시간도 초과했을 때"""
+
+
+def _load_settings():
     """
-    DB 연결 함수
+    접속 정보 + 풀 설정 읽기
     1순위: 로컬 .env 파일 확인 (개발 환경)
     2순위: Streamlit Cloud Secrets (배포 환경)
     """
-    conn = None
-    try:
-        # 1. 로컬 환경 (.env) 우선 시도
-        # .env 파일이 있고, 그 안에 DB_HOST 변수가 있을 때 실행됨
-        if os.getenv("DB_HOST"):
-            return psycopg2.connect(
-                dbname=os.getenv("DB_NAME"),
-                user=os.getenv("DB_USER"),
-                password=os.getenv("DB_PASSWORD"),
-                host=os.getenv("DB_HOST"),
-                port=int(os.getenv("DB_PORT", "5432"))
-            )
-        
-        # 2. 로컬 설정이 없으면 Streamlit Cloud Secrets 시도
-        # 배포된 환경에서는 .env가 없으므로 이쪽으로 넘어옴
-        elif "db" in st.secrets:
-            db_config = st.secrets["db"]
-            return psycopg2.connect(
-                dbname=db_config["DB_NAME"],
-                user=db_config["DB_USER"],
-                password=db_config["DB_PASSWORD"],
-                host=db_config["DB_HOST"],
-                port=int(db_config["DB_PORT"])
-            )
+    # 1. 로컬 환경 (.env) 우선 시도
+    # .env 파일이 있고, 그 안에 DB_HOST 변수가 있을 때 실행됨
+    if os.getenv("DB_HOST"):
+        src = os.environ
+    # 2. 로컬 설정이 없으면 Streamlit Cloud Secrets 시도
+    # 배포된 환경에서는 .env가 없으므로 이쪽으로 넘어옴
+    elif "db" in st.secrets:
+        src = st.secrets["db"]
+    else:
+        return None
+
+    conn_kwargs = {
+        "dbname": src.get("DB_NAME"),
+        "user": src.get("DB_USER"),
+        "password": src.get("DB_PASSWORD"),
+        "host": src.get("DB_HOST"),
+        "port": int(src.get("DB_PORT", "5432")),
+    }
+    if sqltrace.ENABLED:
+        # 모든 커서의 쿼리 시간/행 수를 rerun 단위로 기록
+        conn_kwargs["cursor_factory"] = sqltrace.TracedCursor
+    pool_kwargs = {
+        "minconn": int(src.get("DB_POOL_MIN", "1")),
+        "maxconn": int(src.get("DB_POOL_MAX", "10")),
+        # 빈 커넥션이 없을 때 기다리는 최대 시간(초)
+        "timeout": float(src.get("DB_POOL_TIMEOUT", "10")),
+        # 이 시간(초) 이상 놀고 있던 커넥션은 꺼낼 때 SELECT 1로 살아있는지 확인
+        "validate_after": float(src.get("DB_POOL_VALIDATE_AFTER", "30")),
+    }
+    return conn_kwargs, pool_kwargs
+
+
+class ConnectionPool:
+    """
+    프로세스 전역 커넥션 풀 (thread-safe, 최대 개수 제한)
+    - checkout(): 커넥션 대여 (모두 사용 중이면 timeout까지 대기)
+    - checkin(): 커넥션 반납 (열린 트랜잭션은 rollback, 깨진 커넥션은 폐기)
+    - 반납된 커넥션은 maxconn개까지 닫지 않고 보관 (minconn은 처음에 미리 여는 개수일 뿐)
+      psycopg2 ThreadedConnectionPool은 minconn개를 넘는 유휴 커넥션을 반납 즉시 닫아서
+      동시 접속이 몰릴 때마다 TCP+인증 핸드셰이크가 반복되므로 유휴 목록을 직접 관리
+    """
+
+    def __init__(self, minconn, maxconn, timeout, validate_after, **conn_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self._conn_kwargs = conn_kwargs
+        # maxconn개를 넘는 동시 대여를 막는 세마포어 (초과 요청은 대기)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        # 유휴 커넥션 (커넥션, 마지막 반납 시각) - 가장 최근에 반납된 것부터 꺼냄
+        self._idle = collections.deque()
+        self._opened = 0
+        self._stats = {
+            "checkouts": 0,
+            "in_use": 0,
+            "waits": 0,
+            "wait_timeouts": 0,
+            "wait_ms_total": 0.0,
+            "connects": 0,
+            "discarded": 0,
+        }
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._conn_kwargs)
+        with self._lock:
+            self._opened += 1
+            self._stats["connects"] += 1
+        return conn
+
+    def _is_healthy(self, conn, last_used):
+        """커넥션 유효성 검사 (오래 놀던 커넥션만 실제 ping)"""
+        if conn.closed:
+            return False
+        if last_used is None or time.monotonic() - last_used < self.validate_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    def _take(self):
+        """유휴 커넥션이 있으면 꺼내고 없으면 새로 연결 -> (커넥션, 마지막 반납 시각 또는 None)"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect(), None
+
+    def checkout(self):
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats["wait_timeouts"] += 1
+                raise PoolTimeout(f"{self.timeout}초 동안 사용 가능한 DB 커넥션이 없습니다.")
+        try:
+            # 깨진 커넥션은 폐기하고 새로 받음 (최대 2번 재시도)
+            for _ in range(3):
+                conn, last_used = self._take()
+                if self._is_healthy(conn, last_used):
+                    break
+                self._discard(conn)
+            else:
+                raise psycopg2.OperationalError("정상적인 DB 커넥션을 얻지 못했습니다.")
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["wait_ms_total"] += (time.monotonic() - started) * 1000
+        return conn
+
+    def checkin(self, conn):
+        try:
+            if conn.closed:
+                self._discard(conn)
+            else:
+                # 열린 트랜잭션 rollback, 상태를 알 수 없는 커넥션은 폐기
+                status = conn.info.transaction_status
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    self._discard(conn)
+                else:
+                    if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if conn.autocommit:
+                        conn.autocommit = False
+                    with self._lock:
+                        self._idle.append((conn, time.monotonic()))
+        except Exception:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._opened -= 1
+            self._stats["discarded"] += 1
+
+    def stats(self):
+        """풀 현황 (대시보드/디버그용)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["opened"] = self._opened
+            stats["idle"] = len(self._idle)
+        stats["minconn"] = self.minconn
+        stats["maxconn"] = self.maxconn
+        return stats
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), collections.deque()
+        for conn, _ in idle:
+            conn.close()
+
+
+class PooledConnection:
+    """
+    풀에서 빌린 psycopg2 커넥션 래퍼
+    기존 코드처럼 conn.close()를 부르면 실제로 끊지 않고 풀에 반납됨
+    속성 읽기/쓰기는 실제 커넥션으로 전달 (conn.autocommit = True 등이 래퍼에만 붙지 않도록)
+    """
+
+    _OWN_ATTRS = ("_pool", "_conn")
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.checkin(conn)
+
+    @property
+    def closed(self):
+        return self._conn is None or self._conn.closed
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("이미 풀에 반납된 커넥션입니다.")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        if name in self._OWN_ATTRS:
+            object.__setattr__(self, name, value)
+        elif self._conn is None:
+            raise psycopg2.InterfaceError("이미 풀에 반납된 커넥션입니다.")
+        else:
+            setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # st.rerun() 등으로 close() 전에 함수가 끝나도 커넥션이 새지 않도록 반납
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def get_pool():
+    """프로세스 전역 풀 (최초 호출 시 한 번만 생성)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = _load_settings()
+                if settings is None:
+                    raise psycopg2.OperationalError("DB 접속 설정(.env 또는 st.secrets)을 찾을 수 없습니다.")
+                conn_kwargs, pool_kwargs = settings
+                _pool = ConnectionPool(**pool_kwargs, **conn_kwargs)
+                atexit.register(_pool.close)
+    return _pool
 
+
+def pool_stats():
+    """풀 통계 (풀이 아직 없으면 None)"""
+    return _pool.stats() if _pool is not None else None
+
+
+def get_conn():
+    """
+    DB 연결 함수
+    프로세스 전역 풀에서 커넥션을 빌려옴 (conn.close() 시 풀에 반납)
+    """
+    try:
+        pool = get_pool()
+        return PooledConnection(pool, pool.checkout())
     except Exception as e:
         st.error(f"DB 연결 실패: {e}")
         return None
 
+
+def copy_rows(cursor, table, columns, rows):
+    """
+    행 목록을 COPY ... FROM STDIN (CSV)으로 한 번에 적재 -> 적재한 행 수
+    None은 NULL, 문자열 안의 쉼표/따옴표/줄바꿈은 csv 모듈이 처리함 (커밋은 호출한 쪽에서)
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(["\\N" if v is None else v for v in row])
+        count += 1
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+    )
+    return count
+
 # 테스트용 코드
 if __name__ == "__main__":
     conn = get_conn()
     if conn:
         print("✅ DB 연결 성공!")
-        conn.close()
\ No newline at end of file
+        conn.close()
+        print(pool_stats())
@@ -0,0 +1,192 @@
+"""
+게임 엔진 (Streamlit 없이 쓰는 순수 게임 로직)
+
+game.py(화면), bench/의 부하 생성기, 배치 작업이 모두 이 모듈을 거쳐 퀴즈 액션을 처리함.
+- 입력은 ActionRequest, 출력은 ActionResult (UI 문구/세션 상태는 다루지 않음)
+- DB 연결은 주입 가능: conn을 넘기면 그 연결을 그대로 쓰고 닫지 않음,
+  안 넘기면 connect()로 빌려서 호출 -> 커밋 -> 반납 (커밋까지 성공해야 OK)
+- conn을 넘긴 경우 커밋 여부는 호출자가 정하므로 엔진은 커밋 이후의 일을 하지 않음
+  (로그는 지연 기록 없이 DB 함수가 같은 트랜잭션에 씀, 프로필 캐시는 호출자가 커밋 후
+   profile_cache.update_points(user_id, result.balance)로 갱신)
+- 실제 상태 변경은 DB 게임 함수(create_tables.sql [5])가 한 번의 호출로 처리
+"""
+from collections import namedtuple
+
+import psycopg2
+
+import appendlog
+import catalog
+import game_config
+import ledger
+import profile_cache
+from db import get_conn
+
+# ActionResult.outcome 값
+OK = "ok"
+DUPLICATE = "duplicate"              # 같은 멱등 키로 이미 처리됨 (아무것도 바뀌지 않음)
+CONFIG_CHANGED = "config_changed"    # 보여준 설정 버전이 바뀜 (PI001)
+INSUFFICIENT_POINTS = "insufficient_points"  # 잔액 부족 (PI002)
+ERROR = "error"
+
+# config: 사용자에게 보여준 game_config.GameConfig 스냅샷, idem_key: ledger.plant_action_key
+ActionRequest = namedtuple(
+    "ActionRequest", ["user_id", "user_plant_id", "step_id", "config", "idem_key"], defaults=(None,),
+)
+ActionResult = namedtuple(
+    "ActionResult",
+    ["outcome", "new_step", "graduated", "balance", "points_delta", "error"],
+)
+# get_user_plants 한 줄
+PlantRow = namedtuple(
+    "PlantRow",
+    ["user_plant_id", "common_name", "current_step", "is_completed", "species_id", "action_seq"],
+)
+# get_quiz 결과
+Quiz = namedtuple("Quiz", ["step_id", "stage_name", "question", "answer", "explanation"])
+
+PGCODE_OUTCOMES = {"PI001": CONFIG_CHANGED, "PI002": INSUFFICIENT_POINTS}
+
+
+class GameEngine:
+    """
+    connect: 연결을 빌려오는 함수 (기본 db.get_conn, 반환된 연결의 close()가 반납)
+    defer_logs: 로그 지연 기록 사용 여부 (기본 appendlog.ENABLED)
+    """
+
+    def __init__(self, connect=get_conn, defer_logs=None):
+        self.connect = connect
+        self.defer_logs = appendlog.ENABLED if defer_logs is None else defer_logs
+
+    # --- 조회 ---
+
+    def get_user_plants(self, user_id, conn=None):
+        """사용자가 키우는 식물 목록 (최근 등록 순) -> [PlantRow, ...]"""
+        rows = self._query("""
+            SELECT up.user_plant_id, s.common_name, up.current_step, up.is_completed, s.species_id, up.action_seq
+            FROM user_plant up
+            JOIN plant_species s ON up.species_id = s.species_id
+            WHERE up.user_id = %s
+            ORDER BY up.created_at DESC
+        """, (user_id,), conn)
+        return [PlantRow(*r) for r in rows]
+
+    def get_quiz(self, species_id, step_order, conn=None):
+        """현재 단계 퀴즈 (도감 캐시) -> Quiz / 없으면 None"""
+        step = catalog.get_step(species_id, step_order, conn)
+        return Quiz(*step) if step else None
+
+    # --- 액션 ---
+
+    def answer_correct(self, req, conn=None):
+        """정답: 보상 지급 + 다음 단계(마지막이면 졸업)"""
+        return self._call("pium_answer_correct", [
+            req.user_plant_id, req.step_id, req.user_id, req.config.quiz_reward, req.config.version, req.idem_key,
+        ], conn, (req, True, False, ledger.QUIZ_REWARD))
+
+    def step1_penalty(self, req, conn=None):
+        """1단계 오답: 패널티 차감 (잔액이 모자라면 남은 만큼만)"""
+        return self._call("pium_step1_penalty", [
+            req.user_plant_id, req.step_id, req.user_id, req.config.step1_penalty, req.config.version, req.idem_key,
+        ], conn, (req, False, False, ledger.PENALTY_STEP1))
+
+    def rescue(self, req, conn=None):
+        """부활: 비용 차감(잔액이 충분할 때만) + 다음 단계"""
+        return self._call("pium_rescue", [
+            req.user_plant_id, req.step_id, req.user_id, req.config.revive_cost, req.config.version, req.idem_key,
+        ], conn, (req, False, True, ledger.FORCE_PASS))
+
+    def reset(self, req, conn=None):
+        """무료 초기화: 1단계로 (포인트 변동 없음, req.config/idem_key는 쓰지 않음)"""
+        return self._call("pium_reset", [req.user_plant_id, req.step_id], conn, (req, False, False, None))
+
+    def submit_answer(self, req, answer, correct_answer, step_order, conn=None):
+        """
+        O/X 제출 처리 (정답 -> answer_correct, 1단계 오답 -> step1_penalty)
+        2단계 이상 오답은 상태를 바꾸지 않고 None 반환 (부활/초기화 선택은 호출자가)
+        """
+        if answer == correct_answer:
+            return self.answer_correct(req, conn)
+        if step_order == 1:
+            return self.step1_penalty(req, conn)
+        return None
+
+    # --- 내부 ---
+
+    def _query(self, sql, params, conn=None):
+        own_conn = conn is None
+        if own_conn:
+            conn = self.connect()
+            if conn is None:
+                return []
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            return cur.fetchall()
+        finally:
+            if own_conn:
+                conn.close()
+
+    def _call(self, func_name, args, conn=None, record=None):
+        """
+        게임 함수 1회 호출 -> ActionResult (예외는 밖으로 던지지 않고 모두 outcome으로 변환)
+        같은 키로 다시 호출했는데 그 사이 user_plant가 삭제되면 함수가 0행을 돌려줌 -> ERROR
+        record: (req, is_correct, used_continue, tx_type) - 엔진이 빌린 연결에서 커밋까지 성공했을 때만 _record로
+        """
+        own_conn = conn is None
+        committed = False
+        # 주입된 연결은 롤백될 수 있으므로 로그를 버퍼로 빼지 않음 (_record 참고)
+        args = list(args) + [self.defer_logs and own_conn]
+        if own_conn:
+            conn = self.connect()
+            if conn is None:
+                return ActionResult(ERROR, None, None, None, 0, "DB 연결 실패")
+        try:
+            cur = conn.cursor()
+            cur.execute(f"SELECT * FROM {func_name}({', '.join(['%s'] * len(args))})", tuple(args))
+            row = cur.fetchone()
+            if own_conn:
+                # 함수 호출 하나가 트랜잭션 (실패하면 반납할 때 rollback)
+                conn.commit()
+                committed = True
+        except psycopg2.Error as e:
+            outcome = PGCODE_OUTCOMES.get(e.pgcode, ERROR)
+            if outcome == CONFIG_CHANGED:
+                # 다른 관리자가 설정을 바꿈 -> 프로세스 스냅샷 갱신
+                game_config.refresh()
+            return ActionResult(outcome, None, None, None, 0, str(e))
+        except Exception as e:
+            return ActionResult(ERROR, None, None, None, 0, str(e))
+        finally:
+            if own_conn:
+                conn.close()
+        if row is None:
+            return ActionResult(ERROR, None, None, None, 0, "식물 정보를 찾을 수 없습니다.")
+        new_step, graduated, balance, delta, replayed = row
+        result = ActionResult(DUPLICATE if replayed else OK, new_step, graduated, balance, delta, None)
+        if committed and record is not None:
+            self._record(result, *record)
+        return result
+
+    def _record(self, result, req, is_correct, used_continue, tx_type):
+        """
+        커밋 후 반영: 바뀐 잔액을 프로필 캐시에 + 지연 기록이 켜져 있으면 DB 함수가 건너뛴 로그 행을 버퍼에 추가
+        _call이 커밋 성공을 확인한 뒤에만 부름 (롤백된 액션의 잔액/로그가 남지 않도록)
+        """
+        if result.outcome == OK and result.balance is not None and req.user_id is not None:
+            profile_cache.update_points(req.user_id, result.balance)
+        if not self.defer_logs or result.outcome != OK:
+            return
+        appendlog.record_attempt(req.user_plant_id, req.step_id, is_correct, used_continue)
+        if tx_type:
+            appendlog.record_transaction(req.user_id, tx_type, result.points_delta)
+
+
+_default = None
+
+
+def default_engine():
+    """프로세스 공용 엔진 (기본 연결 풀 사용)"""
+    global _default
+    if _default is None:
+        _default = GameEngine()
+    return _default
@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 from db import get_conn
+import catalog
+from sqltrace import traced_view
 
+@traced_view
 def write_tip_view(user_id):
     """팁 작성 화면"""
     st.subheader("📝 식물 재배 팁 작성")
@@ -9,9 +12,8 @@ def write_tip_view(user_id):
     conn = get_conn()
     cursor = conn.cursor()
     
-    # 1. 대상 식물 선택
-    cursor.execute("SELECT species_id, common_name FROM plant_species ORDER BY species_id")
-    species_list = cursor.fetchall()
+    # 1. 대상 식물 선택 (도감 캐시)
+    species_list = catalog.species_names(conn)
     
     if not species_list:
         st.warning("등록된 식물이 없습니다. 관리자에게 문의하세요.")
@@ -45,6 +47,7 @@ def write_tip_view(user_id):
             st.warning("제목과 내용을 모두 입력해주세요.")
     conn.close()
 
+@traced_view
 def my_tips_view(user_id):
     """[수정됨] 내가 쓴 팁 목록 조회 및 수정/삭제"""
     st.subheader("📂 내가 등록한 팁 관리")
@@ -120,6 +123,7 @@ def my_tips_view(user_id):
 
     conn.close()
 
+@traced_view
 def expert_view():
     """전문가 메인 화면"""
     # 권한 체크
@@ -0,0 +1,261 @@
+"""
+분석용 데이터 내보내기 (Parquet / JSONL)
+
+관리자 화면의 pd.read_sql 결과를 복사하는 대신, 테이블 전체나 일부 구간을 파일로 바로 내보냄
+- 서버 측 커서(named cursor)로 EXPORT_CHUNK_ROWS행씩 받아 바로 씀 -> 수천만 행이어도 메모리는 한 묶음 크기
+  (Parquet는 묶음 하나가 row group 하나)
+- 증분 내보내기: --since-id(키 컬럼 초과) / --since, --until(시각 구간), 결과의 last_id를 다음 --since-id로
+  quiz_attempt / transaction_log는 시각 조건을 주면 해당 월 파티션만 읽음
+- 키는 INSERT 때 받고 커밋은 나중이라, 방금 들어온 행까지 내보내면 그보다 작은 키의 행이 나중에 커밋되어
+  다음 --since-id에서 영영 빠질 수 있음 -> 시각 컬럼이 있는 데이터셋은 EXPORT_SETTLE_SEC(기본 ROLLUP_SETTLE_SEC)
+  보다 오래된 행 중 가장 큰 키까지만 내보냄 (rollup.py와 같은 가정: 트랜잭션은 그 시간 안에 끝남)
+  나머지는 다음 증분에 포함됨, --settle 0이면 기록 중인 프로세스가 없을 때 끝까지
+- 임시 파일에 쓰고 끝나면 rename (중간에 실패해도 반쯤 쓴 파일이 남지 않음)
+- 끝나면 행 수, 파일 크기, MB/s를 돌려줌 (bench/export_bench.py)
+
+Parquet는 pyarrow가 필요함 (JSONL은 표준 라이브러리만 사용, 경로가 .gz로 끝나면 gzip)
+
+    python exporter.py transaction_log tx.parquet --since 2025-03-01
+    python exporter.py quiz_attempt attempts.jsonl.gz --since-id 1200000
+    python exporter.py species species.parquet
+"""
+import datetime
+import gzip
+import json
+import os
+import time
+from collections import namedtuple
+
+from db import get_conn
+
+CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+SETTLE_SEC = float(os.getenv("EXPORT_SETTLE_SEC", os.getenv("ROLLUP_SETTLE_SEC", "10")))
+FORMATS = ["parquet", "jsonl"]
+
+# sql: FROM 절까지, key: 정렬/증분 기준 컬럼, time: 시각 구간 컬럼 (없으면 None)
+# columns: (이름, 타입) - 타입은 Parquet 스키마용 ("int" / "str" / "bool" / "ts")
+Dataset = namedtuple("Dataset", ["sql", "key", "time", "columns"])
+ExportResult = namedtuple(
+    "ExportResult",
+    ["dataset", "path", "fmt", "rows", "bytes", "last_id", "elapsed_ms", "mb_per_sec", "rows_per_sec"],
+)
+
+DATASETS = {
+    # 식물 1종 x 단계 1개 = 1행 (단계가 없는 식물은 단계 컬럼이 NULL), catalog_import CSV와 같은 모양
+    "species": Dataset(
+        """
+        SELECT s.species_id, s.common_name, s.scientific_name, s.category, s.difficulty, s.sun_level,
+               s.image_url, s.description,
+               t.step_id, t.step_order, t.stage_name, t.quiz_question, t.correct_answer, t.explanation
+        FROM plant_species s
+        LEFT JOIN species_step t ON t.species_id = s.species_id
+        """,
+        "s.species_id", None,
+        [("species_id", "int"), ("common_name", "str"), ("scientific_name", "str"), ("category", "str"),
+         ("difficulty", "int"), ("sun_level", "str"), ("image_url", "str"), ("description", "str"),
+         ("step_id", "int"), ("step_order", "int"), ("stage_name", "str"), ("quiz_question", "str"),
+         ("correct_answer", "bool"), ("explanation", "str")],
+    ),
+    "user_plant": Dataset(
+        """
+        SELECT user_plant_id, user_id, species_id, current_step, is_completed, created_at
+        FROM user_plant
+        """,
+        "user_plant_id", "created_at",
+        [("user_plant_id", "int"), ("user_id", "int"), ("species_id", "int"), ("current_step", "int"),
+         ("is_completed", "bool"), ("created_at", "ts")],
+    ),
+    "quiz_attempt": Dataset(
+        """
+        SELECT attempt_id, user_plant_id, step_id, is_correct, used_continue, attempted_at
+        FROM quiz_attempt
+        """,
+        "attempt_id", "attempted_at",
+        [("attempt_id", "int"), ("user_plant_id", "int"), ("step_id", "int"), ("is_correct", "bool"),
+         ("used_continue", "bool"), ("attempted_at", "ts")],
+    ),
+    "transaction_log": Dataset(
+        """
+        SELECT log_id, user_id, transaction_type, amount, logged_at
+        FROM transaction_log
+        """,
+        "log_id", "logged_at",
+        [("log_id", "int"), ("user_id", "int"), ("transaction_type", "str"), ("amount", "int"),
+         ("logged_at", "ts")],
+    ),
+}
+
+
+def build_query(name, since_id=None, since=None, until=None, max_id=None):
+    """내보내기 SQL -> (sql, params), 키 컬럼 오름차순 (since는 포함, until은 제외, max_id는 포함)"""
+    ds = DATASETS[name]
+    where, params = [], []
+    if since_id is not None:
+        where.append(f"{ds.key} > %s")
+        params.append(since_id)
+    if max_id is not None:
+        where.append(f"{ds.key} <= %s")
+        params.append(max_id)
+    if (since is not None or until is not None) and ds.time is None:
+        raise ValueError(f"{name}은 시각 구간으로 내보낼 수 없습니다 (--since-id 사용)")
+    if since is not None:
+        where.append(f"{ds.time} >= %s")
+        params.append(since)
+    if until is not None:
+        where.append(f"{ds.time} < %s")
+        params.append(until)
+    sql = ds.sql + (" WHERE " + " AND ".join(where) if where else "") + f" ORDER BY {ds.key}"
+    if name == "species":
+        sql += ", t.step_order"
+    return sql, params
+
+
+def settled_id(conn, name, settle_sec=SETTLE_SEC):
+    """
+    settle_sec초보다 오래된 행 중 가장 큰 키 (이 키 이하의 행은 모두 커밋되었다고 봄)
+    시각 컬럼이 없거나 settle_sec <= 0이면 None (제한 없음), 해당하는 행이 없으면 0
+    키 인덱스를 큰 쪽부터 읽다가 첫 행에서 멈추므로 최근 settle_sec초 동안의 행만 건너뜀
+    """
+    ds = DATASETS[name]
+    if ds.time is None or settle_sec <= 0:
+        return None
+    cur = conn.cursor()
+    # DATASETS의 SELECT는 첫 컬럼이 키
+    cur.execute(ds.sql + f" WHERE {ds.time} <= NOW() - %s * INTERVAL '1 second' ORDER BY {ds.key} DESC LIMIT 1",
+                (settle_sec,))
+    row = cur.fetchone()
+    return row[0] if row else 0
+
+
+def iter_chunks(conn, name, since_id=None, since=None, until=None, chunk=CHUNK_ROWS, max_id=None):
+    """행 묶음(최대 chunk행 리스트)을 차례로 돌려줌, conn의 트랜잭션은 호출한 쪽에서 끝낼 것"""
+    sql, params = build_query(name, since_id, since, until, max_id)
+    cur = conn.cursor(name=f"export_{name}")
+    cur.itersize = chunk
+    try:
+        cur.execute(sql, tuple(params))
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cur.close()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+class _JsonlWriter:
+    def __init__(self, path, columns):
+        opener = gzip.open if path.endswith(".gz") else open
+        self._file = opener(path, "wt", encoding="utf-8")
+        self._names = [c for c, _ in columns]
+
+    def write(self, rows):
+        self._file.write("".join(
+            json.dumps(dict(zip(self._names, row)), ensure_ascii=False, default=_json_default) + "\n"
+            for row in rows
+        ))
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path, columns):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {"int": pa.int64(), "str": pa.string(), "bool": pa.bool_(), "ts": pa.timestamp("us")}
+        self._pa = pa
+        self._schema = pa.schema([(c, types[t]) for c, t in columns])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows):
+        pa = self._pa
+        arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), self._schema)]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {"parquet": _ParquetWriter, "jsonl": _JsonlWriter}
+
+
+def detect_format(path):
+    """경로 -> "parquet" / "jsonl" (.jsonl, .jsonl.gz, .ndjson은 JSONL)"""
+    base = path[:-3] if path.endswith(".gz") else path
+    return "jsonl" if base.endswith((".jsonl", ".ndjson")) else "parquet"
+
+
+def export(name, path, fmt=None, since_id=None, since=None, until=None, chunk=CHUNK_ROWS, conn=None,
+           settle_sec=SETTLE_SEC):
+    """
+    데이터셋 하나를 파일로 -> ExportResult (last_id: 마지막 행의 키, 다음 증분의 since_id)
+    시각 컬럼이 있는 데이터셋은 settled_id()까지만 내보냄
+    """
+    fmt = fmt or detect_format(path)
+    columns = DATASETS[name].columns
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    started = time.perf_counter()
+    tmp_path = path + ".tmp"
+    rows, last_id = 0, since_id
+    writer = None
+    try:
+        max_id = settled_id(conn, name, settle_sec)
+        writer = WRITERS[fmt](tmp_path, columns)
+        for batch in iter_chunks(conn, name, since_id, since, until, chunk, max_id):
+            writer.write(batch)
+            rows += len(batch)
+            last_id = batch[-1][0]
+        writer.close()
+        writer = None
+        conn.rollback()
+        os.replace(tmp_path, path)
+    except BaseException:
+        conn.rollback()
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(path)
+    return ExportResult(
+        name, path, fmt, rows, size, last_id, round(elapsed * 1000, 1),
+        round(size / 1e6 / elapsed, 2) if elapsed else None,
+        round(rows / elapsed, 1) if elapsed else None,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", choices=list(DATASETS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="기본: 확장자로 판단 (.jsonl/.jsonl.gz -> JSONL, 그 외 Parquet)")
+    parser.add_argument("--since-id", type=int, help="키 컬럼이 이 값보다 큰 행만 (증분)")
+    parser.add_argument("--since", help="시각 >= (예: 2025-03-01)")
+    parser.add_argument("--until", help="시각 < ")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--settle", type=float, default=SETTLE_SEC,
+                        help="이 시간(초)보다 최근 행은 다음 증분으로 미룸 (0: 끝까지)")
+    args = parser.parse_args()
+
+    res = export(args.dataset, args.path, args.format, args.since_id, args.since, args.until, args.chunk,
+                 settle_sec=args.settle)
+    print(f"{res.dataset} -> {res.path} ({res.fmt}): {res.rows:,} rows, {res.bytes / 1e6:,.1f}MB, "
+          f"{res.elapsed_ms / 1000:,.1f}s, {res.mb_per_sec}MB/s, {res.rows_per_sec:,} rows/s")
+    if res.last_id is not None:
+        print(f"다음 증분: --since-id {res.last_id}")
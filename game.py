@@ -1,172 +1,98 @@
 import streamlit as st
 import time
-from db import get_conn
+import engine
+import game_config
+import ledger
+from sqltrace import traced_view
 # [추가] 꽃비 효과를 위한 라이브러리 임포트
 from streamlit_extras.let_it_rain import rain 
 
-def get_config_value(cursor, key, default_val):
-    """DB에서 게임 설정값을 가져오는 헬퍼 함수"""
-    try:
-        cursor.execute("SELECT config_value FROM game_config WHERE config_key = %s", (key,))
-        row = cursor.fetchone()
-        return int(row[0]) if row else default_val
-    except:
-        return default_val
+CONFIG_CHANGED_MSG = "⚙️ 게임 설정이 방금 변경되었습니다. 바뀐 포인트를 확인한 뒤 다시 시도해주세요."
+DUPLICATE_MSG = "⏳ 이미 처리된 요청입니다. (중복 제출)"
+
+def quoted_value(quote_key, value):
+    """
+    직전 화면에서 사용자에게 보여준 값(설정 스냅샷, 액션 키)을 꺼내고, 이번 화면의 값으로 교체
+    (버튼/폼 제출은 다음 rerun에서 처리되므로, 보여준 값 그대로 처리하기 위함)
+    """
+    quoted = st.session_state.get(quote_key) or value
+    st.session_state[quote_key] = value
+    return quoted
 
 def get_user_plants(user_id):
     """사용자가 키우고 있는 식물 목록 가져오기"""
-    conn = get_conn()
-    if conn is None: return []
-    cursor = conn.cursor()
-    sql = """
-        SELECT up.user_plant_id, s.common_name, up.current_step, up.is_completed, s.species_id
-        FROM user_plant up
-        JOIN plant_species s ON up.species_id = s.species_id
-        WHERE up.user_id = %s
-        ORDER BY up.created_at DESC
-    """
-    cursor.execute(sql, (user_id,))
-    data = cursor.fetchall()
-    conn.close()
-    return data
+    return engine.default_engine().get_user_plants(user_id)
 
 def get_current_quiz(species_id, step_order):
-    """현재 단계의 퀴즈 정보 가져오기"""
-    conn = get_conn()
-    if conn is None: return None
-    cursor = conn.cursor()
-    sql = """
-        SELECT step_id, stage_name, quiz_question, correct_answer, explanation
-        FROM species_step
-        WHERE species_id = %s AND step_order = %s
+    """현재 단계의 퀴즈 정보 가져오기 (도감 캐시)"""
+    return engine.default_engine().get_quiz(species_id, step_order)
+
+def error_message(result):
+    """엔진 결과(실패) -> 사용자 메시지"""
+    if result.outcome == engine.CONFIG_CHANGED:
+        return CONFIG_CHANGED_MSG
+    if result.outcome == engine.INSUFFICIENT_POINTS:
+        return "포인트가 부족합니다!"
+    if result.outcome == engine.DUPLICATE:
+        return DUPLICATE_MSG
+    return f"오류: {result.error}"
+
+def sync_points(result):
+    """처리 후 잔액을 화면 세션에 반영"""
+    if result.balance is not None:
+        st.session_state.user['points'] = result.balance
+
+def process_correct_answer(user_plant_id, step_id, user_id, cfg, idem_key=None):
     """
-    cursor.execute(sql, (species_id, step_order))
-    row = cursor.fetchone()
-    conn.close()
-    return row
-
-def process_correct_answer(user_plant_id, step_id, user_id):
-    """정답 처리: 포인트 지급 + 단계 상승"""
-    conn = get_conn()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct) VALUES (%s, %s, true)", (user_plant_id, step_id))
-        
-        reward = get_config_value(cursor, 'quiz_reward', 100) # DB에서 값 가져오기
-        cursor.execute("UPDATE user_account SET points = points + %s WHERE user_id = %s", (reward, user_id))
-        cursor.execute("INSERT INTO transaction_log(user_id, transaction_type, amount) VALUES (%s, 'QUIZ_REWARD', %s)", (user_id, reward))
-        
-        cursor.execute("SELECT MAX(step_order) FROM species_step WHERE species_id = (SELECT species_id FROM species_step WHERE step_id=%s)", (step_id,))
-        max_step = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT step_order FROM species_step WHERE step_id=%s", (step_id,))
-        current_ord = cursor.fetchone()[0]
-        
-        msg = ""
-        is_graduation = False
-        
-        if current_ord < max_step:
-            cursor.execute("UPDATE user_plant SET current_step = current_step + 1 WHERE user_plant_id = %s", (user_plant_id,))
-            msg = f"🌸 정답입니다! 포인트 +{reward}P 획득! 식물이 쑥쑥 자랐어요! 🌱"
-        else:
-            cursor.execute("UPDATE user_plant SET is_completed = true WHERE user_plant_id = %s", (user_plant_id,))
-            msg = f"🎓 축하합니다! 식물 졸업! 포인트 +{reward}P 획득!"
-            is_graduation = True
-        
-        st.session_state.user['points'] += reward
-        conn.commit()
-        return True, msg, is_graduation
-    except Exception as e:
-        conn.rollback()
-        return False, f"오류: {e}", False
-    finally:
-        conn.close()
-
-def apply_step1_penalty(user_plant_id, step_id, user_id):
-    """1단계 실패 패널티"""
-    conn = get_conn()
-    cursor = conn.cursor()
-    penalty = 50
-    try:
-        cursor.execute("INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct) VALUES (%s, %s, false)", (user_plant_id, step_id))
-        cursor.execute("UPDATE user_account SET points = points - %s WHERE user_id = %s", (penalty, user_id))
-        cursor.execute("INSERT INTO transaction_log(user_id, transaction_type, amount) VALUES (%s, 'PENALTY_STEP1', %s)", (user_id, -penalty))
-        st.session_state.user['points'] -= penalty
-        conn.commit()
-        return f"❌ 1단계는 봐주지 않습니다! 포인트 -{penalty} 차감."
-    except Exception as e:
-        conn.rollback()
-        return f"오류: {e}"
-    finally:
-        conn.close()
-
-def apply_rescue_option(user_plant_id, user_id, step_id):
-    """옵션 A: 포인트 쓰고 강제 통과 (안전성 보강 버전)"""
-    conn = get_conn()
-    cursor = conn.cursor()
-    # DB에서 비용 가져오기
-    cost = get_config_value(cursor, 'revive_cost', 300)
-
-    try:
-        # 1. 포인트 잔액 확인
-        cursor.execute("SELECT points FROM user_account WHERE user_id=%s", (user_id,))
-        current_points = cursor.fetchone()[0]
-
-        if current_points < cost:
-            return False, "포인트가 부족합니다!"
-
-        # 2. 포인트 차감 및 로그 기록
-        cursor.execute("UPDATE user_account SET points = points - %s WHERE user_id = %s", (cost, user_id))
-        cursor.execute("INSERT INTO transaction_log(user_id, transaction_type, amount) VALUES (%s, 'FORCE_PASS', %s)", (user_id, -cost))
-
-        # 3. 현재 식물 정보 조회 (species_id, current_step)
-        cursor.execute("SELECT species_id, current_step FROM user_plant WHERE user_plant_id = %s", (user_plant_id,))
-        row = cursor.fetchone()
-        species_id, current_step = row[0], row[1]
-
-        # 4. 해당 종의 '최대 단계' 조회
-        cursor.execute("SELECT MAX(step_order) FROM species_step WHERE species_id = %s", (species_id,))
-        max_step = cursor.fetchone()[0]
-
-        # 5. 오답 시도 로그 (부활 사용 표시)
-        cursor.execute("INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct, used_continue) VALUES (%s, %s, false, true)", (user_plant_id, step_id))
-
-        # 6. 단계 상승 로직 (졸업 체크)
-        if current_step >= max_step:
-            # 이미 마지막 단계였으면 졸업 처리
-            cursor.execute("UPDATE user_plant SET is_completed = true WHERE user_plant_id = %s", (user_plant_id,))
-            msg = f"💸 {cost}P를 사용하여 위기를 넘기고 졸업했습니다! 🎓"
-        else:
-            # 다음 단계로 이동
-            cursor.execute("UPDATE user_plant SET current_step = current_step + 1 WHERE user_plant_id = %s", (user_plant_id,))
-            msg = f"💸 {cost}P를 사용하여 위기를 넘겼습니다! 다음 단계로 성장합니다. 🌱"
-
-        # 7. 세션 업데이트 및 커밋
-        st.session_state.user['points'] -= cost
-        conn.commit()
-        return True, msg
-
-    except Exception as e:
-        conn.rollback()
-        return False, f"오류 발생: {e}"
-    finally:
-        conn.close()
+    정답 처리: 포인트 지급 + 단계 상승 (cfg: 화면에 보여준 설정 스냅샷)
+    idem_key: 같은 키로 다시 제출되면 아무것도 바꾸지 않음 (ledger.plant_action_key)
+    """
+    result = engine.default_engine().answer_correct(
+        engine.ActionRequest(user_id, user_plant_id, step_id, cfg, idem_key))
+    if result.outcome != engine.OK:
+        return False, error_message(result), False
+
+    reward = result.points_delta
+    if result.graduated:
+        msg = f"🎓 축하합니다! 식물 졸업! 포인트 +{reward}P 획득!"
+    else:
+        msg = f"🌸 정답입니다! 포인트 +{reward}P 획득! 식물이 쑥쑥 자랐어요! 🌱"
+    sync_points(result)
+    return True, msg, result.graduated
+
+def apply_step1_penalty(user_plant_id, step_id, user_id, cfg, idem_key=None):
+    """1단계 실패 패널티 (잔액이 모자라면 남은 만큼만 차감)"""
+    result = engine.default_engine().step1_penalty(
+        engine.ActionRequest(user_id, user_plant_id, step_id, cfg, idem_key))
+    if result.outcome != engine.OK:
+        return error_message(result)
+
+    sync_points(result)
+    return f"❌ 1단계는 봐주지 않습니다! 포인트 {result.points_delta} 차감."
+
+def apply_rescue_option(user_plant_id, user_id, step_id, cfg, idem_key=None):
+    """옵션 A: 포인트 쓰고 강제 통과 (잔액 확인 + 차감을 DB에서 한 번에)"""
+    result = engine.default_engine().rescue(
+        engine.ActionRequest(user_id, user_plant_id, step_id, cfg, idem_key))
+    if result.outcome != engine.OK:
+        return False, error_message(result)
+
+    cost = -result.points_delta
+    if result.graduated:
+        msg = f"💸 {cost}P를 사용하여 위기를 넘기고 졸업했습니다! 🎓"
+    else:
+        msg = f"💸 {cost}P를 사용하여 위기를 넘겼습니다! 다음 단계로 성장합니다. 🌱"
+    sync_points(result)
+    return True, msg
 
 def apply_reset_option(user_plant_id, step_id):
     """옵션 B: 무료 초기화"""
-    conn = get_conn()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("UPDATE user_plant SET current_step = 1 WHERE user_plant_id = %s", (user_plant_id,))
-        cursor.execute("INSERT INTO quiz_attempt(user_plant_id, step_id, is_correct) VALUES (%s, %s, false)", (user_plant_id, step_id))
-        conn.commit()
-        return "🔄 처음부터 다시 시작합니다. (포인트 차감 없음)"
-    except Exception as e:
-        conn.rollback()
-        return f"오류: {e}"
-    finally:
-        conn.close()
+    result = engine.default_engine().reset(engine.ActionRequest(None, user_plant_id, step_id, None))
+    if result.outcome != engine.OK:
+        return error_message(result)
+    return "🔄 처음부터 다시 시작합니다. (포인트 차감 없음)"
 
+@traced_view
 def game_view():
     st.header("🌿 내 식물 키우기")
     
@@ -199,7 +125,10 @@ def game_view():
     selected_tab = st.selectbox("관리할 식물을 선택하세요", plant_names)
     
     idx = plant_names.index(selected_tab)
-    u_plant_id, p_name, cur_step, is_comp, s_id = my_plants[idx]
+    u_plant_id, p_name, cur_step, is_comp, s_id, action_seq = my_plants[idx]
+    # 제출은 그 폼을 보여준 화면의 키로 처리 -> 같은 화면에서 두 번 눌러도 한 번만 반영
+    key_quote = f"action_key_{u_plant_id}"
+    idem_key = quoted_value(key_quote, ledger.plant_action_key(u_plant_id, action_seq))
     
     st.markdown(f"### 🌱 {p_name} (현재: {cur_step}단계)")
     
@@ -219,21 +148,20 @@ def game_view():
         return
 
     step_id, stage_name, q_text, ans_bool, expl = quiz_data
+    # 게임 설정 스냅샷 (DB 조회 없이 메모리에서)
+    cfg = game_config.current()
 
     # 실패 상황 (선택지 화면)
     if st.session_state[state_key] == 'failed_high':
         st.error(f"❌ 틀렸습니다! ({expl})")
         st.warning("🚨 위기 상황! 선택하세요.")
-        # [추가된 부분] 화면에 표시할 비용을 DB에서 잠깐 조회해옴
-        conn_tmp = get_conn()
-        cur_tmp = conn_tmp.cursor()
-        current_revive_cost = get_config_value(cur_tmp, 'revive_cost', 300)
-        conn_tmp.close()
+        # 버튼에 보여준 비용(스냅샷) 그대로 차감
+        shown_cfg = quoted_value(f"revive_quote_{u_plant_id}", cfg)
 
         c1, c2 = st.columns(2)
         with c1:
-            if st.button(f"💸 {current_revive_cost}P 내고 넘어가기", use_container_width=True):
-                success, msg = apply_rescue_option(u_plant_id, user['user_id'], step_id)
+            if st.button(f"💸 {cfg.revive_cost}P 내고 넘어가기", use_container_width=True):
+                success, msg = apply_rescue_option(u_plant_id, user['user_id'], step_id, shown_cfg, idem_key)
                 if success:
                     st.session_state['celebrate_msg'] = msg
                     st.session_state[state_key] = None
@@ -251,6 +179,8 @@ def game_view():
     # 정상 퀴즈 화면
     st.info(f"📍 **{stage_name} 단계** 도전!")
     st.markdown(f"### Q. {q_text}")
+    st.caption(f"정답 시 +{cfg.quiz_reward}P" + (f" | 1단계 오답 시 -{cfg.step1_penalty}P" if cur_step == 1 else ""))
+    shown_cfg = quoted_value(f"quiz_quote_{u_plant_id}", cfg)
     
     with st.form(key=f"q_form_{u_plant_id}_{cur_step}"):
         choice = st.radio("정답은?", ["O", "X"])
@@ -261,7 +191,7 @@ def game_view():
             
             if user_ans == ans_bool:
                 # [정답]
-                ok, msg, is_grad = process_correct_answer(u_plant_id, step_id, user['user_id'])
+                ok, msg, is_grad = process_correct_answer(u_plant_id, step_id, user['user_id'], shown_cfg, idem_key)
                 if ok:
                     # 세션에 메시지 저장 후 리런 -> 위쪽에서 rain() 실행됨
                     st.session_state['celebrate_msg'] = msg
@@ -272,7 +202,9 @@ def game_view():
             else:
                 # [오답]
                 if cur_step == 1:
-                    msg = apply_step1_penalty(u_plant_id, step_id, user['user_id'])
+                    msg = apply_step1_penalty(u_plant_id, step_id, user['user_id'], shown_cfg, idem_key)
+                    # rerun 없이 같은 폼이 다시 보이므로 다음 제출은 다음 키로
+                    st.session_state[key_quote] = ledger.plant_action_key(u_plant_id, action_seq + 1)
                     st.error(f"틀렸습니다! ({expl})")
                     st.error(msg)
                     st.session_state[state_key] = None 
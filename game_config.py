@@ -0,0 +1,79 @@
+"""
+게임 경제 설정 스냅샷 (game_config 테이블)
+
+설정값을 매번 SELECT하지 않고 프로세스에 한 번 읽어두고,
+content_mgr.manage_game_config에서 저장하면 config_version을 올리고 다시 읽음.
+게임 화면은 사용자에게 보여준 스냅샷(버전 포함)을 그대로 들고 가서 그 값으로 처리하고,
+버전이 그 사이 바뀌었으면 DB 함수(pium_check_config_version)가 거절함.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+
+from db import get_conn
+
+GameConfig = namedtuple("GameConfig", ["version", "revive_cost", "quiz_reward", "step1_penalty"])
+
+# DB에 값이 없을 때 쓰는 기본값
+DEFAULTS = {"revive_cost": 300, "quiz_reward": 100, "step1_penalty": 50}
+# 다른 서버 프로세스에서 바꾼 설정을 반영하기 위한 최대 보관 시간(초)
+TTL_SEC = float(os.getenv("GAME_CONFIG_TTL", "30"))
+
+_lock = threading.Lock()
+_snapshot = None
+_loaded_at = 0.0
+
+
+def load(conn=None):
+    """DB에서 설정 전체를 읽어 GameConfig로 반환"""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT config_key, config_value FROM game_config")
+        raw = dict(cur.fetchall())
+    finally:
+        if own_conn:
+            conn.close()
+
+    values = {key: int(raw.get(key, default)) for key, default in DEFAULTS.items()}
+    return GameConfig(version=int(raw.get("config_version", 0)), **values)
+
+
+def refresh(conn=None):
+    """스냅샷 강제 갱신"""
+    global _snapshot, _loaded_at
+    snapshot = load(conn)
+    with _lock:
+        _snapshot = snapshot
+        _loaded_at = time.monotonic()
+    return snapshot
+
+
+def current(conn=None):
+    """현재 스냅샷 (TTL이 지났을 때만 DB 조회)"""
+    with _lock:
+        if _snapshot is not None and time.monotonic() - _loaded_at < TTL_SEC:
+            return _snapshot
+    return refresh(conn)
+
+
+def save(cursor, values):
+    """
+    설정 저장 + config_version 1 증가 (호출한 쪽 트랜잭션 안에서 실행, 커밋은 호출자가)
+    반환: 새 버전 번호
+    """
+    for key, value in values.items():
+        cursor.execute("""
+            INSERT INTO game_config (config_key, config_value) VALUES (%s, %s)
+            ON CONFLICT (config_key) DO UPDATE SET config_value = EXCLUDED.config_value
+        """, (key, str(value)))
+    cursor.execute("""
+        INSERT INTO game_config (config_key, config_value) VALUES ('config_version', '1')
+        ON CONFLICT (config_key) DO UPDATE
+            SET config_value = (game_config.config_value::int + 1)::text
+        RETURNING config_value
+    """)
+    return int(cursor.fetchone()[0])
@@ -0,0 +1,70 @@
+"""
+한글 검색 키 유틸리티
+- choseong_key("몬스테라") -> "ㅁㅅㅌㄹ" (초성 검색용 키, plant_species.search_key에 저장)
+- is_choseong_query("ㅁㅅㅌ") -> True
+
+기존 DB의 search_key 채우기:
+    python hangul.py
+"""
+
+# 유니코드 한글 음절의 초성 19자 (가 = 0xAC00 기준, 초성 하나당 21*28 글자)
+CHOSEONG = [
+    "ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ",
+    "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+_SYLLABLE_FIRST = 0xAC00
+_SYLLABLE_LAST = 0xD7A3
+_CHOSEONG_SET = set(CHOSEONG)
+
+
+def choseong_key(text):
+    """
+    초성 검색 키 생성
+    한글 음절은 초성으로, 영문은 소문자로 바꾸고 공백/기호는 버림
+    """
+    if not text:
+        return ""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if _SYLLABLE_FIRST <= code <= _SYLLABLE_LAST:
+            out.append(CHOSEONG[(code - _SYLLABLE_FIRST) // (21 * 28)])
+        elif ch in _CHOSEONG_SET or ch.isalnum():
+            out.append(ch.lower())
+    return "".join(out)
+
+
+def is_choseong_query(term):
+    """검색어가 초성(자음)만으로 이루어졌는지 (공백 무시)"""
+    chars = [ch for ch in term if not ch.isspace()]
+    return bool(chars) and all(ch in _CHOSEONG_SET for ch in chars)
+
+
+def backfill_search_keys(conn, batch_size=1000):
+    """search_key가 비어 있는 식물의 초성 키를 채움 (기존 DB 마이그레이션용)"""
+    cur = conn.cursor()
+    updated = 0
+    while True:
+        cur.execute(
+            "SELECT species_id, common_name FROM plant_species WHERE search_key IS NULL LIMIT %s",
+            (batch_size,),
+        )
+        rows = cur.fetchall()
+        if not rows:
+            break
+        cur.executemany(
+            "UPDATE plant_species SET search_key = %s WHERE species_id = %s",
+            [(choseong_key(name), sid) for sid, name in rows],
+        )
+        conn.commit()
+        updated += len(rows)
+    return updated
+
+
+if __name__ == "__main__":
+    from db import get_conn
+
+    conn = get_conn()
+    if conn:
+        print(f"search_key 갱신: {backfill_search_keys(conn)}건")
+        conn.close()
@@ -0,0 +1,25 @@
+"""
+포인트 원장 상수 / 멱등 키 (원장 자체는 create_tables.sql [5] pium_ledger_apply)
+
+게임 중 포인트 변동(정답 보상 / 1단계 패널티 / 부활)은 모두 DB 게임 함수 안에서 pium_ledger_apply를 거침
+(engine.py가 호출, PI002 잔액 부족 등은 engine.ActionResult로 변환)
+- 차감은 "잔액 >= 금액"일 때만 한 문장으로 처리 (동시에 두 번 눌러도 음수가 되지 않음)
+- idem_key를 넘기면 같은 키는 한 번만 반영 (폼 중복 제출 방지)
+- 반영된 금액은 transaction_log에 같은 트랜잭션으로 기록
+- 커밋한 뒤에는 profile_cache.update_points(user_id, balance)로 화면 헤더의 포인트도 갱신
+
+예외: 계정을 만들 때의 시작 포인트는 user_account.points 초기값으로 넣고 SIGNUP_BONUS 로그만 남김
+(roster.py - 새 계정이라 조건부 차감/멱등 키가 필요 없고, 명단 전체를 한 문장으로 처리)
+이 모듈은 파이썬 쪽 원장 API가 아니라 transaction_type 값과 멱등 키 규칙만 모아 둔 곳
+"""
+# transaction_log.transaction_type 값
+QUIZ_REWARD = "QUIZ_REWARD"
+PENALTY_STEP1 = "PENALTY_STEP1"
+FORCE_PASS = "FORCE_PASS"
+# 명단 일괄 가입 시 시작 포인트 (roster.py)
+SIGNUP_BONUS = "SIGNUP_BONUS"
+
+
+def plant_action_key(user_plant_id, action_seq):
+    """퀴즈 액션 멱등 키: 같은 화면(같은 action_seq)에서 나온 제출은 한 번만 반영"""
+    return f"plant-{user_plant_id}-{action_seq}"
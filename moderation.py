@@ -0,0 +1,144 @@
+"""
+팁 신고 처리 큐 / 게시물 모니터링 (content_mgr.manage_tips_moderation)
+
+- 신고는 팁 단위로 묶어서 보여줌 (신고 수, 최근 사유 REASON_COUNT개, 마지막 신고 시각)
+- 두 목록 모두 keyset 페이지 + 식물/작성자/숨김 상태 필터
+- 여러 건을 골라 한 번에 처리: 한 트랜잭션, 감사 로그는 항목마다 1행 (INSERT ... SELECT로 한 번에)
+  함수는 커밋하지 않음 -> 호출한 쪽에서 commit / rollback
+"""
+import os
+from collections import namedtuple
+
+PAGE_SIZE = int(os.getenv("MODERATION_PAGE_SIZE", "20"))
+# 신고 묶음에 보여줄 최근 사유 개수
+REASON_COUNT = 3
+
+# hidden: None = 전체, True = 숨김만, False = 게시 중만
+TipFilter = namedtuple("TipFilter", ["species_id", "expert_id", "hidden"], defaults=(None, None, None))
+ReportGroup = namedtuple(
+    "ReportGroup",
+    ["tip_id", "title", "content", "species", "author", "is_hidden", "report_count", "reasons", "latest_at"],
+)
+TipRow = namedtuple("TipRow", ["tip_id", "title", "content", "species", "author", "is_hidden", "created_at"])
+
+
+def _tip_filter(f):
+    where, params = [], []
+    if f.species_id is not None:
+        where.append("t.species_id = %s")
+        params.append(f.species_id)
+    if f.expert_id is not None:
+        where.append("t.expert_id = %s")
+        params.append(f.expert_id)
+    if f.hidden is not None:
+        where.append("t.is_hidden = %s")
+        params.append(f.hidden)
+    return where, params
+
+
+def _page(cursor, sql, params, page_size):
+    cursor.execute(sql, tuple(params) + (page_size + 1,))
+    rows = cursor.fetchall()
+    return rows[:page_size], len(rows) > page_size
+
+
+def report_queue(cursor, f=TipFilter(), after=None, page_size=PAGE_SIZE):
+    """
+    신고된 팁 목록 (마지막 신고 최신순) -> ([ReportGroup], 다음 페이지 여부)
+    after: 이전 페이지 마지막 항목의 (latest_at, tip_id)
+    """
+    where, params = _tip_filter(f)
+    if after is not None:
+        where.append("(r.latest_at, r.tip_id) < (%s, %s)")
+        params += list(after)
+    sql = f"""
+        SELECT t.tip_id, t.title, t.content, s.common_name, u.name, t.is_hidden,
+               r.report_count, r.reasons, r.latest_at
+        FROM (
+            SELECT tip_id, COUNT(*) AS report_count, MAX(created_at) AS latest_at,
+                   (ARRAY_AGG(reason ORDER BY created_at DESC))[1:{REASON_COUNT}] AS reasons
+            FROM tip_report
+            GROUP BY tip_id
+        ) r
+        JOIN expert_tip t ON t.tip_id = r.tip_id
+        JOIN plant_species s ON s.species_id = t.species_id
+        JOIN user_account u ON u.user_id = t.expert_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY r.latest_at DESC, r.tip_id DESC
+        LIMIT %s
+    """
+    rows, has_next = _page(cursor, sql, params, page_size)
+    return [ReportGroup(*row) for row in rows], has_next
+
+
+def tip_list(cursor, f=TipFilter(), after=None, page_size=PAGE_SIZE):
+    """
+    전체 팁 목록 (작성 최신순) -> ([TipRow], 다음 페이지 여부)
+    after: 이전 페이지 마지막 항목의 (created_at, tip_id)
+    """
+    where, params = _tip_filter(f)
+    if after is not None:
+        where.append("(t.created_at, t.tip_id) < (%s, %s)")
+        params += list(after)
+    sql = f"""
+        SELECT t.tip_id, t.title, t.content, s.common_name, u.name, t.is_hidden, t.created_at
+        FROM expert_tip t
+        JOIN plant_species s ON s.species_id = t.species_id
+        JOIN user_account u ON u.user_id = t.expert_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY t.created_at DESC, t.tip_id DESC
+        LIMIT %s
+    """
+    rows, has_next = _page(cursor, sql, params, page_size)
+    return [TipRow(*row) for row in rows], has_next
+
+
+def _audit(cursor, admin_id, action_type, prefix, tip_ids):
+    """처리한 팁마다 감사 로그 1행 (content_mgr.insert_audit_log와 같은 형식)"""
+    cursor.execute("""
+        INSERT INTO audit_log (admin_id, action_type, target_id, details)
+        SELECT %s, %s, tip_id, %s || title FROM expert_tip WHERE tip_id = ANY(%s)
+    """, (admin_id, action_type, prefix, list(tip_ids)))
+
+
+def _close_reports(cursor, tip_ids):
+    """팁들의 신고를 모두 삭제(처리 완료) -> 실제로 신고가 있던 tip_id 목록 (다른 사람이 먼저 처리한 팁은 빠짐)"""
+    cursor.execute("""
+        WITH done AS (DELETE FROM tip_report WHERE tip_id = ANY(%s) RETURNING tip_id)
+        SELECT DISTINCT tip_id FROM done
+    """, (list(tip_ids),))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def accept_reports(cursor, admin_id, tip_ids):
+    """신고 수락: 팁 숨김 + 그 팁의 신고 모두 처리 완료 -> 처리한 팁 수"""
+    handled = _close_reports(cursor, tip_ids)
+    if not handled:
+        return 0
+    cursor.execute("UPDATE expert_tip SET is_hidden = TRUE WHERE tip_id = ANY(%s)", (handled,))
+    _audit(cursor, admin_id, "HIDE_TIP_REPORT", "신고 수락 및 숨김: ", handled)
+    return len(handled)
+
+
+def dismiss_reports(cursor, admin_id, tip_ids):
+    """신고 반려: 팁은 그대로 두고 신고만 처리 완료 -> 처리한 팁 수"""
+    handled = _close_reports(cursor, tip_ids)
+    if handled:
+        _audit(cursor, admin_id, "IGNORE_REPORT", "신고 반려: ", handled)
+    return len(handled)
+
+
+def set_hidden(cursor, admin_id, tip_ids, hidden):
+    """게시물 숨김/복구 (상태가 실제로 바뀐 팁만 감사 로그) -> 바뀐 팁 수"""
+    cursor.execute("""
+        UPDATE expert_tip SET is_hidden = %s
+        WHERE tip_id = ANY(%s) AND is_hidden IS DISTINCT FROM %s
+        RETURNING tip_id
+    """, (hidden, list(tip_ids), hidden))
+    changed = [row[0] for row in cursor.fetchall()]
+    if changed:
+        if hidden:
+            _audit(cursor, admin_id, "HIDE", "숨김: ", changed)
+        else:
+            _audit(cursor, admin_id, "UNHIDE", "복구: ", changed)
+    return len(changed)
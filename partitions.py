@@ -0,0 +1,249 @@
+"""
+월별 파티션 관리 (quiz_attempt / transaction_log / audit_log)
+
+세 테이블은 시각 컬럼 기준 월별 RANGE 파티션 (create_tables.sql 2번, [5-1])
+- ensure(): 다음 PARTITION_MONTHS_AHEAD개월치 파티션을 미리 만듦 (pium_ensure_partitions)
+- archive(): 보관 기간이 지난 월 파티션을 DETACH -> gzip CSV로 내보내기 -> DROP
+  (DETACH를 먼저 커밋하므로 내보내는 중에 새 행이 들어오지 않고,
+   내보내기 중간에 죽어도 떼어낸 테이블이 남아 있어 다음 실행에서 이어서 처리함)
+- stats.py 스케줄러가 PARTITION_CHECK_SEC마다 maintain() 실행 (보관 정리는 RETENTION_ENABLED=1일 때만)
+- 서버 프로세스가 여러 개여도 만들기/정리는 한 곳에서만 (pg_try_advisory_lock, stats.refresh와 같은 방식)
+  잠금을 못 잡으면 ensure() / archive()는 아무것도 하지 않고 None
+
+조회 쪽은 바뀐 것이 없음: 부모 테이블 이름 그대로 읽고 쓰며,
+시각 조건/정렬이 있는 조회는 필요한 파티션만 읽음 (partition pruning)
+
+    python partitions.py ensure [--from 2025-01-01]   # 파티션 생성 (--from: 과거 월도 만들어 DEFAULT에서 옮김)
+    python partitions.py list
+    python partitions.py archive [--dry-run]           # 보관 기간 지난 파티션 정리
+"""
+import datetime
+import gzip
+import os
+import re
+import time
+from collections import namedtuple
+
+from db import get_conn
+
+# 파티션 테이블 -> 파티션 키 컬럼
+TABLES = {
+    "quiz_attempt": "attempted_at",
+    "transaction_log": "logged_at",
+    "audit_log": "created_at",
+}
+MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+CHECK_SEC = float(os.getenv("PARTITION_CHECK_SEC", "3600"))
+# 보관 기간(개월), 0이면 영구 보관
+RETENTION_MONTHS = {
+    "quiz_attempt": int(os.getenv("RETENTION_QUIZ_ATTEMPT_MONTHS", "12")),
+    "transaction_log": int(os.getenv("RETENTION_TRANSACTION_LOG_MONTHS", "24")),
+    "audit_log": int(os.getenv("RETENTION_AUDIT_LOG_MONTHS", "36")),
+}
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "0") == "1"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+LOCK_NAME = "pium_partitions"
+
+# rows는 통계상 추정치(reltuples), attached=False면 떼어낸 뒤 아직 내보내지 못한 테이블
+Partition = namedtuple("Partition", ["table", "name", "month", "attached", "rows"])
+# 내보낸 파티션 1개
+Archived = namedtuple("Archived", ["table", "name", "path", "rows", "elapsed_ms"])
+
+
+def _month_start(day):
+    return datetime.date(day.year, day.month, 1)
+
+
+def _add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _try_lock(cur):
+    """세션 단위 advisory lock (커밋해도 유지됨, 같은 세션 안에서는 다시 잡을 수 있음)"""
+    cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (LOCK_NAME,))
+    return cur.fetchone()[0]
+
+
+def _unlock(conn):
+    conn.rollback()
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (LOCK_NAME,))
+    conn.commit()
+
+
+def ensure(conn=None, start=None, months_ahead=MONTHS_AHEAD):
+    """
+    start(기본: 이번 달) ~ 다음 months_ahead개월 파티션 생성 -> {테이블: 새로 만든 개수}
+    다른 프로세스가 파티션 작업 중이면 None
+    """
+    today = datetime.date.today()
+    start = _month_start(start or today)
+    end = _add_months(_month_start(today), months_ahead)
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        cur = conn.cursor()
+        if not _try_lock(cur):
+            conn.rollback()
+            return None
+        try:
+            created = {}
+            for table in TABLES:
+                cur.execute("SELECT pium_ensure_partitions(%s, %s, %s)", (table, start, max(start, end)))
+                created[table] = cur.fetchone()[0]
+            conn.commit()
+            return created
+        finally:
+            _unlock(conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def list_partitions(table, conn=None):
+    """월 파티션 목록 (붙어 있는 것 + 떼어냈지만 아직 남은 것), 오래된 순"""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT c.relname, c.reltuples::bigint,
+                   EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relkind = 'r' AND c.relname ~ %s
+            ORDER BY c.relname
+        """, (f"^{table}_p[0-9]{{6}}$",))
+        rows = cur.fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    result = []
+    for name, reltuples, attached in rows:
+        ym = re.search(r"_p(\d{4})(\d{2})$", name)
+        month = datetime.date(int(ym.group(1)), int(ym.group(2)), 1)
+        result.append(Partition(table, name, month, attached, max(reltuples, 0)))
+    return result
+
+
+def expired(table, conn=None, keep_months=None, today=None):
+    """보관 기간이 지난 파티션 (이번 달 포함 keep_months개월은 남김, 떼어낸 채 남은 것은 항상 포함)"""
+    keep_months = RETENTION_MONTHS[table] if keep_months is None else keep_months
+    if keep_months <= 0:
+        return [p for p in list_partitions(table, conn) if not p.attached]
+    cutoff = _add_months(_month_start(today or datetime.date.today()), -(keep_months - 1))
+    return [p for p in list_partitions(table, conn) if p.month < cutoff or not p.attached]
+
+
+def _export(cur, name, path):
+    """COPY ... TO STDOUT을 gzip 파일로 바로 흘려 씀 (메모리에 모으지 않음), 임시 파일 -> rename"""
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as f:
+        cur.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _rolled_up(cur, partition):
+    """transaction_log 파티션은 포인트 흐름 롤업(rollup.py)에 모두 반영된 뒤에만 정리"""
+    if partition.table != "transaction_log":
+        return True
+    cur.execute(f"""
+        SELECT NOT EXISTS (
+            SELECT 1 FROM {partition.name}
+            WHERE log_id > (SELECT last_log_id FROM rollup_state WHERE source_name = 'transaction_log')
+        )
+    """)
+    return cur.fetchone()[0]
+
+
+def archive(table, conn=None, keep_months=None, archive_dir=ARCHIVE_DIR, dry_run=False):
+    """
+    보관 기간 지난 파티션 정리 -> [Archived] (dry_run이면 대상만 반환, rows는 추정치)
+    다른 프로세스가 파티션 작업 중이면 None
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    done = []
+    locked = False
+    try:
+        cur = conn.cursor()
+        if not dry_run:
+            locked = _try_lock(cur)
+            if not locked:
+                conn.rollback()
+                return None
+        # 대상 목록은 잠금을 잡은 뒤에 읽음 (다른 프로세스가 방금 정리한 파티션을 다시 떼어내지 않도록)
+        targets = expired(table, conn, keep_months)
+        if dry_run:
+            return [Archived(table, p.name, None, p.rows, 0) for p in targets]
+        os.makedirs(archive_dir, exist_ok=True)
+        for partition in targets:
+            if not _rolled_up(cur, partition):
+                conn.rollback()
+                continue
+            started = time.perf_counter()
+            if partition.attached:
+                cur.execute(f"ALTER TABLE {table} DETACH PARTITION {partition.name}")
+                conn.commit()
+            cur.execute(f"SELECT COUNT(*) FROM {partition.name}")
+            rows = cur.fetchone()[0]
+            path = os.path.join(archive_dir, f"{partition.name}.csv.gz")
+            _export(cur, partition.name, path)
+            cur.execute(f"DROP TABLE {partition.name}")
+            conn.commit()
+            done.append(Archived(table, partition.name, path, rows,
+                                 round((time.perf_counter() - started) * 1000, 1)))
+        return done
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if locked:
+            _unlock(conn)
+        if own_conn:
+            conn.close()
+
+
+_last_maintained = 0.0
+
+
+def maintain():
+    """스케줄러용: CHECK_SEC마다 파티션 미리 만들기 + (RETENTION_ENABLED면) 보관 정리"""
+    global _last_maintained
+    if time.monotonic() - _last_maintained < CHECK_SEC and _last_maintained:
+        return None
+    _last_maintained = time.monotonic()
+    # 다른 프로세스가 작업 중이면 (None) 이번 주기는 건너뜀 - 그쪽이 같은 일을 함
+    result = {"created": ensure()}
+    if RETENTION_ENABLED:
+        result["archived"] = [a._asdict() for table in TABLES for a in (archive(table) or [])]
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "ensure":
+        start = None
+        if "--from" in sys.argv:
+            start = datetime.date.fromisoformat(sys.argv[sys.argv.index("--from") + 1])
+        print(ensure(start=start) or "다른 프로세스가 파티션 작업 중입니다.")
+    elif command == "archive":
+        for table in TABLES:
+            items = archive(table, dry_run="--dry-run" in sys.argv)
+            if items is None:
+                print(f"{table}: 다른 프로세스가 파티션 작업 중입니다.")
+                continue
+            for item in items:
+                print(f"{item.name:32} rows={item.rows:,} -> {item.path or '(dry run)'}")
+    else:
+        for table in TABLES:
+            for p in list_partitions(table):
+                print(f"{p.name:32} {p.month} rows~{p.rows:,}{'' if p.attached else ' (detached)'}")
@@ -0,0 +1,198 @@
+"""
+비밀번호 해시 (argon2id) + 전용 프로세스 풀
+
+argon2는 일부러 CPU/메모리를 많이 쓰는 해시라, 수업 시작 직후처럼 로그인이 몰릴 때
+Streamlit 스크립트 스레드에서 바로 계산하면 다른 화면까지 느려짐
+- 해시/검증은 PASSWORD_WORKERS개 프로세스 풀에서 실행 (0이면 호출한 스레드에서 바로, CLI/개발용)
+- 대기 중인 작업이 PASSWORD_QUEUE_MAX개를 넘으면 PASSWORD_QUEUE_WAIT초까지만 기다리고 PasswordBusy
+  (끝없이 쌓이지 않게 - 화면에는 "잠시 후 다시 시도"), PASSWORD_TASK_TIMEOUT 초과도 PasswordBusy
+- 작업 프로세스가 죽으면(OOM 등) 풀을 새로 만들고 한 번만 다시 시도 (서버 재시작 없이 복구)
+- 명단 일괄 해시(make_hashes)도 같은 대기열을 쓰되 동시에 PASSWORD_BULK_WORKERS개 묶음까지만
+  (나머지 작업 프로세스는 로그인용으로 남김)
+- 기존 평문 행은 로그인에 성공할 때 같은 작업 안에서 argon2로 다시 해시 (needs_rehash: 평문 / 예전 파라미터)
+  -> auth.login_user가 UPDATE ... WHERE password_hash = 이전 값 으로 바꿔 넣음
+
+이 모듈은 작업 프로세스에서도 import되므로 streamlit / db를 import하지 않음
+"""
+import atexit
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+WORKERS = int(os.getenv("PASSWORD_WORKERS", str(os.cpu_count() or 1)))
+QUEUE_MAX = int(os.getenv("PASSWORD_QUEUE_MAX", str(max(1, WORKERS) * 8)))
+QUEUE_WAIT_SEC = float(os.getenv("PASSWORD_QUEUE_WAIT", "5"))
+# 작업 하나가 이보다 오래 걸리면 포기 (풀이 멈췄을 때 화면이 영원히 기다리지 않도록)
+TASK_TIMEOUT_SEC = float(os.getenv("PASSWORD_TASK_TIMEOUT", "30"))
+# 일괄 해시가 동시에 쓰는 작업 프로세스 수 (기본: 전체의 1/4)
+BULK_WORKERS = int(os.getenv("PASSWORD_BULK_WORKERS", str(max(1, WORKERS // 4))))
+BULK_CHUNK = 16
+
+HASH_PREFIX = "$argon2"
+_hasher = PasswordHasher()
+# 없는 ID로 로그인할 때도 같은 시간이 걸리도록 검증에 쓰는 가짜 해시
+_DUMMY_HASH = _hasher.hash("pium-dummy-password")
+
+_lock = threading.Lock()
+_pool = None
+_slots = threading.BoundedSemaphore(QUEUE_MAX)
+_stats = {"submitted": 0, "busy": 0, "timeouts": 0, "restarts": 0, "rehashed": 0}
+
+
+class PasswordBusy(Exception):
+    """해시 작업 대기열이 가득 참"""
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(HASH_PREFIX)
+
+
+def hash_password(plain):
+    """평문 -> argon2id 해시 문자열 (작업 프로세스에서 실행되는 함수)"""
+    return _hasher.hash(plain)
+
+
+def _hash_many(plains):
+    return [_hasher.hash(p) for p in plains]
+
+
+def check(stored, plain):
+    """
+    저장된 값과 평문 비교 -> (일치 여부, 새 해시 또는 None) (작업 프로세스에서 실행되는 함수)
+    새 해시는 일치했고 저장된 값이 평문이거나 예전 파라미터일 때만 만듦
+    """
+    if stored is None:
+        try:
+            _hasher.verify(_DUMMY_HASH, plain)
+        except VerificationError:
+            pass
+        return False, None
+    if not is_hashed(stored):
+        ok = hmac.compare_digest(stored.encode(), plain.encode())
+        return ok, (_hasher.hash(plain) if ok else None)
+    try:
+        _hasher.verify(stored, plain)
+    except (VerificationError, InvalidHashError):
+        return False, None
+    return True, (_hasher.hash(plain) if _hasher.check_needs_rehash(stored) else None)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                # 서버 프로세스는 스레드가 많으므로 fork 대신 spawn (작업 프로세스는 이 모듈만 import)
+                context = multiprocessing.get_context(os.getenv("PASSWORD_MP_START", "spawn"))
+                _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=context)
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def _reset_pool(broken):
+    """죽은 작업 프로세스가 있는 풀을 버림 (다음 _get_pool()에서 새로 만듦)"""
+    global _pool
+    with _lock:
+        if _pool is not broken:
+            return
+        _pool = None
+        _stats["restarts"] += 1
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _busy(message="로그인 요청이 많습니다. 잠시 후 다시 시도해 주세요."):
+    with _lock:
+        _stats["busy"] += 1
+    return PasswordBusy(message)
+
+
+def _submit(pool, func, args, wait):
+    """대기열 자리를 잡고 풀에 제출 -> future (자리는 작업이 끝나면 반납)"""
+    if not _slots.acquire(timeout=wait):
+        raise _busy()
+    try:
+        future = pool.submit(func, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    with _lock:
+        _stats["submitted"] += 1
+    return future
+
+
+def _run(func, *args, wait=QUEUE_WAIT_SEC):
+    """
+    풀에서 func(*args) 실행 후 결과
+    대기열이 가득 차 wait초를 넘기거나 작업이 TASK_TIMEOUT_SEC를 넘기면 PasswordBusy
+    """
+    if WORKERS <= 0:
+        return func(*args)
+    for _ in range(2):
+        pool = _get_pool()
+        try:
+            future = _submit(pool, func, args, wait)
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            continue
+        except RuntimeError:
+            # 제출하는 사이 다른 스레드가 _reset_pool로 이 풀을 닫음 -> 새 풀로 한 번만 다시 시도
+            continue
+        try:
+            return future.result(timeout=TASK_TIMEOUT_SEC)
+        except BrokenProcessPool:
+            # 작업 프로세스가 죽음 -> 풀을 새로 만들고 한 번만 다시 시도
+            _reset_pool(pool)
+        except FuturesTimeout:
+            with _lock:
+                _stats["timeouts"] += 1
+            raise _busy()
+    raise _busy("비밀번호 확인 작업을 처리하지 못했습니다. 잠시 후 다시 시도해 주세요.")
+
+
+def verify(stored, plain):
+    """-> (일치 여부, 새 해시 또는 None) - 새 해시가 있으면 호출한 쪽에서 저장"""
+    ok, new_hash = _run(check, stored, plain)
+    if new_hash is not None:
+        with _lock:
+            _stats["rehashed"] += 1
+    return ok, new_hash
+
+
+def make_hash(plain):
+    """가입/비밀번호 변경용 해시 (풀에서 계산)"""
+    return _run(hash_password, plain)
+
+
+def make_hashes(plains, chunk=BULK_CHUNK):
+    """
+    여러 개를 한꺼번에 (명단 일괄 가입용) - chunk개씩 나눠 로그인과 같은 대기열로 제출
+    동시에 BULK_WORKERS개 묶음까지만 풀에 올리고, 자리가 없으면 로그인보다 오래(TASK_TIMEOUT_SEC) 기다림
+    """
+    if WORKERS <= 0:
+        return _hash_many(plains)
+    parts = [plains[i:i + chunk] for i in range(0, len(plains), chunk)]
+    executor = ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix="password-bulk")
+    try:
+        hashed = executor.map(lambda part: _run(_hash_many, part, wait=TASK_TIMEOUT_SEC), parts)
+        return [h for part in hashed for h in part]
+    finally:
+        # 한 묶음이 실패하면 남은 묶음은 시작하지 않음
+        executor.shutdown(cancel_futures=True)
+
+
+def stats():
+    """풀 현황 (대시보드/벤치마크용)"""
+    with _lock:
+        result = dict(_stats)
+    result["workers"] = WORKERS
+    result["bulk_workers"] = BULK_WORKERS
+    result["queue_max"] = QUEUE_MAX
+    return result
@@ -1,6 +1,215 @@
+import os
+import json
 import streamlit as st
 from db import get_conn
+import catalog
+from sqltrace import traced_view
+from hangul import choseong_key, is_choseong_query
 
+# 한 페이지에 보여줄 식물 수 (기본값은 .env의 PLANT_PAGE_SIZE)
+PAGE_SIZE_OPTIONS = [10, 20, 50]
+DEFAULT_PAGE_SIZE = int(os.getenv("PLANT_PAGE_SIZE", "20"))
+# 예상 개수가 이 값 이하이면 정확한 COUNT(*)로 다시 셈
+EXACT_COUNT_LIMIT = 1000
+
+# 검색어와의 trigram 유사도 순 (검색어가 없으면 이름순)
+RELEVANCE_SORT = "검색 정확도순"
+# 정렬 옵션별 (정렬 키 식, 방향) - 동점은 species_id로 구분
+SORT_KEYS = {
+    "이름순 (가나다)": ("common_name", "ASC"),
+    "게임 난이도 낮은순": ("COALESCE(difficulty, 0)", "ASC"),
+    "게임 난이도 높은순": ("COALESCE(difficulty, 0)", "DESC"),
+}
+
+def build_filter(search_term, difficulty):
+    """검색어/난이도 조건 (WHERE 절, 파라미터)"""
+    where = "WHERE 1=1"
+    params = []
+
+    if search_term:
+        if is_choseong_query(search_term):
+            # 초성 검색 (예: ㅁㅅㅌㄹ -> 몬스테라)
+            where += " AND search_key LIKE %s"
+            params.append(f"%{choseong_key(search_term)}%")
+        else:
+            # 부분 일치 + 오타 허용(trigram 유사도), 둘 다 pg_trgm GIN 인덱스로 처리
+            where += " AND (common_name ILIKE %s OR common_name %% %s)"
+            params.extend([f"%{search_term}%", search_term])
+
+    if difficulty is not None:
+        where += " AND difficulty = %s"
+        params.append(difficulty)
+
+    return where, params
+
+def sort_key(sort_option, search_term):
+    """정렬 옵션의 (정렬 키 식, 식에 들어갈 파라미터, 방향)"""
+    if sort_option == RELEVANCE_SORT:
+        if not search_term:
+            return "common_name", [], "ASC"
+        if is_choseong_query(search_term):
+            return "similarity(search_key, %s)", [choseong_key(search_term)], "DESC"
+        return "similarity(common_name, %s)", [search_term], "DESC"
+    key_expr, direction = SORT_KEYS[sort_option]
+    return key_expr, [], direction
+
+def build_catalog_query(search_term, difficulty, sort_option, after=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    keyset(seek) 방식 페이지 쿼리 생성
+    after: 이전 페이지 마지막 행의 (정렬 키, species_id), 첫 페이지면 None
+    한 행을 더 가져와서 다음 페이지가 있는지 판단함
+    """
+    key_expr, key_params, direction = sort_key(sort_option, search_term)
+    where, filter_params = build_filter(search_term, difficulty)
+    params = key_params + filter_params
+
+    if after is not None:
+        op = ">" if direction == "ASC" else "<"
+        where += f" AND ({key_expr}, species_id) {op} (%s, %s)"
+        params += key_params + list(after)
+
+    sql = f"""
+        SELECT species_id, common_name, category, difficulty, sun_level, {key_expr} AS sort_key
+        FROM plant_species
+        {where}
+        ORDER BY {key_expr} {direction}, species_id {direction}
+        LIMIT %s
+    """
+    params += key_params + [page_size + 1]
+    return sql, params
+
+def estimate_total(cursor, search_term, difficulty):
+    """
+    검색 결과 개수 추정 (정확한 값이면 True도 함께 반환)
+    전체 테이블 COUNT(*) 대신 플래너 추정치를 쓰고, 작을 때만 실제로 셈
+    """
+    where, params = build_filter(search_term, difficulty)
+    cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM plant_species {where}", tuple(params))
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+
+    if estimate > EXACT_COUNT_LIMIT:
+        return estimate, False
+    cursor.execute(f"SELECT COUNT(*) FROM plant_species {where}", tuple(params))
+    return cursor.fetchone()[0], True
+
+def load_species_details(conn, species_ids):
+    """펼친 식물의 이미지/설명 (도감 캐시에서 조회, 없을 때만 DB)"""
+    details = {}
+    for sid in species_ids:
+        species = catalog.get_species(sid, conn)
+        if species:
+            details[sid] = (species["image_url"], species["description"])
+    return details
+
+def load_tips_by_species(cursor, species_ids):
+    """여러 식물의 공개 팁을 한 번에 조회해서 {species_id: [팁...]} 형태로 반환"""
+    tips_map = {sid: [] for sid in species_ids}
+    if not species_ids:
+        return tips_map
+    cursor.execute("""
+        SELECT t.species_id, t.tip_id, t.title, t.content, u.name, t.created_at
+        FROM expert_tip t
+        JOIN user_account u ON t.expert_id = u.user_id
+        WHERE t.species_id = ANY(%s) AND t.is_hidden = FALSE
+        ORDER BY t.species_id, t.created_at DESC
+    """, (list(species_ids),))
+    for sid, *tip in cursor.fetchall():
+        tips_map[sid].append(tuple(tip))
+    return tips_map
+
+def load_owned_species(cursor, user_id, species_ids):
+    """species_ids 중 사용자가 이미 키우고 있는 식물 ID 집합"""
+    if not species_ids:
+        return set()
+    cursor.execute(
+        "SELECT species_id FROM user_plant WHERE user_id = %s AND species_id = ANY(%s)",
+        (user_id, list(species_ids)),
+    )
+    return {r[0] for r in cursor.fetchall()}
+
+def render_species_detail(conn, cursor, species, detail, tips, owned):
+    """펼친 식물 1개의 상세 정보 (이미지/설명/팁/키우기)"""
+    s_id, name, cat, diff, sun = species
+    img, desc = detail
+
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        if img: st.image(img, use_container_width=True)
+        else: st.write("📷 (이미지 없음)")
+
+    with c2:
+        st.write(f"**카테고리**: {cat} | **광량**: {sun}")
+        st.write(f"**게임 난이도**: {'⭐'*(diff or 0)}")
+
+        st.markdown("##### 📖 도감 정보")
+        if desc:
+            st.info(desc)
+        else:
+            st.caption("등록된 상세 정보가 없습니다.")
+
+        # --- [수정됨] 전문가 팁 조회 및 신고 기능 ---
+        if tips:
+            st.write("")
+            with st.expander(f"🎓 전문가 팁 확인하기 ({len(tips)}개)", expanded=False):
+                for tip in tips:
+                    t_id, t_title, t_content, t_author, t_date = tip
+
+                    # 팁 내용 표시 컨테이너
+                    with st.container():
+                        st.markdown(f"**💡 {t_title}**")
+                        st.caption(f"작성자: {t_author} | {t_date.strftime('%Y-%m-%d')}")
+                        st.write(t_content)
+
+                        # [신고 버튼 영역]
+                        if st.session_state.user:
+                            # 신고하기 팝오버 (Streamlit 1.33+ 기능, 구버전이면 expander 사용)
+                            with st.popover("🚨 신고하기", use_container_width=False):
+                                st.markdown("##### 🚨 부적절한 팁 신고")
+                                with st.form(key=f"report_form_{t_id}"):
+                                    reason = st.text_area("신고 사유를 입력해주세요", placeholder="예: 잘못된 정보, 욕설/비방 등")
+                                    report_btn = st.form_submit_button("신고 제출")
+
+                                    if report_btn and reason:
+                                        try:
+                                            # 중복 신고 방지 (선택 사항)
+                                            cursor.execute("SELECT 1 FROM tip_report WHERE tip_id=%s AND reporter_id=%s", (t_id, st.session_state.user['user_id']))
+                                            if cursor.fetchone():
+                                                st.warning("이미 신고한 게시물입니다.")
+                                            else:
+                                                cursor.execute("""
+                                                    INSERT INTO tip_report (tip_id, reporter_id, reason)
+                                                    VALUES (%s, %s, %s)
+                                                """, (t_id, st.session_state.user['user_id'], reason))
+                                                conn.commit()
+                                                st.success("신고가 접수되었습니다. 관리자가 검토할 예정입니다.")
+                                        except Exception as e:
+                                            st.error(f"오류 발생: {e}")
+                        st.markdown("---")
+        else:
+            st.caption("아직 등록된 전문가 팁이 없습니다.")
+
+        st.divider()
+
+        if st.session_state.user:
+            if owned:
+                st.success("✅ 이미 내 정원에 있습니다.")
+            else:
+                if st.button(f"키우기 시작", key=f"btn_{s_id}"):
+                    try:
+                        cursor.execute("INSERT INTO user_plant(user_id, species_id) VALUES (%s, %s)",
+                                     (st.session_state.user['user_id'], s_id))
+                        conn.commit()
+                        st.toast(f"{name} 심기 완료! 🌿")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"오류: {e}")
+        else:
+            st.caption("로그인 후 키울 수 있습니다.")
+
+@traced_view
 def plant_search_view():
     st.header("🔍 식물 도감 검색")
 
@@ -12,50 +221,48 @@ def plant_search_view():
 
     # --- 필터링 옵션 ---
     with st.expander("🔎 상세 필터 옵션", expanded=True):
-        col1, col2, col3 = st.columns(3)
-        search_term = col1.text_input("식물 이름 검색", placeholder="예: 몬스테라")
+        col1, col2, col3, col4 = st.columns([3, 3, 3, 1.5])
+        search_term = col1.text_input("식물 이름 검색", placeholder="예: 몬스테라, ㅁㅅㅌㄹ").strip()
         diff_filter = col2.selectbox("게임 난이도 선택", ["전체", "1 (쉬움)", "2", "3 (보통)", "4", "5 (어려움)"])
-        sort_option = col3.selectbox("정렬 기준", ["이름순 (가나다)", "게임 난이도 낮은순", "게임 난이도 높은순"])
+        sort_option = col3.selectbox("정렬 기준", [RELEVANCE_SORT] + list(SORT_KEYS.keys()))
+        page_size = col4.selectbox(
+            "페이지 크기", PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE) if DEFAULT_PAGE_SIZE in PAGE_SIZE_OPTIONS else 1,
+        )
 
-    # --- SQL 쿼리 ---
-    sql = "SELECT species_id, common_name, category, difficulty, sun_level, image_url, description FROM plant_species WHERE 1=1"
-    params = []
+    difficulty = None if diff_filter == "전체" else int(diff_filter.split()[0])
 
-    if search_term:
-        sql += " AND common_name LIKE %s"
-        params.append(f"%{search_term}%")
-    
-    if diff_filter != "전체":
-        difficulty_val = int(diff_filter.split()[0])
-        sql += " AND difficulty = %s"
-        params.append(difficulty_val)
-
-    if sort_option == "이름순 (가나다)":
-        sql += " ORDER BY common_name ASC"
-    elif sort_option == "게임 난이도 낮은순":
-        sql += " ORDER BY difficulty ASC"
-    elif sort_option == "게임 난이도 높은순":
-        sql += " ORDER BY difficulty DESC"
+    # --- 페이지 상태 (필터가 바뀌면 첫 페이지로) ---
+    # catalog_cursors: 각 페이지 시작 위치(after)의 스택, 첫 페이지는 None
+    signature = (search_term, difficulty, sort_option, page_size)
+    if st.session_state.get("catalog_signature") != signature:
+        st.session_state["catalog_signature"] = signature
+        st.session_state["catalog_cursors"] = [None]
+    cursors = st.session_state["catalog_cursors"]
 
+    # --- SQL 쿼리 (현재 페이지만) ---
+    sql, params = build_catalog_query(search_term, difficulty, sort_option, cursors[-1], page_size)
     cursor.execute(sql, tuple(params))
     rows = cursor.fetchall()
-    
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+
     # --- 결과 출력 ---
     st.divider()
-    
-    if not rows:
+
+    if not rows and len(cursors) == 1:
         st.warning(f"🤔 '{search_term}'에 대한 검색 결과가 없습니다.")
-        
+
         st.markdown("---")
         st.subheader("🙋‍♀️ 찾으시는 식물이 없나요?")
-        
+
         if st.session_state.user:
             st.write("관리자에게 식물 추가를 요청해보세요! 검토 후 도감에 추가됩니다.")
-            
+
             with st.form("request_plant_form"):
                 req_name = st.text_input("신청할 식물 이름", value=search_term if search_term else "")
                 submitted = st.form_submit_button("🌱 식물 등록 신청하기")
-                
+
                 if submitted:
                     if req_name:
                         try:
@@ -71,98 +278,39 @@ def plant_search_view():
                         st.warning("식물 이름을 입력해주세요.")
         else:
             st.info("로그인하시면 없는 식물을 신청할 수 있습니다.")
-            
+
     else:
-        st.markdown(f"총 **{len(rows)}**개의 식물이 발견되었습니다.")
-        
+        total, exact = estimate_total(cursor, search_term, difficulty)
+        total_label = f"{total:,}" if exact else f"약 {total:,}"
+        st.markdown(f"총 **{total_label}**개의 식물이 발견되었습니다. (페이지 {len(cursors)})")
+
+        # 펼친 식물만 상세 정보/팁/보유 여부를 한 번에 조회 (토글 값은 세션에 남아 있음)
+        open_ids = [row[0] for row in rows if st.session_state.get(f"species_open_{row[0]}")]
+        details = load_species_details(conn, open_ids)
+        tips_map = load_tips_by_species(cursor, open_ids)
+        owned_ids = set()
+        if st.session_state.user:
+            owned_ids = load_owned_species(cursor, st.session_state.user['user_id'], open_ids)
+
         for row in rows:
-            s_id, name, cat, diff, sun, img, desc = row
-            
-            with st.expander(f"🌱 {name} (게임 난이도 {diff})"):
-                c1, c2 = st.columns([1, 2])
-                with c1:
-                    if img: st.image(img, use_container_width=True)
-                    else: st.write("📷 (이미지 없음)")
-                
-                with c2:
-                    st.write(f"**카테고리**: {cat} | **광량**: {sun}")
-                    st.write(f"**게임 난이도**: {'⭐'*diff}")
-                    
-                    st.markdown("##### 📖 도감 정보")
-                    if desc:
-                        st.info(desc)
-                    else:
-                        st.caption("등록된 상세 정보가 없습니다.")
-                    
-                    # --- [수정됨] 전문가 팁 조회 및 신고 기능 ---
-                    # 팁 ID(t.tip_id)도 함께 조회하도록 쿼리 수정
-                    cursor.execute("""
-                        SELECT t.tip_id, t.title, t.content, u.name, t.created_at
-                        FROM expert_tip t
-                        JOIN user_account u ON t.expert_id = u.user_id
-                        WHERE t.species_id = %s AND t.is_hidden = FALSE
-                        ORDER BY t.created_at DESC
-                    """, (s_id,))
-                    tips = cursor.fetchall()
-
-                    if tips:
-                        st.write("") 
-                        with st.expander(f"🎓 전문가 팁 확인하기 ({len(tips)}개)", expanded=False):
-                            for tip in tips:
-                                t_id, t_title, t_content, t_author, t_date = tip
-                                
-                                # 팁 내용 표시 컨테이너
-                                with st.container():
-                                    st.markdown(f"**💡 {t_title}**")
-                                    st.caption(f"작성자: {t_author} | {t_date.strftime('%Y-%m-%d')}")
-                                    st.write(t_content)
-                                    
-                                    # [신고 버튼 영역]
-                                    if st.session_state.user:
-                                        # 신고하기 팝오버 (Streamlit 1.33+ 기능, 구버전이면 expander 사용)
-                                        with st.popover("🚨 신고하기", use_container_width=False):
-                                            st.markdown("##### 🚨 부적절한 팁 신고")
-                                            with st.form(key=f"report_form_{t_id}"):
-                                                reason = st.text_area("신고 사유를 입력해주세요", placeholder="예: 잘못된 정보, 욕설/비방 등")
-                                                report_btn = st.form_submit_button("신고 제출")
-                                                
-                                                if report_btn and reason:
-                                                    try:
-                                                        # 중복 신고 방지 (선택 사항)
-                                                        cursor.execute("SELECT 1 FROM tip_report WHERE tip_id=%s AND reporter_id=%s", (t_id, st.session_state.user['user_id']))
-                                                        if cursor.fetchone():
-                                                            st.warning("이미 신고한 게시물입니다.")
-                                                        else:
-                                                            cursor.execute("""
-                                                                INSERT INTO tip_report (tip_id, reporter_id, reason)
-                                                                VALUES (%s, %s, %s)
-                                                            """, (t_id, st.session_state.user['user_id'], reason))
-                                                            conn.commit()
-                                                            st.success("신고가 접수되었습니다. 관리자가 검토할 예정입니다.")
-                                                    except Exception as e:
-                                                        st.error(f"오류 발생: {e}")
-                                    st.markdown("---")
-                    else:
-                        st.caption("아직 등록된 전문가 팁이 없습니다.")
-                    
-                    st.divider()
-                    
-                    if st.session_state.user:
-                        cursor.execute("SELECT 1 FROM user_plant WHERE user_id=%s AND species_id=%s", 
-                                     (st.session_state.user['user_id'], s_id))
-                        if cursor.fetchone():
-                            st.success("✅ 이미 내 정원에 있습니다.")
-                        else:
-                            if st.button(f"키우기 시작", key=f"btn_{s_id}"):
-                                try:
-                                    cursor.execute("INSERT INTO user_plant(user_id, species_id) VALUES (%s, %s)", 
-                                                 (st.session_state.user['user_id'], s_id))
-                                    conn.commit()
-                                    st.toast(f"{name} 심기 완료! 🌿")
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"오류: {e}")
+            species = row[:5]
+            s_id, name, diff = row[0], row[1], row[3]
+
+            if st.toggle(f"🌱 {name} (게임 난이도 {diff})", key=f"species_open_{s_id}"):
+                with st.container(border=True):
+                    if s_id in details:
+                        render_species_detail(conn, cursor, species, details[s_id], tips_map[s_id], s_id in owned_ids)
                     else:
-                        st.caption("로그인 후 키울 수 있습니다.")
+                        st.caption("식물 정보를 불러오지 못했습니다. (삭제되었을 수 있습니다)")
+
+        # --- 페이지 이동 ---
+        p1, p2, p3 = st.columns([1, 4, 1])
+        if p1.button("◀ 이전", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+        if p3.button("다음 ▶", disabled=not has_next, use_container_width=True):
+            last = rows[-1]
+            cursors.append((last[5], last[0]))
+            st.rerun()
 
-    conn.close()
\ No newline at end of file
+    conn.close()
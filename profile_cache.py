@@ -0,0 +1,107 @@
+"""
+사용자 프로필 캐시 (user_account: 이름/학과/역할/포인트)
+
+헤더와 사이드바는 rerun마다 프로필을 보여주는데, 로그인 때 한 번 읽은 st.session_state.user만 쓰면
+다른 탭/관리자가 바꾼 포인트나 역할이 반영되지 않고, 매번 다시 조회하면 rerun마다 DB를 한 번씩 다녀옴
+-> 프로세스 메모리에 user_id별로 캐시하고 app.main이 rerun마다 여기서 읽어 세션에 덮어씀
+- 포인트를 바꾸는 곳(engine 퀴즈 액션)은 커밋 후 update_points()로 캐시 값을 바로 갱신
+- 역할 변경(admin.user_role_management) 등 그 밖의 변경은 invalidate()로 버림
+- TTL: PROFILE_CACHE_TTL초 (다른 서버 프로세스에서 바꾼 값도 이 시간 안에 반영)
+- 크기 제한: 최근에 쓴 사용자 PROFILE_CACHE_SIZE명 (LRU)
+- user_id별 버전: 조회하는 사이에 갱신/무효화가 있었으면 조회 결과를 캐시에 넣지 않음 (이전 값으로 덮어쓰기 방지)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from db import get_conn
+
+MAX_USERS = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+TTL_SEC = float(os.getenv("PROFILE_CACHE_TTL", "5"))
+
+FIELDS = ["user_id", "login_id", "role", "points", "student_id", "name", "department"]
+
+_lock = threading.Lock()
+# user_id -> (조회 시각, 조회 당시 버전, 프로필 dict)
+_profiles = OrderedDict()
+# user_id -> 버전 (갱신/무효화마다 1 증가)
+_versions = {}
+_stats = {"hits": 0, "misses": 0}
+
+
+def _bump(user_id):
+    _versions[user_id] = _versions.get(user_id, 0) + 1
+    return _versions[user_id]
+
+
+def _store(user_id, loaded_at, version, profile):
+    _profiles[user_id] = (loaded_at, version, profile)
+    _profiles.move_to_end(user_id)
+    while len(_profiles) > MAX_USERS:
+        old_id, _ = _profiles.popitem(last=False)
+        _versions.pop(old_id, None)
+
+
+def get(user_id, conn=None):
+    """프로필 dict (복사본) / 계정이 없으면 None"""
+    with _lock:
+        entry = _profiles.get(user_id)
+        if entry and entry[1] == _versions.get(user_id, 0) and time.monotonic() - entry[0] < TTL_SEC:
+            _profiles.move_to_end(user_id)
+            _stats["hits"] += 1
+            return dict(entry[2])
+        _stats["misses"] += 1
+        loaded_version = _versions.get(user_id, 0)
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SELECT {', '.join(FIELDS)} FROM user_account WHERE user_id = %s", (user_id,))
+        row = cur.fetchone()
+    finally:
+        if own_conn:
+            conn.close()
+    if row is None:
+        invalidate(user_id)
+        return None
+
+    profile = dict(zip(FIELDS, row))
+    with _lock:
+        if _versions.get(user_id, 0) == loaded_version:
+            _store(user_id, time.monotonic(), loaded_version, profile)
+    return dict(profile)
+
+
+def prime(profile):
+    """방금 DB에서 읽은 프로필을 캐시에 넣음 (로그인 직후)"""
+    with _lock:
+        _store(profile["user_id"], time.monotonic(), _bump(profile["user_id"]),
+               {field: profile[field] for field in FIELDS})
+
+
+def update_points(user_id, balance):
+    """포인트 변경 커밋 후 호출: 캐시에 있으면 잔액만 바꿈 (조회 시각은 그대로 -> 역할 등은 TTL대로 다시 읽음)"""
+    with _lock:
+        version = _bump(user_id)
+        entry = _profiles.get(user_id)
+        if entry:
+            _store(user_id, entry[0], version, {**entry[2], "points": balance})
+
+
+def invalidate(user_id):
+    """역할/프로필 변경 커밋 후 호출 -> 다음 get()에서 다시 조회"""
+    with _lock:
+        _bump(user_id)
+        _profiles.pop(user_id, None)
+
+
+def stats():
+    """캐시 현황 (대시보드/디버그용)"""
+    with _lock:
+        result = dict(_stats)
+        result["cached"] = len(_profiles)
+    result["ttl_sec"] = TTL_SEC
+    return result
@@ -0,0 +1,232 @@
+"""
+포인트 흐름 롤업 (transaction_log -> 시간/일 단위 집계 테이블)
+
+관리자 대시보드의 포인트 흐름 차트는 transaction_log 원본을 매번 집계하지 않고
+tx_rollup_hourly / tx_rollup_daily / tx_rollup_user_daily(create_tables.sql 16번)를 읽음.
+롤업은 log_id 순서로 증분 처리하고, 어디까지 처리했는지(high-water mark)를 rollup_state에 남김.
+- transaction_log는 INSERT만 하므로 새 행만 더하면 됨 (UPSERT로 기존 버킷에 누적)
+- log_id는 INSERT 때 받고 커밋은 나중이라, 방금 보인 MAX(log_id)는 바로 집계하지 않고
+  ROLLUP_SETTLE_SEC가 지난 뒤에 집계함 (그 사이 아래 번호의 행이 커밋될 수 있음)
+- 한 번에 ROLLUP_BATCH건씩 한 트랜잭션 (배치와 진행 위치가 함께 커밋되므로 중간에 죽어도 두 번 더하지 않음)
+- stats.py 스케줄러가 통계 스냅샷 갱신과 함께 주기적으로 실행
+
+    python rollup.py              # 밀린 만큼 집계
+    python rollup.py --settle 0   # 기록 중인 프로세스가 없을 때 (대량 데이터 생성 직후 등) 바로 끝까지
+"""
+import os
+import time
+from collections import namedtuple
+
+from db import get_conn
+
+SOURCE = "transaction_log"
+BATCH = int(os.getenv("ROLLUP_BATCH", "200000"))
+SETTLE_SEC = float(os.getenv("ROLLUP_SETTLE_SEC", "10"))
+# 차트에서 조회할 수 있는 최대 기간(일)
+MAX_DAYS = 90
+
+# granularity -> (테이블, 버킷 컬럼)
+GRANULARITIES = {
+    "hour": ("tx_rollup_hourly", "bucket_start"),
+    "day": ("tx_rollup_daily", "bucket_date"),
+}
+# 차트 그룹 기준
+GROUP_COLUMNS = {"type": "transaction_type", "department": "department"}
+
+RollupRun = namedtuple("RollupRun", ["from_log_id", "to_log_id", "rows", "batches", "elapsed_ms"])
+
+
+def _advance_mark(cur, settle_sec):
+    """
+    진행 위치 행을 잠그고 safe_log_id 갱신 -> (last_log_id, safe_log_id)
+    settle_sec가 0 이하면 지금 보이는 MAX(log_id)까지 바로 안전하다고 봄
+    """
+    cur.execute("""
+        SELECT last_log_id, safe_log_id, mark_log_id, mark_at <= NOW() - %s * INTERVAL '1 second'
+        FROM rollup_state WHERE source_name = %s FOR UPDATE
+    """, (settle_sec, SOURCE))
+    last_log_id, safe_log_id, mark_log_id, mark_settled = cur.fetchone()
+    cur.execute("SELECT COALESCE(MAX(log_id), 0) FROM transaction_log")
+    current_max = cur.fetchone()[0]
+
+    if settle_sec <= 0:
+        safe_log_id = max(safe_log_id, current_max)
+    elif mark_log_id is None or mark_settled:
+        # 이전 표시가 충분히 지났으면 안전 위치로 승격하고 새로 표시
+        safe_log_id = max(safe_log_id, mark_log_id or 0)
+    else:
+        return last_log_id, safe_log_id
+    cur.execute("""
+        UPDATE rollup_state SET safe_log_id = %s, mark_log_id = %s, mark_at = NOW()
+        WHERE source_name = %s
+    """, (safe_log_id, current_max, SOURCE))
+    return last_log_id, safe_log_id
+
+
+def _apply_batch(cur, from_id, to_id):
+    """
+    log_id (from_id, to_id] 구간을 세 롤업 테이블에 누적 -> 처리한 행 수
+    그 사이 계정이 삭제된 사용자의 로그도 시간/부서 롤업에는 '(미지정)'으로 넣음 (사용자별 롤업은 FK 때문에 제외)
+    """
+    cur.execute("""
+        CREATE TEMP TABLE rollup_batch ON COMMIT DROP AS
+        SELECT l.user_id, l.transaction_type, l.amount, l.logged_at,
+               COALESCE(u.department, '(미지정)') AS department, u.user_id IS NOT NULL AS has_account
+        FROM transaction_log l
+        LEFT JOIN user_account u ON u.user_id = l.user_id
+        WHERE l.log_id > %s AND l.log_id <= %s
+    """, (from_id, to_id))
+    rows = cur.rowcount
+    if rows:
+        cur.execute("""
+            INSERT INTO tx_rollup_hourly (bucket_start, transaction_type, department, inflow, outflow, tx_count)
+            SELECT date_trunc('hour', logged_at), transaction_type, department,
+                   COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0),
+                   COALESCE(-SUM(amount) FILTER (WHERE amount < 0), 0), COUNT(*)
+            FROM rollup_batch GROUP BY 1, 2, 3
+            ON CONFLICT (bucket_start, transaction_type, department) DO UPDATE
+            SET inflow = tx_rollup_hourly.inflow + EXCLUDED.inflow,
+                outflow = tx_rollup_hourly.outflow + EXCLUDED.outflow,
+                tx_count = tx_rollup_hourly.tx_count + EXCLUDED.tx_count
+        """)
+        cur.execute("""
+            INSERT INTO tx_rollup_daily (bucket_date, transaction_type, department, inflow, outflow, tx_count)
+            SELECT logged_at::date, transaction_type, department,
+                   COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0),
+                   COALESCE(-SUM(amount) FILTER (WHERE amount < 0), 0), COUNT(*)
+            FROM rollup_batch GROUP BY 1, 2, 3
+            ON CONFLICT (bucket_date, transaction_type, department) DO UPDATE
+            SET inflow = tx_rollup_daily.inflow + EXCLUDED.inflow,
+                outflow = tx_rollup_daily.outflow + EXCLUDED.outflow,
+                tx_count = tx_rollup_daily.tx_count + EXCLUDED.tx_count
+        """)
+        cur.execute("""
+            INSERT INTO tx_rollup_user_daily (user_id, bucket_date, transaction_type, inflow, outflow, tx_count)
+            SELECT user_id, logged_at::date, transaction_type,
+                   COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0),
+                   COALESCE(-SUM(amount) FILTER (WHERE amount < 0), 0), COUNT(*)
+            FROM rollup_batch WHERE has_account GROUP BY 1, 2, 3
+            ON CONFLICT (user_id, bucket_date, transaction_type) DO UPDATE
+            SET inflow = tx_rollup_user_daily.inflow + EXCLUDED.inflow,
+                outflow = tx_rollup_user_daily.outflow + EXCLUDED.outflow,
+                tx_count = tx_rollup_user_daily.tx_count + EXCLUDED.tx_count
+        """)
+    cur.execute("""
+        UPDATE rollup_state SET last_log_id = %s, updated_at = NOW() WHERE source_name = %s
+    """, (to_id, SOURCE))
+    return rows
+
+
+def catch_up(conn=None, batch=BATCH, settle_sec=SETTLE_SEC, max_batches=None):
+    """
+    밀린 transaction_log를 롤업에 반영 -> RollupRun
+    여러 프로세스가 동시에 불러도 rollup_state 행 잠금으로 한 곳씩 처리됨
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    started = time.perf_counter()
+    total_rows, batches = 0, 0
+    try:
+        cur = conn.cursor()
+        first_id = position = None
+        while max_batches is None or batches < max_batches:
+            position, safe_log_id = _advance_mark(cur, settle_sec)
+            if first_id is None:
+                first_id = position
+            if position >= safe_log_id:
+                conn.commit()
+                break
+            to_id = min(safe_log_id, position + batch)
+            total_rows += _apply_batch(cur, position, to_id)
+            conn.commit()
+            position = to_id
+            batches += 1
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return RollupRun(first_id, position, total_rows, batches, elapsed_ms)
+
+
+def reset(cur):
+    """롤업을 모두 비우고 처음부터 다시 집계하도록 진행 위치 초기화 (호출한 쪽에서 커밋)"""
+    cur.execute("TRUNCATE tx_rollup_hourly, tx_rollup_daily, tx_rollup_user_daily")
+    cur.execute("""
+        UPDATE rollup_state SET last_log_id = 0, safe_log_id = 0, mark_log_id = NULL, mark_at = NULL,
+               updated_at = NOW()
+        WHERE source_name = %s
+    """, (SOURCE,))
+
+
+def lag(conn=None):
+    """진행 상황 -> {"last_log_id", "max_log_id", "behind", "updated_at"}"""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT r.last_log_id, (SELECT COALESCE(MAX(log_id), 0) FROM transaction_log), r.updated_at
+            FROM rollup_state r WHERE r.source_name = %s
+        """, (SOURCE,))
+        last_log_id, max_log_id, updated_at = cur.fetchone()
+    finally:
+        if own_conn:
+            conn.close()
+    return {"last_log_id": last_log_id, "max_log_id": max_log_id,
+            "behind": max_log_id - last_log_id, "updated_at": updated_at}
+
+
+def series_query(granularity="day", group_by="type", days=30, types=None, department=None):
+    """
+    차트용 시계열 SQL -> (sql, params)
+    결과 컬럼: bucket, grp, inflow, outflow, tx_count (최근 days일, 최대 MAX_DAYS)
+    """
+    table, bucket = GRANULARITIES[granularity]
+    group_column = GROUP_COLUMNS[group_by]
+    days = max(1, min(int(days), MAX_DAYS))
+    where = [f"{bucket} >= CURRENT_DATE - %s"]
+    params = [days - 1]
+    if types:
+        where.append("transaction_type = ANY(%s)")
+        params.append(list(types))
+    if department:
+        where.append("department = %s")
+        params.append(department)
+    sql = f"""
+        SELECT {bucket} AS bucket, {group_column} AS grp,
+               SUM(inflow) AS inflow, SUM(outflow) AS outflow, SUM(tx_count) AS tx_count
+        FROM {table}
+        WHERE {' AND '.join(where)}
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+    """
+    return sql, params
+
+
+def user_series_query(user_id, days=30):
+    """사용자 1명의 일별 포인트 흐름 SQL -> (sql, params)"""
+    days = max(1, min(int(days), MAX_DAYS))
+    sql = """
+        SELECT bucket_date AS bucket, transaction_type AS grp, inflow, outflow, tx_count
+        FROM tx_rollup_user_daily
+        WHERE user_id = %s AND bucket_date >= CURRENT_DATE - %s
+        ORDER BY 1, 2
+    """
+    return sql, [user_id, days - 1]
+
+
+if __name__ == "__main__":
+    import sys
+
+    settle = SETTLE_SEC
+    if "--settle" in sys.argv:
+        settle = float(sys.argv[sys.argv.index("--settle") + 1])
+    run = catch_up(settle_sec=settle)
+    print(f"log_id {run.from_log_id} -> {run.to_log_id}: {run.rows:,} rows, "
+          f"{run.batches} batches, {run.elapsed_ms:,}ms")
+    print(lag())
@@ -0,0 +1,201 @@
+"""
+학과 명단 일괄 가입 (관리자 페이지 "🎓 명단 일괄 등록", 명령줄)
+
+학기 초 학과 단위 가입을 회원가입 폼 대신 명단 파일(CSV: student_id, name[, department]) 하나로 처리
+- 로그인 ID = ROSTER_LOGIN_PREFIX + 학번, 초기 비밀번호는 사람마다 임의 생성 (결과 보고서에만 나옴)
+  DB에는 argon2 해시만 저장 (passwords 풀에서 병렬 계산 - 전체 시간은 대부분 이 해시 계산)
+- 명단 전체를 COPY로 임시 테이블에 올린 뒤 중복 검사를 집합 연산 한 번씩으로 처리
+  (행마다 SELECT로 중복 ID를 확인하는 auth.register_user와 달리 명단 크기와 상관없이 문장 수가 일정)
+- 가입은 INSERT ... SELECT 한 문장 (role='User', points=START_POINTS) + 같은 금액의 transaction_log 시작 기록
+  + 요약 감사 로그 1행을 한 트랜잭션으로
+- 행마다 결과(CREATED / EXISTS / LOGIN_TAKEN / DUPLICATE / INVALID)를 돌려줌
+
+    python roster.py cs_2025.csv --department 컴퓨터공학과 --report cs_2025_result.csv
+    python roster.py cs_2025.csv --dry-run
+"""
+import csv
+import io
+import os
+import secrets
+import time
+from collections import namedtuple
+
+import ledger
+import passwords
+from db import copy_rows
+
+LOGIN_PREFIX = os.getenv("ROSTER_LOGIN_PREFIX", "")
+# user_account.points 기본값과 같게
+START_POINTS = 1000
+PASSWORD_BYTES = 6
+
+# create_tables.sql 1번 user_account 컬럼 길이
+LIMITS = {"student_id": 20, "name": 50, "department": 100, "login_id": 50}
+
+STATUS_LABELS = {
+    "CREATED": "가입 완료",
+    "EXISTS": "이미 가입된 학번",
+    "LOGIN_TAKEN": "로그인 ID가 다른 계정에서 사용 중",
+    "DUPLICATE": "명단 안에서 학번 중복",
+    "INVALID": "입력 오류",
+}
+
+# password는 CREATED일 때만 값이 있음, login_id는 EXISTS면 기존 계정의 ID
+RosterRow = namedtuple(
+    "RosterRow",
+    ["row_no", "student_id", "name", "department", "login_id", "password", "status", "message"],
+)
+RosterResult = namedtuple("RosterResult", ["applied", "rows", "counts", "elapsed_ms"])
+
+
+def parse(text, department=None):
+    """
+    명단 CSV -> [(row_no, student_id, name, department)] (헤더 필수: student_id, name, department는 선택)
+    department 컬럼이 비어 있으면 인자로 받은 학과를 씀
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    rows = []
+    for row_no, row in enumerate(reader, start=2):
+        row = {(k or "").strip(): (v or "").strip() for k, v in row.items() if k}
+        rows.append((row_no, row.get("student_id") or None, row.get("name") or None,
+                     row.get("department") or department or None))
+    return rows
+
+
+def _check(rows, prefix):
+    """DB 없이 검사 -> (적재할 행, 결과가 정해진 행)"""
+    staged, done, seen = [], [], set()
+    for row_no, student_id, name, department in rows:
+        login_id = f"{prefix}{student_id}" if student_id else None
+        values = {"student_id": student_id, "name": name, "department": department, "login_id": login_id}
+        problems = [f"{f} 값이 없음" for f in ("student_id", "name") if not values[f]]
+        problems += [f"{f}는 {n}자 이하" for f, n in LIMITS.items() if values[f] and len(values[f]) > n]
+        if problems:
+            done.append(RosterRow(row_no, student_id, name, department, None, None, "INVALID", ", ".join(problems)))
+        elif student_id in seen:
+            done.append(RosterRow(row_no, student_id, name, department, None, None, "DUPLICATE",
+                                  STATUS_LABELS["DUPLICATE"]))
+        else:
+            seen.add(student_id)
+            staged.append((row_no, student_id, name, department, login_id,
+                           secrets.token_urlsafe(PASSWORD_BYTES)))
+    return staged, done
+
+
+def enroll(conn, rows, admin_id=None, prefix=LOGIN_PREFIX, dry_run=False):
+    """
+    명단 가입 -> RosterResult(applied, [RosterRow] 명단 순서, {상태: 건수}, elapsed_ms)
+    dry_run이면 결과만 계산하고 rollback (비밀번호는 보여주지 않음)
+    """
+    started = time.perf_counter()
+    staged, done = _check(rows, prefix)
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            CREATE TEMP TABLE roster_stage (
+                row_no INT PRIMARY KEY, student_id VARCHAR(20), name VARCHAR(50), department VARCHAR(100),
+                login_id VARCHAR(50), password VARCHAR(255), status VARCHAR(20) NOT NULL DEFAULT 'NEW',
+                user_id INT, existing_login VARCHAR(50)
+            ) ON COMMIT DROP
+        """)
+        copy_rows(cur, "roster_stage", ["row_no", "student_id", "name", "department", "login_id", "password"], staged)
+        cur.execute("ANALYZE roster_stage")
+        # 1) 이미 가입된 학번 2) 로그인 ID를 다른 계정이 사용 중 - 각각 한 문장
+        cur.execute("""
+            UPDATE roster_stage r SET status = 'EXISTS', existing_login = u.login_id
+            FROM user_account u WHERE u.student_id = r.student_id
+        """)
+        cur.execute("""
+            UPDATE roster_stage r SET status = 'LOGIN_TAKEN'
+            FROM user_account u WHERE u.login_id = r.login_id AND r.status = 'NEW'
+        """)
+        if not dry_run:
+            # 가입할 사람만 argon2 해시 (passwords 프로세스 풀에서 나눠 계산), 평문은 보고서에만 남음
+            cur.execute("SELECT row_no, password FROM roster_stage WHERE status = 'NEW' ORDER BY row_no")
+            pending = cur.fetchall()
+            hashes = passwords.make_hashes([password for _, password in pending])
+            cur.execute("CREATE TEMP TABLE roster_hash (row_no INT PRIMARY KEY, password_hash VARCHAR(255)) ON COMMIT DROP")
+            copy_rows(cur, "roster_hash", ["row_no", "password_hash"],
+                      ((row_no, h) for (row_no, _), h in zip(pending, hashes)))
+            # 검사 이후 같은 ID로 가입한 사람이 있으면 ON CONFLICT로 빠지고 아래에서 LOGIN_TAKEN 처리
+            cur.execute("""
+                WITH created AS (
+                    INSERT INTO user_account (login_id, password_hash, student_id, name, department, role, points)
+                    SELECT r.login_id, h.password_hash, r.student_id, r.name, r.department, 'User', %s
+                    FROM roster_stage r JOIN roster_hash h ON h.row_no = r.row_no
+                    WHERE r.status = 'NEW'
+                    ORDER BY r.row_no
+                    ON CONFLICT (login_id) DO NOTHING
+                    RETURNING user_id, login_id
+                ), opening AS (
+                    INSERT INTO transaction_log (user_id, transaction_type, amount)
+                    SELECT user_id, %s, %s FROM created
+                )
+                UPDATE roster_stage r SET status = 'CREATED', user_id = c.user_id
+                FROM created c WHERE c.login_id = r.login_id
+            """, (START_POINTS, ledger.SIGNUP_BONUS, START_POINTS))
+            cur.execute("UPDATE roster_stage SET status = 'LOGIN_TAKEN' WHERE status = 'NEW'")
+        cur.execute("""
+            SELECT row_no, student_id, name, department, COALESCE(existing_login, login_id), password, status
+            FROM roster_stage
+        """)
+        for row_no, student_id, name, department, login_id, password, status in cur.fetchall():
+            done.append(RosterRow(row_no, student_id, name, department, login_id,
+                                  password if status == "CREATED" else None,
+                                  status, "가입 가능" if status == "NEW" else STATUS_LABELS[status]))
+        done.sort()
+        counts = {}
+        for row in done:
+            counts[row.status] = counts.get(row.status, 0) + 1
+        created = counts.get("CREATED", 0)
+        if dry_run or not created:
+            conn.rollback()
+        else:
+            cur.execute("""
+                INSERT INTO audit_log (admin_id, action_type, target_id, details)
+                VALUES (%s, 'ENROLL_ROSTER', NULL, %s)
+            """, (admin_id, "명단 일괄 가입: " + ", ".join(f"{STATUS_LABELS[s]} {n}" for s, n in sorted(counts.items()))))
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return RosterResult(bool(created) and not dry_run, done, counts,
+                        round((time.perf_counter() - started) * 1000, 1))
+
+
+def report_csv(result):
+    """결과 보고서 CSV 텍스트 (초기 비밀번호 포함 - 배포 후 폐기)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RosterRow._fields)
+    writer.writerows(result.rows)
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from db import get_conn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file")
+    parser.add_argument("--department", help="명단에 학과 컬럼이 없을 때 쓸 학과")
+    parser.add_argument("--prefix", default=LOGIN_PREFIX, help="로그인 ID 앞에 붙일 문자열")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--report", help="행별 결과 CSV 경로 (초기 비밀번호 포함)")
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8-sig") as f:
+        roster_rows = parse(f.read(), args.department)
+    conn = get_conn()
+    try:
+        res = enroll(conn, roster_rows, prefix=args.prefix, dry_run=args.dry_run)
+    finally:
+        conn.close()
+    if args.report:
+        with open(args.report, "w", encoding="utf-8", newline="") as f:
+            f.write(report_csv(res))
+    for row in res.rows:
+        if row.status not in ("CREATED", "NEW"):
+            print(f"{row.row_no}행 {row.student_id or '-'} {row.name or '-'}: {row.message}")
+    print(f"{res.counts} ({res.elapsed_ms:,}ms){'' if res.applied else ' - 반영 안 함'}")
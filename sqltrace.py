@@ -0,0 +1,265 @@
+"""
+SQL 트레이싱 (rerun 단위 쿼리 기록 + N+1 감지)
+
+- db.get_conn()이 만든 커넥션의 모든 커서는 TracedCursor로 생성됨
+- Streamlit rerun 한 번 동안 실행된 쿼리를 뷰(plant_search_view, game_view ...)별로 모아둠
+- 같은 쿼리가 한 rerun 안에서 여러 번 반복되면 N+1 의심으로 경고
+- 느린 쿼리는 'pium.sql' 로거로 기록, SQL_TRACE_DUMP 경로가 있으면 rerun 요약을 JSONL로 저장
+
+사용 예 (명령행):
+    python sqltrace.py summarize trace_old.jsonl
+    python sqltrace.py diff trace_old.jsonl trace_new.jsonl
+"""
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import psycopg2.extensions
+
+logger = logging.getLogger("pium.sql")
+
+# 환경 변수 설정
+ENABLED = os.getenv("SQL_TRACE", "1") != "0"
+SLOW_MS = float(os.getenv("SQL_SLOW_MS", "200"))
+REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "3"))
+DUMP_PATH = os.getenv("SQL_TRACE_DUMP")
+
+_local = threading.local()
+_dump_lock = threading.Lock()
+
+_RE_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """주석/공백/리터럴을 정리해서 같은 모양의 쿼리를 하나로 묶을 수 있게 함"""
+    sql = _RE_COMMENT.sub(" ", sql)
+    sql = _RE_STRING.sub("?", sql)
+    sql = _RE_NUMBER.sub("?", sql)
+    return _RE_SPACE.sub(" ", sql).strip()
+
+
+def _param_count(params):
+    if params is None:
+        return 0
+    try:
+        return len(params)
+    except TypeError:
+        return 1
+
+
+def _record(sql, params, rows, elapsed_ms):
+    if not isinstance(sql, str):
+        sql = sql.decode() if isinstance(sql, bytes) else str(sql)
+    norm = normalize_sql(sql)
+
+    if elapsed_ms >= SLOW_MS:
+        logger.warning("slow query (%.1f ms, rows=%s): %s", elapsed_ms, rows, norm)
+
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return
+    views = rerun["view_stack"]
+    rerun["statements"].append({
+        "sql": norm,
+        "view": views[-1] if views else "(app)",
+        "params": _param_count(params),
+        "rows": rows,
+        "ms": round(elapsed_ms, 3),
+    })
+
+
+class TracedCursor(psycopg2.extensions.cursor):
+    """실행 시간/반환 행 수를 기록하는 커서 (cursor_factory로 사용)"""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            if not isinstance(query, (str, bytes)):
+                query = query.as_string(self)
+            _record(query, vars, self.rowcount, (time.perf_counter() - started) * 1000)
+
+    def executemany(self, query, vars_list):
+        vars_list = list(vars_list)
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            if not isinstance(query, (str, bytes)):
+                query = query.as_string(self)
+            _record(query, vars_list[0] if vars_list else None, self.rowcount,
+                    (time.perf_counter() - started) * 1000)
+
+
+def begin_rerun():
+    """rerun 시작 (app.py 최상단에서 호출)"""
+    _local.rerun = {
+        "rerun_id": uuid.uuid4().hex[:12],
+        "started_at": time.time(),
+        "view_stack": [],
+        "statements": [],
+    }
+
+
+def current_rerun():
+    return getattr(_local, "rerun", None)
+
+
+def summarize_rerun(rerun):
+    """rerun 한 번의 쿼리 통계 (뷰별 합계 + 반복 쿼리)"""
+    views = {}
+    grouped = {}
+    for stmt in rerun["statements"]:
+        v = views.setdefault(stmt["view"], {"queries": 0, "ms": 0.0, "rows": 0})
+        v["queries"] += 1
+        v["ms"] = round(v["ms"] + stmt["ms"], 3)
+        v["rows"] += max(stmt["rows"], 0)
+
+        g = grouped.setdefault((stmt["view"], stmt["sql"]), {
+            "view": stmt["view"], "sql": stmt["sql"], "count": 0, "ms": 0.0, "rows": 0,
+        })
+        g["count"] += 1
+        g["ms"] = round(g["ms"] + stmt["ms"], 3)
+        g["rows"] += max(stmt["rows"], 0)
+
+    statements = sorted(grouped.values(), key=lambda g: g["ms"], reverse=True)
+    return {
+        "rerun_id": rerun["rerun_id"],
+        "started_at": rerun["started_at"],
+        "total_queries": len(rerun["statements"]),
+        "total_ms": round(sum(s["ms"] for s in rerun["statements"]), 3),
+        "views": views,
+        "statements": statements,
+        "repeated": [g for g in statements if g["count"] >= REPEAT_THRESHOLD],
+    }
+
+
+def end_rerun():
+    """rerun 종료: N+1 경고 + JSONL 덤프"""
+    rerun = getattr(_local, "rerun", None)
+    _local.rerun = None
+    if rerun is None or not rerun["statements"]:
+        return None
+
+    summary = summarize_rerun(rerun)
+    for g in summary["repeated"]:
+        logger.warning("N+1 의심: %s에서 같은 쿼리 %d회 실행: %s", g["view"], g["count"], g["sql"])
+
+    if DUMP_PATH:
+        with _dump_lock, open(DUMP_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+    return summary
+
+
+@contextmanager
+def rerun():
+    """with sqltrace.rerun(): main() 형태로 rerun 전체를 감쌈"""
+    begin_rerun()
+    try:
+        yield
+    finally:
+        end_rerun()
+
+
+@contextmanager
+def view(name):
+    """이 블록에서 실행된 쿼리를 name 뷰로 분류"""
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        yield
+        return
+    rerun["view_stack"].append(name)
+    try:
+        yield
+    finally:
+        rerun["view_stack"].pop()
+
+
+def traced_view(func):
+    """뷰 함수용 데코레이터 (함수 이름을 뷰 이름으로 사용)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with view(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def render_debug_panel():
+    """관리자용 화면 하단 SQL 디버그 패널"""
+    import streamlit as st
+    from db import pool_stats
+
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return
+    summary = summarize_rerun(rerun)
+
+    with st.expander(f"🧪 SQL 디버그: 쿼리 {summary['total_queries']}개 / {summary['total_ms']:.1f} ms", expanded=False):
+        if summary["repeated"]:
+            for g in summary["repeated"]:
+                st.warning(f"N+1 의심 ({g['view']}): 같은 쿼리 {g['count']}회 → `{g['sql'][:120]}`")
+        st.markdown("**뷰별 합계**")
+        st.dataframe([{"view": k, **v} for k, v in summary["views"].items()],
+                     hide_index=True, use_container_width=True)
+        st.markdown("**쿼리별 합계 (느린 순)**")
+        st.dataframe(summary["statements"], hide_index=True, use_container_width=True)
+        stats = pool_stats()
+        if stats:
+            st.caption(f"커넥션 풀: 사용 중 {stats['in_use']} / 최대 {stats['maxconn']}, 대기 {stats['waits']}회")
+
+
+def summarize_dump(path):
+    """JSONL 덤프를 뷰별 평균/최대 쿼리 수로 요약 (릴리스 간 비교용)"""
+    per_view = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            summary = json.loads(line)
+            for name, v in summary["views"].items():
+                agg = per_view.setdefault(name, {"reruns": 0, "queries": 0, "max_queries": 0, "ms": 0.0})
+                agg["reruns"] += 1
+                agg["queries"] += v["queries"]
+                agg["max_queries"] = max(agg["max_queries"], v["queries"])
+                agg["ms"] += v["ms"]
+    return {
+        name: {
+            "reruns": agg["reruns"],
+            "avg_queries": round(agg["queries"] / agg["reruns"], 2),
+            "max_queries": agg["max_queries"],
+            "avg_ms": round(agg["ms"] / agg["reruns"], 2),
+        }
+        for name, agg in sorted(per_view.items())
+    }
+
+
+def diff_dumps(old_path, new_path):
+    """두 덤프의 뷰별 평균 쿼리 수 차이"""
+    old, new = summarize_dump(old_path), summarize_dump(new_path)
+    result = {}
+    for name in sorted(set(old) | set(new)):
+        before = old.get(name, {}).get("avg_queries", 0)
+        after = new.get(name, {}).get("avg_queries", 0)
+        result[name] = {"before": before, "after": after, "delta": round(after - before, 2)}
+    return result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "summarize":
+        print(json.dumps(summarize_dump(sys.argv[2]), ensure_ascii=False, indent=2))
+    elif len(sys.argv) == 4 and sys.argv[1] == "diff":
+        print(json.dumps(diff_dumps(sys.argv[2], sys.argv[3]), ensure_ascii=False, indent=2))
+    else:
+        print("사용법: python sqltrace.py summarize <dump.jsonl> | diff <old.jsonl> <new.jsonl>")
+        sys.exit(1)
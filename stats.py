@@ -0,0 +1,200 @@
+"""
+관리자 대시보드 통계 스냅샷 (MATERIALIZED VIEW) 갱신
+
+통계 VIEW(plant_completion_stats 등)는 user_account / user_plant 전체를 집계하므로
+대시보드를 열 때마다 실행하면 사용자 수에 비례해 느려짐.
+그래서 대시보드는 mv_* 스냅샷을 읽고, 이 모듈이 스냅샷을 주기적으로 갱신함.
+
+- STATS_MAX_AGE초보다 오래된 스냅샷만 갱신 (stat_refresh.refreshed_at 기준)
+- REFRESH MATERIALIZED VIEW CONCURRENTLY -> 갱신 중에도 대시보드 조회가 막히지 않음
+- 서버 프로세스가 여러 개여도 같은 스냅샷은 한 곳에서만 갱신 (pg_try_advisory_lock)
+- 갱신 시각 / 걸린 시간은 stat_refresh에 남김 (대시보드의 "N분 전 갱신" 표시)
+- 같은 스케줄러 스레드가 포인트 흐름 롤업(rollup.py), 월 파티션 관리(partitions.py)도 주기적으로 실행
+
+    python stats.py            # 오래된 스냅샷만 갱신 (cron 등 외부 스케줄러용)
+    python stats.py --force    # 전부 갱신
+"""
+import datetime
+import os
+import threading
+import time
+from collections import namedtuple
+
+import partitions
+import rollup
+from db import get_conn
+
+# 원본 VIEW -> 스냅샷
+SNAPSHOTS = {
+    "plant_completion_stats": "mv_plant_completion_stats",
+    "point_distribution": "mv_point_distribution",
+    "active_department_stats": "mv_active_department_stats",
+}
+# 이 시간(초)보다 오래된 스냅샷은 갱신 대상
+MAX_AGE_SEC = float(os.getenv("STATS_MAX_AGE", "300"))
+# 백그라운드 스케줄러가 오래됨을 확인하는 간격(초)
+CHECK_SEC = float(os.getenv("STATS_CHECK_SEC", "30"))
+# 0이면 앱 프로세스에서 스케줄러를 띄우지 않음 (python stats.py를 cron으로 돌릴 때)
+SCHEDULER_ENABLED = os.getenv("STATS_SCHEDULER", "1") == "1"
+
+# age_sec / refreshed_at은 한 번도 갱신 전이면 None
+StatAge = namedtuple("StatAge", ["view_name", "refreshed_at", "age_sec", "duration_ms"])
+
+
+def ages(conn=None):
+    """스냅샷별 마지막 갱신 정보 -> {스냅샷 이름: StatAge}"""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT view_name, refreshed_at, EXTRACT(EPOCH FROM NOW() - refreshed_at), duration_ms
+            FROM stat_refresh
+        """)
+        rows = cur.fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return {
+        name: StatAge(name, refreshed_at, float(age) if age is not None else None, duration_ms)
+        for name, refreshed_at, age, duration_ms in rows
+    }
+
+
+def refresh(view_name, conn=None, max_age=None, concurrently=True):
+    """
+    스냅샷 1개 갱신 -> 걸린 시간(ms)
+    다른 프로세스가 갱신 중이거나, max_age를 주었고 그 사이 이미 갱신되었으면 None
+    conn을 넘기면 그 연결은 autocommit으로 바뀜 (열린 트랜잭션 없이 넘길 것)
+    """
+    if view_name not in SNAPSHOTS.values():
+        raise ValueError(f"알 수 없는 통계 스냅샷: {view_name}")
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        # REFRESH와 stat_refresh 기록을 각각 바로 커밋 (갱신하는 동안 트랜잭션을 잡고 있지 않음)
+        conn.autocommit = True
+        cur = conn.cursor()
+        cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (view_name,))
+        if not cur.fetchone()[0]:
+            return None
+        try:
+            if max_age is not None:
+                cur.execute("""
+                    SELECT refreshed_at IS NULL OR refreshed_at < NOW() - %s * INTERVAL '1 second'
+                    FROM stat_refresh WHERE view_name = %s
+                """, (max_age, view_name))
+                row = cur.fetchone()
+                if row is not None and not row[0]:
+                    return None
+            started = time.perf_counter()
+            cur.execute(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{view_name}")
+            # autocommit이면 아무 일도 안 함, 아니면 반납 시 rollback되지 않도록 바로 커밋
+            conn.commit()
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            # 스냅샷 시점 = 갱신을 시작한 시각
+            cur.execute("""
+                INSERT INTO stat_refresh (view_name, refreshed_at, duration_ms)
+                VALUES (%s, NOW() - %s * INTERVAL '1 millisecond', %s)
+                ON CONFLICT (view_name) DO UPDATE
+                SET refreshed_at = EXCLUDED.refreshed_at, duration_ms = EXCLUDED.duration_ms
+            """, (view_name, duration_ms, duration_ms))
+            conn.commit()
+            return duration_ms
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (view_name,))
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def refresh_stale(max_age=MAX_AGE_SEC, conn=None):
+    """max_age초보다 오래된 스냅샷만 갱신 -> {스냅샷 이름: 걸린 ms} (이번에 갱신한 것만)"""
+    current = ages(conn)
+    done = {}
+    for view_name in SNAPSHOTS.values():
+        info = current.get(view_name)
+        if info is not None and info.age_sec is not None and info.age_sec < max_age:
+            continue
+        duration_ms = refresh(view_name, conn, max_age=max_age)
+        if duration_ms is not None:
+            done[view_name] = duration_ms
+    return done
+
+
+def refresh_all(conn=None):
+    """오래됨과 상관없이 전부 갱신 (관리자 '지금 갱신' 버튼)"""
+    done = {}
+    for view_name in SNAPSHOTS.values():
+        duration_ms = refresh(view_name, conn)
+        if duration_ms is not None:
+            done[view_name] = duration_ms
+    return done
+
+
+def format_age(info):
+    """StatAge -> '3분 전 갱신' 같은 표시 문구"""
+    if info is None or info.age_sec is None:
+        return "아직 집계 전"
+    age = int(info.age_sec)
+    if age < 60:
+        text = f"{age}초 전"
+    elif age < 3600:
+        text = f"{age // 60}분 전"
+    else:
+        text = f"{age // 3600}시간 {age % 3600 // 60}분 전"
+    return f"{text} 갱신 (집계 {info.duration_ms:,}ms)"
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_last_error = None
+
+
+def _run_scheduler():
+    global _last_error
+    while True:
+        try:
+            refresh_stale()
+            # 포인트 흐름 롤업도 같은 주기로 따라잡음
+            rollup.catch_up()
+            # 월 파티션 미리 만들기 / 보관 정리 (PARTITION_CHECK_SEC마다)
+            partitions.maintain()
+            _last_error = None
+        except Exception as e:
+            # DB 일시 장애 등 -> 다음 주기에 다시 시도
+            _last_error = f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S} {e}"
+        time.sleep(CHECK_SEC)
+
+
+def start_scheduler():
+    """프로세스당 한 번만 백그라운드 갱신 스레드 시작 (STATS_SCHEDULER=0이면 아무것도 안 함)"""
+    global _scheduler
+    if not SCHEDULER_ENABLED:
+        return False
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = threading.Thread(target=_run_scheduler, name="stats-refresher", daemon=True)
+            _scheduler.start()
+    return True
+
+
+def scheduler_status():
+    return {
+        "enabled": SCHEDULER_ENABLED,
+        "running": _scheduler is not None and _scheduler.is_alive(),
+        "max_age_sec": MAX_AGE_SEC,
+        "check_sec": CHECK_SEC,
+        "last_error": _last_error,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    result = refresh_all() if "--force" in sys.argv else refresh_stale()
+    for name, info in ages().items():
+        mark = f"refreshed {result[name]}ms" if name in result else "skipped"
+        print(f"{name:32} {mark:20} {format_age(info)}")
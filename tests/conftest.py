@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 최상위 모듈(db, engine ...)을 그대로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,76 @@
+"""appendlog 스풀 배치 처리 순서 / 실패한 배치 격리 (DB 없이 write_batch를 바꿔서)"""
+import os
+
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+import psycopg2  # noqa: E402
+
+import appendlog  # noqa: E402
+
+
+@pytest.fixture
+def buffer(tmp_path):
+    buf = appendlog.AppendBuffer(spool_dir=str(tmp_path), batch_size=10 ** 6, flush_sec=3600)
+    yield buf
+    buf._stopped = True
+    buf._wake.set()
+    buf._thread.join(timeout=5)
+    buf._spool.close()
+
+
+def add_batch(buf, user_id):
+    buf.add("transaction_log", (user_id, "QUIZ_REWARD", 10, "2026-01-01 00:00:00"))
+    buf._seal()
+
+
+def test_batches_are_written_in_creation_order(buffer, monkeypatch):
+    written = []
+    monkeypatch.setattr(appendlog, "write_batch", lambda batch_id, rows: written.append(batch_id) or 1)
+    for user_id in range(12):
+        add_batch(buffer, user_id)
+    names = sorted(n for n in os.listdir(buffer.spool_dir) if n.startswith("batch-"))
+    users = [appendlog.read_spool(os.path.join(buffer.spool_dir, n))["transaction_log"][0][0] for n in names]
+    assert users == list(range(12))
+
+    assert buffer._write_spooled() == 12
+    assert written == [n[len("batch-"):-len(".jsonl")] for n in names]
+
+
+def test_failing_batch_does_not_block_later_batches(buffer, monkeypatch):
+    written = []
+
+    def write_batch(batch_id, rows):
+        if rows["transaction_log"][0][0] == 0:
+            raise psycopg2.IntegrityError("FK 위반")
+        written.append(rows["transaction_log"][0][0])
+        return 1
+
+    monkeypatch.setattr(appendlog, "write_batch", write_batch)
+    for user_id in range(3):
+        add_batch(buffer, user_id)
+
+    for attempt in range(appendlog.MAX_ATTEMPTS):
+        buffer._write_spooled()
+        assert written == [1, 2]
+    names = os.listdir(buffer.spool_dir)
+    assert not [n for n in names if n.startswith("batch-")]
+    assert len([n for n in names if n.startswith("dead-batch-")]) == 1
+    assert buffer.stats()["dead_batches"] == 1
+    assert buffer.stats()["failures"] == appendlog.MAX_ATTEMPTS
+
+
+def test_connection_failure_keeps_batches_for_next_flush(buffer, monkeypatch):
+    def write_batch(batch_id, rows):
+        raise psycopg2.OperationalError("DB 연결 실패")
+
+    monkeypatch.setattr(appendlog, "write_batch", write_batch)
+    add_batch(buffer, 1)
+    add_batch(buffer, 2)
+    for attempt in range(appendlog.MAX_ATTEMPTS + 1):
+        buffer._write_spooled()
+    names = os.listdir(buffer.spool_dir)
+    assert len([n for n in names if n.startswith("batch-")]) == 2
+    assert buffer.stats()["dead_batches"] == 0
@@ -0,0 +1,96 @@
+"""db.ConnectionPool / PooledConnection (실제 DB 없이 가짜 커넥션으로 확인)"""
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+import psycopg2.extensions  # noqa: E402
+
+import db  # noqa: E402
+
+
+class FakeInfo:
+    def __init__(self, conn):
+        self._conn = conn
+
+    @property
+    def transaction_status(self):
+        if self._conn.autocommit or not self._conn.in_transaction:
+            return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        return psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+
+class FakeConn:
+    def __init__(self):
+        self.autocommit = False
+        self.closed = 0
+        self.in_transaction = False
+        self.statements = []
+        self.info = FakeInfo(self)
+
+    def execute(self, sql):
+        self.statements.append(sql)
+        if not self.autocommit:
+            self.in_transaction = True
+
+    def commit(self):
+        self.statements.append("COMMIT")
+        self.in_transaction = False
+
+    def rollback(self):
+        self.statements.append("ROLLBACK")
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    opened = []
+
+    def connect(**kwargs):
+        opened.append(FakeConn())
+        return opened[-1]
+
+    monkeypatch.setattr(db.psycopg2, "connect", connect)
+    pool = db.ConnectionPool(minconn=0, maxconn=2, timeout=0.1, validate_after=30)
+    pool.opened = opened
+    return pool
+
+
+def test_autocommit_reaches_real_connection(pool):
+    conn = db.PooledConnection(pool, pool.checkout())
+    raw = pool.opened[0]
+    conn.autocommit = True
+    assert raw.autocommit is True
+    assert conn.autocommit is True
+    assert "autocommit" not in vars(conn)
+
+
+def test_autocommit_work_is_not_rolled_back_on_checkin(pool):
+    conn = db.PooledConnection(pool, pool.checkout())
+    raw = pool.opened[0]
+    conn.autocommit = True
+    conn.execute("SELECT pium_answer_correct(...)")
+    conn.close()
+    assert "ROLLBACK" not in raw.statements
+    # 반납된 커넥션은 autocommit을 끄고 닫지 않은 채 재사용
+    assert raw.autocommit is False
+    assert pool.checkout() is raw
+    assert pool.stats()["connects"] == 1
+
+
+def test_open_transaction_is_rolled_back_on_checkin(pool):
+    conn = db.PooledConnection(pool, pool.checkout())
+    raw = pool.opened[0]
+    conn.execute("UPDATE user_account SET points = 0")
+    conn.close()
+    assert raw.statements[-1] == "ROLLBACK"
+
+
+def test_returned_wrapper_rejects_attribute_writes(pool):
+    conn = db.PooledConnection(pool, pool.checkout())
+    conn.close()
+    with pytest.raises(psycopg2.InterfaceError):
+        conn.autocommit = True
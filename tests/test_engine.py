@@ -0,0 +1,178 @@
+"""
+engine.GameEngine 퀴즈 액션
+- 커밋 이후에만 프로필 캐시/지연 기록에 반영되는지 (가짜 커넥션)
+- 실제로 커밋되는지 (DB 필요: .env의 DB_HOST 등이 없으면 건너뜀)
+  결과는 엔진이 쓴 커넥션과 별개인 새 커넥션으로 다시 읽어서 확인
+"""
+import os
+from collections import namedtuple
+
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+pytest.importorskip("dotenv")
+
+import psycopg2  # noqa: E402
+
+import db  # noqa: E402
+import engine  # noqa: E402
+import game_config  # noqa: E402
+import ledger  # noqa: E402
+from bench.common import drop_fixture, seed_players  # noqa: E402
+
+needs_db = pytest.mark.skipif(not os.getenv("DB_HOST"), reason="DB 접속 설정(DB_HOST)이 없음")
+
+START_POINTS = 1000
+Config = namedtuple("Config", ["quiz_reward", "step1_penalty", "revive_cost", "version"])
+
+
+class FakeCursor:
+    def __init__(self, row):
+        self.row = row
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchone(self):
+        return self.row
+
+
+class FakeConn:
+    def __init__(self, row, fail_commit=False):
+        self.row = row
+        self.fail_commit = fail_commit
+        self.commits = 0
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.row)
+
+    def commit(self):
+        if self.fail_commit:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.commits += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    calls = []
+    monkeypatch.setattr(engine.profile_cache, "update_points", lambda *a: calls.append(("points",) + a))
+    monkeypatch.setattr(engine.appendlog, "record_attempt", lambda *a: calls.append(("attempt",) + a))
+    monkeypatch.setattr(engine.appendlog, "record_transaction", lambda *a: calls.append(("tx",) + a))
+    return calls
+
+
+def fake_request():
+    return engine.ActionRequest(7, 70, 700, Config(10, 5, 50, 1), "plant-70-0")
+
+
+def test_records_after_commit(recorded):
+    conn = FakeConn((2, False, 1010, 10, False))
+    eng = engine.GameEngine(connect=lambda: conn, defer_logs=True)
+
+    result = eng.answer_correct(fake_request())
+
+    assert result.outcome == engine.OK
+    assert conn.commits == 1 and conn.closed
+    assert recorded == [("points", 7, 1010), ("attempt", 70, 700, True, False), ("tx", 7, ledger.QUIZ_REWARD, 10)]
+
+
+def test_failed_commit_records_nothing(recorded):
+    conn = FakeConn((2, False, 1010, 10, False), fail_commit=True)
+    eng = engine.GameEngine(connect=lambda: conn, defer_logs=True)
+
+    result = eng.answer_correct(fake_request())
+
+    assert result.outcome == engine.ERROR
+    assert recorded == []
+
+
+def test_injected_conn_is_left_to_the_caller(recorded):
+    conn = FakeConn((2, False, 1010, 10, False))
+    eng = engine.GameEngine(connect=None, defer_logs=True)
+
+    result = eng.answer_correct(fake_request(), conn=conn)
+
+    assert result.outcome == engine.OK
+    assert conn.commits == 0 and not conn.closed
+    assert recorded == []
+
+
+def test_missing_plant_is_an_error_result(recorded):
+    eng = engine.GameEngine(connect=lambda: FakeConn(None), defer_logs=True)
+
+    result = eng.answer_correct(fake_request())
+
+    assert result.outcome == engine.ERROR
+    assert recorded == []
+
+
+def fresh_conn():
+    conn_kwargs, _ = db._load_settings()
+    conn_kwargs.pop("cursor_factory", None)
+    return psycopg2.connect(**conn_kwargs)
+
+
+@pytest.fixture
+def player():
+    conn = db.get_conn()
+    cur = conn.cursor()
+    prefix, _, step_ids, players = seed_players(cur, 1, steps=3, points=START_POINTS, tag="test")
+    conn.commit()
+    user_id, user_plant_id = players[0]
+    try:
+        yield user_id, user_plant_id, step_ids, game_config.load(conn)
+    finally:
+        conn.rollback()
+        cur.execute("DELETE FROM point_request WHERE user_id = %s", (user_id,))
+        drop_fixture(cur, prefix)
+        conn.commit()
+        conn.close()
+
+
+def read_back(user_plant_id, user_id):
+    conn = fresh_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT current_step, action_seq FROM user_plant WHERE user_plant_id = %s", (user_plant_id,))
+        step, seq = cur.fetchone()
+        cur.execute("SELECT points FROM user_account WHERE user_id = %s", (user_id,))
+        points = cur.fetchone()[0]
+        cur.execute("SELECT COALESCE(SUM(amount), 0) FROM transaction_log WHERE user_id = %s", (user_id,))
+        logged = cur.fetchone()[0]
+        return step, seq, points, logged
+    finally:
+        conn.close()
+
+
+@needs_db
+def test_answer_correct_is_committed(player):
+    user_id, user_plant_id, step_ids, cfg = player
+    eng = engine.GameEngine(defer_logs=False)
+    req = engine.ActionRequest(user_id, user_plant_id, step_ids[0], cfg, ledger.plant_action_key(user_plant_id, 0))
+
+    result = eng.answer_correct(req)
+
+    assert result.outcome == engine.OK
+    step, seq, points, logged = read_back(user_plant_id, user_id)
+    assert step == result.new_step == 2
+    assert seq == 1
+    assert points == result.balance == START_POINTS + cfg.quiz_reward
+    assert logged == cfg.quiz_reward
+
+
+@needs_db
+def test_duplicate_key_is_not_applied_twice(player):
+    user_id, user_plant_id, step_ids, cfg = player
+    eng = engine.GameEngine(defer_logs=False)
+    req = engine.ActionRequest(user_id, user_plant_id, step_ids[0], cfg, ledger.plant_action_key(user_plant_id, 0))
+
+    eng.answer_correct(req)
+    again = eng.answer_correct(req)
+
+    assert again.outcome == engine.DUPLICATE
+    assert read_back(user_plant_id, user_id)[2] == START_POINTS + cfg.quiz_reward
@@ -0,0 +1,36 @@
+"""passwords._run: 제출하는 사이 풀이 닫혀도 새 풀로 다시 시도하는지 (작업 프로세스 없이)"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("argon2")
+
+import passwords  # noqa: E402
+
+
+class ClosedPool:
+    """다른 스레드의 _reset_pool이 이미 shutdown한 풀"""
+
+    def submit(self, func, *args):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+
+def test_submit_to_closed_pool_retries_on_new_pool(monkeypatch):
+    fresh = ThreadPoolExecutor(max_workers=1)
+    pools = [ClosedPool(), fresh]
+    monkeypatch.setattr(passwords, "WORKERS", 1)
+    monkeypatch.setattr(passwords, "_get_pool", lambda: pools.pop(0))
+    try:
+        assert passwords._run(pow, 2, 10) == 1024
+    finally:
+        fresh.shutdown()
+    # 실패한 제출이 대기열 자리를 잡고 있지 않음
+    assert passwords._slots.acquire(blocking=False)
+    passwords._slots.release()
+
+
+def test_pool_closed_twice_is_busy(monkeypatch):
+    monkeypatch.setattr(passwords, "WORKERS", 1)
+    monkeypatch.setattr(passwords, "_get_pool", ClosedPool)
+    with pytest.raises(passwords.PasswordBusy):
+        passwords._run(pow, 2, 10)
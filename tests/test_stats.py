@@ -0,0 +1,68 @@
+"""stats.refresh가 풀 커넥션에서도 갱신을 커밋하는지 (가짜 커넥션, DB 없이)"""
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+import psycopg2.extensions  # noqa: E402
+
+import db  # noqa: E402
+import stats  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.log.append((" ".join(sql.split())[:40], self.conn.autocommit))
+        if not self.conn.autocommit:
+            self.conn.in_transaction = True
+
+    def fetchone(self):
+        return (True,)
+
+
+class FakeInfo:
+    def __init__(self, conn):
+        self._conn = conn
+
+    @property
+    def transaction_status(self):
+        if self._conn.in_transaction:
+            return psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConn:
+    def __init__(self):
+        self.autocommit = False
+        self.closed = 0
+        self.in_transaction = False
+        self.log = []
+        self.info = FakeInfo(self)
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.log.append(("COMMIT", self.autocommit))
+        self.in_transaction = False
+
+    def rollback(self):
+        self.log.append(("ROLLBACK", self.autocommit))
+        self.in_transaction = False
+
+
+def test_refresh_is_not_rolled_back_on_checkin(monkeypatch):
+    raw = FakeConn()
+    monkeypatch.setattr(db.psycopg2, "connect", lambda **kwargs: raw)
+    pool = db.ConnectionPool(minconn=0, maxconn=1, timeout=0.1, validate_after=30)
+    monkeypatch.setattr(stats, "get_conn", lambda: db.PooledConnection(pool, pool.checkout()))
+
+    assert stats.refresh("mv_point_distribution") is not None
+
+    statements = [sql for sql, _ in raw.log]
+    assert any(sql.startswith("REFRESH MATERIALIZED VIEW CONCURRENTLY") for sql in statements)
+    assert all(autocommit for sql, autocommit in raw.log if sql.startswith(("REFRESH", "INSERT INTO stat_refresh")))
+    assert "ROLLBACK" not in statements